@@ -1,3 +1,4 @@
-from .errors import GqlError, GqlParsingError, GqlSchemaError, GqlValidationError, GqlExecutionError
+from .errors import GqlError, GqlParsingError, GqlSchemaError, GqlValidationError, GqlExecutionError, \
+    GqlPersistedQueryError
 from .executor import Executor
-from .resolvers import Resolver
+from .resolvers import Resolver, batch
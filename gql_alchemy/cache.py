@@ -0,0 +1,225 @@
+import inspect
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+from .errors import GqlExecutionError
+
+K = t.TypeVar("K")
+V = t.TypeVar("V")
+
+
+class LruCache(t.Generic[K, V]):
+    """Bounded thread safe mapping, least recently used entries are evicted first"""
+
+    def __init__(self, max_size: int) -> None:
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.__entries: 'OrderedDict[K, V]' = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.__entries
+
+    def get(self, key: K) -> t.Optional[V]:
+        with self.__lock:
+            try:
+                value = self.__entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: K, compute: t.Callable[[K], V]) -> V:
+        value = self.get(key)
+
+        if value is None:
+            # computed outside of the lock, concurrent misses of the same key may compute it twice
+            value = compute(key)
+            self.put(key, value)
+
+        return value
+
+    def invalidate(self, key: K) -> None:
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def keys(self) -> t.List[K]:
+        with self.__lock:
+            return list(self.__entries.keys())
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+
+class ResponseCache:
+    """JSON encoded results of queries by request keys, every entry expires after its max age in seconds"""
+
+    def get(self, key: str) -> t.Optional[str]:
+        raise NotImplementedError()
+
+    def put(self, key: str, result_json: str, max_age: int) -> None:
+        raise NotImplementedError()
+
+    def invalidate(self, key: str) -> None:
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        raise NotImplementedError()
+
+
+class LruResponseCache(ResponseCache):
+    def __init__(self, max_size: int = 1000, clock: t.Callable[[], float] = time.monotonic) -> None:
+        self.entries: LruCache[str, t.Tuple[float, str]] = LruCache(max_size)
+        self.clock = clock
+
+    def get(self, key: str) -> t.Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires, result_json = entry
+        if expires <= self.clock():
+            self.entries.invalidate(key)
+            return None
+
+        return result_json
+
+    def put(self, key: str, result_json: str, max_age: int) -> None:
+        self.entries.put(key, (self.clock() + max_age, result_json))
+
+    def invalidate(self, key: str) -> None:
+        self.entries.invalidate(key)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+_cache_scopes = {"ID", "TYPE"}
+
+# type, field, resolver key and arguments
+_FieldKey = t.Tuple[str, str, t.Any, str]
+
+
+class FieldCache:
+    """Values of resolvers fields reused between requests
+
+    Fields are cached with `cached` directive or `cache_ttl` of the schema field. Values of ID scope are kept per
+    `id` attribute of the resolver, or per resolver object if it has no such attribute; values of TYPE scope are
+    shared by all resolvers of the type. Only resolvers methods are cached.
+    """
+
+    def __init__(self, max_size: int = 1000, clock: t.Callable[[], float] = time.monotonic) -> None:
+        self.entries: LruCache[_FieldKey, t.Tuple[float, t.Any, t.Any]] = LruCache(max_size)
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+
+        self.__lock = threading.Lock()
+
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests > 0 else 0.0
+
+    def wrap(self, field: t.Any, field_args: t.Mapping[str, t.Any], ttl: int, scope: str = "ID") -> t.Any:
+        if scope not in _cache_scopes:
+            raise GqlExecutionError("Unknown cache scope `{}`".format(scope))
+
+        resolver = getattr(field, "__self__", None)
+        type_name = getattr(resolver, "for_gql_type", None)
+        if ttl <= 0 or type_name is None or not callable(field):
+            return field
+
+        owner = None
+        if scope == "TYPE":
+            resolver_key = None
+        else:
+            resolver_key = getattr(resolver, "id", None)
+            if resolver_key is None or callable(resolver_key):
+                # resolver is kept with the value, so its id is not reused by another object
+                owner = resolver
+                resolver_key = id(resolver)
+
+        key = (type_name, field.__name__, resolver_key, args_key(field_args))
+
+        if inspect.iscoroutinefunction(field):
+            async def load_async(**args: t.Any) -> t.Any:
+                found, value = self.__get(key, owner)
+                if not found:
+                    value = await field(**args)
+                    self.entries.put(key, (self.clock() + ttl, owner, value))
+                return value
+
+            return load_async
+
+        def load(**args: t.Any) -> t.Any:
+            found, value = self.__get(key, owner)
+            if not found:
+                value = field(**args)
+                if not inspect.isawaitable(value):
+                    self.entries.put(key, (self.clock() + ttl, owner, value))
+            return value
+
+        return load
+
+    def invalidate(self, type_name: str, field_name: t.Optional[str] = None) -> None:
+        """Drop cached values of the type, or of its field only"""
+        for key in self.entries.keys():
+            if key[0] == type_name and (field_name is None or key[1] == field_name):
+                self.entries.invalidate(key)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __get(self, key: _FieldKey, owner: t.Any) -> t.Tuple[bool, t.Any]:
+        entry = self.entries.get(key)
+
+        found = entry is not None and entry[0] > self.clock() and entry[1] is owner
+        with self.__lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return found, entry[2] if found else None
+
+
+def args_key(args: t.Mapping[str, t.Any]) -> str:
+    """Same key for the same field arguments, whatever the order of input object fields"""
+    return repr(_normalized(args))
+
+
+def _normalized(value: t.Any) -> t.Any:
+    if isinstance(value, t.Mapping):
+        return tuple(sorted(((k, _normalized(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return [_normalized(v) for v in value]
+    return value
+
+
+__all__ = ["LruCache", "ResponseCache", "LruResponseCache", "FieldCache", "args_key"]
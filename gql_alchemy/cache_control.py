@@ -0,0 +1,74 @@
+import typing as t
+
+import gql_alchemy.query_model as qm
+import gql_alchemy.types as gt
+from .plan import FieldStep, FragmentStep, OperationPlan, SelectionSet
+
+
+def operation_max_age(plan: OperationPlan, type_registry: gt.TypeRegistry, default_max_age: int = 0) -> int:
+    """Seconds the result of the operation can be cached: the least of max ages of its fields
+
+    Field max age is taken from the field, then from the object it returns. Root fields and fields with
+    sub-selections without max age use default_max_age; other fields inherit it from the parent. Results of
+    mutations are never cached.
+    """
+    if not isinstance(plan.operation, qm.Query):
+        return 0
+
+    max_age = _MaxAgeEstimator(type_registry, default_max_age).selections_max_age(plan.selections, True)
+    return max_age if max_age is not None else default_max_age
+
+
+class _MaxAgeEstimator:
+    def __init__(self, type_registry: gt.TypeRegistry, default_max_age: int) -> None:
+        self.type_registry = type_registry
+        self.default_max_age = default_max_age
+        # selections are shared between fragments variants, each is estimated once
+        self.max_ages: t.Dict[int, t.Optional[int]] = {}
+
+    def selections_max_age(self, steps: SelectionSet, root: bool = False) -> t.Optional[int]:
+        key = id(steps)
+        if key in self.max_ages:
+            return self.max_ages[key]
+
+        max_age: t.Optional[int] = None
+
+        for step in steps:
+            if type(step) is FieldStep:
+                step_max_age = self.field_max_age(t.cast(FieldStep, step), root)
+            else:
+                fragment_step = t.cast(FragmentStep, step)
+                if fragment_step.selections_by_object is None:
+                    nested = [t.cast(SelectionSet, fragment_step.selections)]
+                else:
+                    nested = list(fragment_step.selections_by_object.values())
+                step_max_age = _least(*(self.selections_max_age(n, root) for n in nested))
+
+            max_age = _least(max_age, step_max_age)
+
+        self.max_ages[key] = max_age
+        return max_age
+
+    def field_max_age(self, step: FieldStep, root: bool) -> t.Optional[int]:
+        max_age = step.field.max_age
+
+        if max_age is None:
+            field_type = self.type_registry.resolve_and_unwrap(step.field_type)
+            if isinstance(field_type, gt.Object):
+                max_age = field_type.max_age
+
+        if max_age is None and (root or step.selections is not None):
+            max_age = self.default_max_age
+
+        if step.selections is None:
+            return max_age
+
+        return _least(max_age, self.selections_max_age(step.selections))
+
+
+def _least(*max_ages: t.Optional[int]) -> t.Optional[int]:
+    hinted = [a for a in max_ages if a is not None]
+    return min(hinted) if len(hinted) > 0 else None
+
+
+__all__ = ["operation_max_age"]
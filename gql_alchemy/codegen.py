@@ -0,0 +1,324 @@
+import hashlib
+import typing as t
+
+import gql_alchemy.query_model as qm
+import gql_alchemy.schema as s
+import gql_alchemy.types as gt
+from .plan import FieldStep, FragmentStep, OperationPlan, SelectionSet
+
+# checks of values of built in scalars inlined into the generated code
+_scalar_checks = {
+    id(gt.Boolean): "isinstance({}, bool)",
+    id(gt.Int): "isinstance({}, int)",
+    id(gt.Float): "isinstance({}, float)",
+    id(gt.String): "isinstance({}, str)",
+    id(gt.ID): "isinstance({0}, (int, str))"
+}
+
+# generated code depends on these names only, so it can be written out as a module
+_imports = [
+    "import gql_alchemy.types as _gt",
+    "from gql_alchemy.errors import GqlExecutionError as _GqlExecutionError",
+    "from gql_alchemy.executor import _load_one, _missing_attribute_error, _non_compatible_error, "
+    "_not_assignable_error, _value_check",
+    "from gql_alchemy.resolvers import BatchField as _BatchField"
+]
+
+
+class GeneratedOperation:
+    """Python source of the operation
+
+    Source defines `bind(type_registry, result_checks)` function returning
+    `run(resolver, vars_values, batch_values, field_cache)` that resolves the operation.
+    """
+
+    def __init__(self, name: str, source: str) -> None:
+        self.name = name
+        self.source = source
+
+    def compile(self, type_registry: gt.TypeRegistry,
+                result_checks: str = "full") -> t.Callable[..., t.Dict[str, t.Any]]:
+        namespace: t.Dict[str, t.Any] = {}
+        exec(compile(module_source([self.source]), "<operation {}>".format(self.name), "exec"), namespace)
+        return t.cast(t.Callable[..., t.Dict[str, t.Any]], namespace["bind"](type_registry, result_checks))
+
+
+def generate_operation(plan: OperationPlan, type_registry: gt.TypeRegistry,
+                       function_name: str = "bind") -> t.Optional[GeneratedOperation]:
+    """Straight line code resolving fields of the plan depth first, None for plans with directives
+
+    Directives are evaluated at runtime, such operations are left to the executor.
+    """
+    if plan.has_directives:
+        return None
+
+    generator = _Generator(type_registry)
+    root = generator.builder(plan.selections)
+
+    lines = ["def {}(_tr, _checks=\"full\"):".format(function_name), "    _missing = object()",
+             "    _checked = _checks != \"off\""]
+    lines.extend(("    {} = {}".format(name, value) for name, value in generator.constants.items()))
+    lines.append("")
+    lines.extend((("    " + line) if len(line) > 0 else line for line in generator.lines))
+    lines.append("    return {}".format(root))
+
+    name = plan.operation.name if plan.operation.name is not None else "anonymous"
+    return GeneratedOperation(name, "\n".join(lines) + "\n")
+
+
+def module_source(parts: t.Sequence[str], header: t.Sequence[str] = ()) -> str:
+    """Source of the module with generated functions, header goes before imports"""
+    return "\n".join(list(header) + _imports) + "\n\n\n" + "\n\n".join(parts)
+
+
+def schema_hash(schema: s.Schema) -> str:
+    """Code generated for one schema is not used with another
+
+    Besides the schema text hash covers field cache settings and checks of scalars inlined into the code.
+    """
+    parts = [schema.format()]
+    for type_def in schema.types:
+        if not isinstance(type_def, (s.Object, s.Interface)):
+            continue
+        for name, field in sorted(type_def.fields.items()):
+            if field.cache_ttl is not None:
+                parts.append("{}.{} {} {}".format(type_def.name, name, field.cache_ttl, field.cache_scope))
+    parts.extend(sorted(_scalar_checks.values()))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def type_source(gql_type: gt.GqlType, type_registry: gt.TypeRegistry) -> str:
+    """Expression creating the type with `_tr` type registry"""
+    if gt.is_wrapper(gql_type) is None:
+        return "_tr.resolve_type({!r})".format(str(gql_type))
+    return _wrapper_source(gql_type, type_registry)
+
+
+def _wrapper_source(gql_type: gt.GqlType, type_registry: gt.TypeRegistry) -> str:
+    wrapper = gt.is_wrapper(gql_type)
+    if wrapper is None:
+        return repr(str(gql_type))
+    return "_gt.{}({})".format(
+        "NonNull" if isinstance(wrapper, gt.NonNull) else "List",
+        _wrapper_source(wrapper.of_type(type_registry), type_registry)
+    )
+
+
+def _value_source(value: qm.Value) -> str:
+    if isinstance(value, qm.Variable):
+        return "vv.get({!r})".format(value.name)
+    if isinstance(value, (qm.ListValue, qm.ConstListValue)):
+        return "[" + ", ".join((_value_source(v) for v in value.values)) + "]"
+    if isinstance(value, (qm.ObjectValue, qm.ConstObjectValue)):
+        return "{" + ", ".join(("{!r}: {}".format(k, _value_source(v)) for k, v in value.values.items())) + "}"
+    return repr(value.to_py_value({}))
+
+
+class _Function:
+    def __init__(self) -> None:
+        self.lines: t.List[str] = []
+        self.locals_count = 0
+
+    def add(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def local(self, prefix: str) -> str:
+        self.locals_count += 1
+        return "{}{}".format(prefix, self.locals_count)
+
+
+class _Generator:
+    def __init__(self, type_registry: gt.TypeRegistry) -> None:
+        self.type_registry = type_registry
+        self.lines: t.List[str] = []
+        # sources of values computed once per bind
+        self.constants: t.Dict[str, str] = {}
+        # functions are generated once for selections shared between fields and fragments
+        self.builders: t.Dict[int, str] = {}
+        self.writers: t.Dict[int, str] = {}
+
+    def constant(self, prefix: str, source: str) -> str:
+        name = "_{}{}".format(prefix, len(self.constants))
+        self.constants[name] = source
+        return name
+
+    def builder(self, selections: SelectionSet) -> str:
+        """Function returning result object of the selections for a resolver"""
+        name = self.builders.get(id(selections))
+        if name is not None:
+            return name
+
+        name = self.builders[id(selections)] = "_build{}".format(len(self.builders))
+        func = _Function()
+
+        if all((type(step) is FieldStep for step in selections)):
+            # result object is built with one dict literal
+            values = [(t.cast(FieldStep, step).response_key, self.field(func, 1, t.cast(FieldStep, step)))
+                      for step in selections if not t.cast(FieldStep, step).repeated]
+            func.add(1, "return {" + ", ".join(("{!r}: {}".format(k, v) for k, v in values)) + "}")
+        else:
+            func.add(1, "out = {}")
+            self.selections(func, 1, selections)
+            func.add(1, "return out")
+
+        self.emit(name, "r, vv, bv, fc, p=()", func)
+        return name
+
+    def writer(self, selections: SelectionSet) -> str:
+        """Function adding fields of the selections to result object"""
+        name = self.writers.get(id(selections))
+        if name is not None:
+            return name
+
+        name = self.writers[id(selections)] = "_write{}".format(len(self.writers))
+        func = _Function()
+        self.selections(func, 1, selections)
+        func.add(1, "pass")
+
+        self.emit(name, "r, out, vv, bv, fc, p", func)
+        return name
+
+    def emit(self, name: str, params: str, func: _Function) -> None:
+        self.lines.append("def {}({}):".format(name, params))
+        self.lines.extend(func.lines)
+        self.lines.append("")
+
+    def selections(self, func: _Function, indent: int, selections: SelectionSet) -> None:
+        for step in selections:
+            if type(step) is FieldStep:
+                field_step = t.cast(FieldStep, step)
+                # generated plans have no conditions, the earlier field of the response key is always written
+                if field_step.repeated:
+                    continue
+                func.add(indent, "out[{!r}] = {}".format(field_step.response_key, self.field(func, indent, field_step)))
+                continue
+
+            fragment_step = t.cast(FragmentStep, step)
+            if fragment_step.selections_by_object is None:
+                self.selections(func, indent, t.cast(SelectionSet, fragment_step.selections))
+                continue
+
+            if len(fragment_step.selections_by_object) == 0:
+                continue
+
+            object_type = func.local("t")
+            func.add(indent, "{} = r.for_gql_type".format(object_type))
+            keyword = "if"
+            for object_name, object_selections in fragment_step.selections_by_object.items():
+                func.add(indent, "{} {} == {!r}:".format(keyword, object_type, object_name))
+                func.add(indent + 1, "{}(r, out, vv, bv, fc, p)".format(self.writer(object_selections)))
+                keyword = "elif"
+
+    def field(self, func: _Function, indent: int, step: FieldStep) -> str:
+        """Add code resolving the field, returns name of the local holding the value"""
+        value = func.local("v")
+
+        if len(step.dynamic_args) > 0:
+            args_source = dict(((k, repr(v)) for k, v in step.static_args.items()))
+            args_source.update(((k, _value_source(v)) for k, v in step.dynamic_args))
+            args = func.local("args")
+            func.add(indent, "{} = {}".format(args, _dict_source(args_source)))
+        else:
+            args = self.constant("args", _dict_source(dict(((k, repr(v)) for k, v in step.static_args.items()))))
+
+        func.add(indent, "a = getattr(r, {!r}, _missing)".format(step.attr_name))
+        func.add(indent, "if a is _missing:")
+        func.add(indent + 1, "raise _missing_attribute_error(r, {!r})".format(step.attr_name))
+
+        if step.field.cache_ttl is not None:
+            func.add(indent, "if fc is not None:")
+            func.add(indent + 1, "a = fc.wrap(a, {}, {!r}, {!r})".format(args, step.field.cache_ttl,
+                                                                     step.field.cache_scope))
+
+        func.add(indent, "if isinstance(a, _BatchField):")
+        func.add(indent + 1, "{} = _load_one(bv, a, r, {})".format(value, args))
+        # fields with arguments are always called, others only if callable
+        func.add(indent, "else:" if step.has_args else "elif callable(a):")
+        func.add(indent + 1, "try:")
+        func.add(indent + 2, "{} = {}".format(value, "a(**{})".format(args) if step.has_args else "a()"))
+        func.add(indent + 1, "except Exception as e:")
+        func.add(indent + 2, "raise _GqlExecutionError(\"Resolver internal error\") from e")
+        if not step.has_args:
+            func.add(indent, "else:")
+            func.add(indent + 1, "{} = a".format(value))
+
+        if step.selections is None:
+            self.check_plain(func, indent, step, value)
+        else:
+            self.complete_object(func, indent, step, value)
+
+        return value
+
+    def check_plain(self, func: _Function, indent: int, step: FieldStep, value: str) -> None:
+        field_type = step.field_type
+        non_null = isinstance(field_type, gt.NonNull)
+        if non_null:
+            field_type = t.cast(gt.NonNull, field_type).of_type(self.type_registry)
+
+        check = _scalar_checks.get(id(field_type))
+        type_name = self.constant("type", type_source(step.field_type, self.type_registry))
+        if check is None:
+            check_name = self.constant("check", "_value_check(_tr, {}, _checks)".format(type_name))
+            condition = "{0} is not None and not {0}({1})".format(check_name, value)
+        elif non_null:
+            condition = "_checked and not {}".format(check.format(value))
+        else:
+            condition = "_checked and not ({0} is None or {1})".format(value, check.format(value))
+
+        func.add(indent, "if {}:".format(condition))
+        func.add(indent + 1, "raise _not_assignable_error(r, {!r}, {}, {})".format(step.attr_name, type_name, value))
+
+    def complete_object(self, func: _Function, indent: int, step: FieldStep, value: str) -> None:
+        names = sorted(t.cast(t.FrozenSet[str], step.object_names))
+        if len(names) == 1:
+            incompatible = "{{}} != {!r}".format(names[0])
+        else:
+            incompatible = "{{}} not in {}".format(
+                self.constant("names", "frozenset(({},))".format(", ".join((repr(n) for n in names))))
+            )
+
+        # `p` is path of the resolved object in the result
+        error = "raise _non_compatible_error(r, {!r}, {}, {{}}, p + ({{}},))".format(
+            step.attr_name, self.constant("type", type_source(step.field_type, self.type_registry))
+        )
+        self.completed(func, indent, step.field_type, value, [repr(step.response_key)],
+                       t.cast(SelectionSet, step.selections), incompatible, error)
+
+    def completed(self, func: _Function, indent: int, field_type: gt.GqlType, value: str, path: t.List[str],
+                  selections: SelectionSet, incompatible: str, error: str) -> None:
+        """Replace compatible value of the type with its result, items are checked when they are completed"""
+        raise_error = error.format(value, ", ".join(path))
+
+        if isinstance(field_type, gt.NonNull):
+            func.add(indent, "if {} is None:".format(value))
+            func.add(indent + 1, raise_error)
+            field_type = field_type.of_type(self.type_registry)
+        else:
+            func.add(indent, "if {} is not None:".format(value))
+            indent += 1
+
+        if isinstance(field_type, gt.List):
+            items = func.local("l")
+            index = func.local("n")
+            item = func.local("i")
+            func.add(indent, "if not isinstance({}, list):".format(value))
+            func.add(indent + 1, raise_error)
+            func.add(indent, "{} = []".format(items))
+            func.add(indent, "for {}, {} in enumerate({}):".format(index, item, value))
+            self.completed(func, indent + 1, field_type.of_type(self.type_registry), item, path + [index],
+                           selections, incompatible, error)
+            func.add(indent + 1, "{}.append({})".format(items, item))
+            func.add(indent, "{} = {}".format(value, items))
+            return
+
+        func.add(indent, "if {}:".format(incompatible.format("getattr({}, 'for_gql_type', None)".format(value))))
+        func.add(indent + 1, raise_error)
+        func.add(indent, "{0} = {1}({0}, vv, bv, fc, p + ({2},))".format(value, self.builder(selections),
+                                                                         ", ".join(path)))
+
+
+def _dict_source(items: t.Mapping[str, str]) -> str:
+    return "{" + ", ".join(("{!r}: {}".format(k, v) for k, v in items.items())) + "}"
+
+
+__all__ = ["GeneratedOperation", "generate_operation", "module_source", "schema_hash", "type_source"]
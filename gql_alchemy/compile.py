@@ -0,0 +1,177 @@
+"""Compile persisted queries into Python modules loaded without parsing and validation
+
+    python -m gql_alchemy.compile package.schema_module queries_dir out_dir
+
+Every `*.graphql` file of queries_dir is validated against the schema and written to out_dir as `q_<sha256>.py`
+module keyed by SHA-256 hash of the query text. Modules are loaded with `Executor.load_compiled` or by
+`PersistedQueries` given `compiled_path`.
+"""
+import argparse
+import compileall
+import importlib
+import os
+import sys
+import typing as t
+
+import gql_alchemy.query_model as qm
+import gql_alchemy.schema as s
+import gql_alchemy.types as gt
+from .codegen import generate_operation, module_source, schema_hash, type_source
+from .errors import GqlError
+from .parser import parse_document
+from .persisted import compiled_module_name, query_hash
+from .plan import compile_operation
+from .validator import DocumentValidation, validate_document
+
+
+def compile_query(schema: s.Schema, query: str) -> str:
+    """Source of the module with all operations of the query"""
+    document = parse_document(query)
+    validation = validate_document(document, schema)
+    type_registry = schema.type_registry
+
+    parts = [
+        "QUERY = {!r}\nSHA256 = {!r}\nSCHEMA = {!r}".format(query, query_hash(query), schema_hash(schema)),
+        "DOCUMENT = {}\n".format(_model_source(document)),
+        _variables_source(validation, type_registry)
+    ]
+
+    operations: t.List[str] = []
+    for i, op in enumerate(document.operations):
+        if isinstance(op, qm.Query):
+            root_object = type_registry.resolve_type(schema.query_object_name)
+        else:
+            root_object = type_registry.resolve_type(t.cast(str, schema.mutation_object_name))
+
+        plan = compile_operation(type_registry, document, op, t.cast(gt.Object, root_object))
+        generated = generate_operation(plan, type_registry, "bind_{}".format(i))
+
+        if generated is None:
+            operations.append("{!r}: None".format(op.name))
+        else:
+            parts.append(generated.source)
+            operations.append("{!r}: bind_{}".format(op.name, i))
+
+    parts.append("OPERATIONS = {" + ", ".join(operations) + "}\n")
+
+    return module_source(parts, [
+        '"""Generated by gql_alchemy.compile, do not edit"""',
+        "import gql_alchemy.query_model as _qm"
+    ])
+
+
+def compile_directory(schema: s.Schema, queries_dir: str, out_dir: str) -> t.List[t.Tuple[str, GqlError]]:
+    """Compile every `*.graphql` file of the directory, returns files failed to compile with their errors"""
+    os.makedirs(out_dir, exist_ok=True)
+    failed: t.List[t.Tuple[str, GqlError]] = []
+
+    for file_name in sorted(os.listdir(queries_dir)):
+        if not file_name.endswith(".graphql"):
+            continue
+
+        with open(os.path.join(queries_dir, file_name), encoding="utf-8") as f:
+            query = f.read()
+
+        try:
+            source = compile_query(schema, query)
+        except GqlError as e:
+            failed.append((file_name, e))
+            continue
+
+        module_file = os.path.join(out_dir, compiled_module_name(query_hash(query)) + ".py")
+        tmp_name = "{}.{}.tmp".format(module_file, os.getpid())
+        with open(tmp_name, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.replace(tmp_name, module_file)
+
+    # bytecode is written once at build time, not by every starting worker
+    compileall.compile_dir(out_dir, quiet=1)
+
+    return failed
+
+
+def _variables_source(validation: DocumentValidation, type_registry: gt.TypeRegistry) -> str:
+    environments = ", ".join((
+        "{!r}: {{{}}}".format(name, ", ".join((
+            "{!r}: {}".format(var_name, type_source(var_type, type_registry))
+            for var_name, var_type in env.vars_definitions.items()
+        )))
+        for name, env in validation.environments.items()
+    ))
+    return "def variables(_tr):\n    return {" + environments + "}\n"
+
+
+# attributes passed to the constructor of every model class, in order of its parameters
+_MODEL_ARGUMENTS: t.Dict[type, t.Tuple[str, ...]] = {
+    qm.Document: ("operations", "fragments"),
+    qm.Query: ("name", "variables", "directives", "selections"),
+    qm.Mutation: ("name", "variables", "directives", "selections"),
+    qm.VariableDefinition: ("name", "type", "default"),
+    qm.NamedType: ("name", "null"),
+    qm.ListType: ("el_type", "null"),
+    qm.Directive: ("name", "arguments"),
+    qm.Variable: ("name",),
+    qm.NullValue: (),
+    qm.EnumValue: ("value",),
+    qm.IntValue: ("value",),
+    qm.FloatValue: ("value",),
+    qm.StrValue: ("value",),
+    qm.BoolValue: ("value",),
+    qm.ConstListValue: ("values",),
+    qm.ListValue: ("values",),
+    qm.ConstObjectValue: ("values",),
+    qm.ObjectValue: ("values",),
+    qm.Argument: ("name", "value"),
+    qm.NamedFragment: ("name", "on_type", "directives", "selections"),
+    qm.FieldSelection: ("alias", "name", "arguments", "directives", "selections"),
+    qm.FragmentSpread: ("fragment_name", "directives"),
+    qm.InlineFragment: ("on_type", "directives", "selections"),
+}
+
+
+def _model_source(value: t.Any) -> str:
+    if isinstance(value, qm.GraphQlModelType):
+        arguments = _MODEL_ARGUMENTS.get(type(value))
+        if arguments is None:
+            raise TypeError("Can not write {} of the document".format(type(value).__name__))
+        return "_qm.{}({})".format(type(value).__name__, ", ".join((
+            _model_source(getattr(value, a)) for a in arguments
+        )))
+
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join((_model_source(v) for v in value)) + "]"
+
+    if isinstance(value, dict):
+        return "{" + ", ".join(("{!r}: {}".format(k, _model_source(v)) for k, v in value.items())) + "}"
+
+    return repr(value)
+
+
+def _load_schema(spec: str) -> s.Schema:
+    module_path, _, attr = spec.partition(":")
+    schema = getattr(importlib.import_module(module_path), attr if attr != "" else "schema")
+    if not isinstance(schema, s.Schema):
+        raise TypeError("`{}` is not a schema".format(spec))
+    return schema
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gql_alchemy.compile",
+                                     description="Compile persisted queries into Python modules")
+    parser.add_argument("schema", help="module with the schema as `package.module` or `package.module:attribute`, "
+                                       "attribute defaults to `schema`")
+    parser.add_argument("queries_dir", help="directory with `*.graphql` files")
+    parser.add_argument("out_dir", help="directory for compiled modules")
+    args = parser.parse_args(argv)
+
+    failed = compile_directory(_load_schema(args.schema), args.queries_dir, args.out_dir)
+    for file_name, error in failed:
+        print("{}: {}".format(file_name, error), file=sys.stderr)
+
+    return 1 if len(failed) > 0 else 0
+
+
+__all__ = ["compile_query", "compile_directory", "main"]
+
+if __name__ == "__main__":
+    sys.exit(main())
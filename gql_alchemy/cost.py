@@ -0,0 +1,103 @@
+import typing as t
+
+import gql_alchemy.types as gt
+from .plan import FieldStep, FragmentStep, OperationPlan, SelectionSet
+from .utils import PrimitiveType
+
+# arguments limiting size of the returned list
+_size_args = ("first", "limit")
+
+
+def operation_cost(plan: OperationPlan, type_registry: gt.TypeRegistry,
+                   vars_values: t.Mapping[str, PrimitiveType], default_list_size: int = 10) -> int:
+    """Estimate cost of the operation: sum of fields costs, sub-selections of lists counted per expected item
+
+    Expected size of a list is taken from `first` or `limit` argument, then from `list_size` of the field and
+    falls back to default_list_size. Selections with typed fragments count as the most expensive of possible
+    objects.
+    """
+    values = dict(vars_values)
+    for var in plan.operation.variables:
+        if var.default is not None:
+            values.setdefault(var.name, var.default.to_py_value({}))
+
+    return _Estimator(type_registry, values, default_list_size).selections_cost(plan.selections)
+
+
+class _Estimator:
+    def __init__(self, type_registry: gt.TypeRegistry, vars_values: t.Mapping[str, PrimitiveType],
+                 default_list_size: int) -> None:
+        self.type_registry = type_registry
+        self.vars_values = vars_values
+        self.default_list_size = default_list_size
+        # steps are shared between fragments variants, each is estimated once
+        self.field_costs: t.Dict[int, int] = {}
+
+    def selections_cost(self, steps: SelectionSet, object_name: t.Optional[str] = None) -> int:
+        if object_name is None:
+            # typed fragments of one object exclude fragments of others
+            object_names = self.fragments_objects(steps, set())
+            if len(object_names) > 0:
+                return max((self.selections_cost(steps, name) for name in object_names))
+
+        cost = 0
+
+        for step in steps:
+            if type(step) is FieldStep:
+                field_cost = self.field_costs.get(id(step))
+                if field_cost is None:
+                    field_cost = self.field_costs[id(step)] = self.field_cost(t.cast(FieldStep, step))
+                cost += field_cost
+                continue
+
+            fragment_step = t.cast(FragmentStep, step)
+            if fragment_step.selections_by_object is None:
+                cost += self.selections_cost(t.cast(SelectionSet, fragment_step.selections), object_name)
+            elif object_name is not None:
+                selections = fragment_step.selections_by_object.get(object_name)
+                if selections is not None:
+                    cost += self.selections_cost(selections, object_name)
+
+        return cost
+
+    def fragments_objects(self, steps: SelectionSet, object_names: t.Set[str]) -> t.Set[str]:
+        for step in steps:
+            if type(step) is FragmentStep:
+                fragment_step = t.cast(FragmentStep, step)
+                if fragment_step.selections_by_object is None:
+                    self.fragments_objects(t.cast(SelectionSet, fragment_step.selections), object_names)
+                else:
+                    object_names.update(fragment_step.selections_by_object.keys())
+        return object_names
+
+    def field_cost(self, step: FieldStep) -> int:
+        if step.selections is None:
+            return step.field.cost
+
+        multiplier = 1
+        field_type = step.field_type
+        wrapper = gt.is_wrapper(field_type)
+        while wrapper is not None:
+            if isinstance(wrapper, gt.List):
+                multiplier *= self.list_size(step)
+            field_type = wrapper.of_type(self.type_registry)
+            wrapper = gt.is_wrapper(field_type)
+
+        return step.field.cost + multiplier * self.selections_cost(step.selections)
+
+    def list_size(self, step: FieldStep) -> int:
+        for arg_name in _size_args:
+            value = step.static_args.get(arg_name)
+            for dynamic_name, dynamic_value in step.dynamic_args:
+                if dynamic_name == arg_name:
+                    value = dynamic_value.to_py_value(self.vars_values)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return max(value, 0)
+
+        if step.field.list_size is not None:
+            return step.field.list_size
+
+        return self.default_list_size
+
+
+__all__ = ["operation_cost"]
@@ -45,5 +45,10 @@ class GqlExecutionError(GqlError):
     pass
 
 
+class GqlPersistedQueryError(GqlError):
+    """Persisted query is unknown or not allowed"""
+    pass
+
+
 __all__ = ["GqlError", "GqlParsingError", "GqlSchemaError", "GqlExecutionError",
-           "GqlValidationError"]
+           "GqlValidationError", "GqlPersistedQueryError"]
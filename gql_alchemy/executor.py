@@ -1,30 +1,41 @@
+import asyncio
+import concurrent.futures
+import functools
+import inspect
 import json
+import threading
+import time
+import types
 import typing as t
 
 import gql_alchemy.query_model as qm
 import gql_alchemy.schema as s
 import gql_alchemy.types as gt
-from .errors import GqlExecutionError
+from .cache import FieldCache, LruCache, ResponseCache, args_key
+from .cache_control import operation_max_age
+from .codegen import generate_operation, schema_hash
+from .cost import operation_cost
+from .errors import GqlExecutionError, GqlValidationError
 from .parser import parse_document
-from .resolvers import Resolver, IntrospectionResolver, Introspection
+from .plan import FieldStep, FragmentStep, OperationPlan, SelectionSet, compile_operation, conditions_hold, py_arg_name
+from .resolvers import Resolver, BatchField, IntrospectionResolver, Introspection
+from .hooks import ExecutionHooks, Path, compose_hooks
+from .tracing import Tracer
 from .utils import PrimitiveType
-from .validator import validate
+from .validator import DocumentValidation, Env, validate_op_to_run, validate_document, validate_variables
 
-_py_reserved = {
-    "False", "class", "finally", "is", "return",
-    "None", "continue", "for", "lambda", "try",
-    "True", "def", "from", "nonlocal", "while",
-    "and", "del", "global", "not", "with",
-    "as", "elif", "if", "or", "yield",
-    "assert", "else", "import", "pass",
-    "break", "except", "in", "raise"
-}
+_missing = object()
+_json_encoder = json.JSONEncoder(separators=(",", ":"))
+_result_checks = {"full", "sampled", "off"}
+_thread_loops = threading.local()
 
 
 SomeResolver = t.TypeVar('SomeResolver', bound=Resolver)
 
 
 class Directive:
+    """Directive of the query; directives with constant arguments are created once per plan and reused"""
+
     def should_select_field(self, resolver: SomeResolver,
                             field_name: str) -> bool:
         return True
@@ -52,37 +63,60 @@ class _IncludeDirective(Directive):
         return self.__if
 
 
+class _CachedDirective(Directive):
+    def __init__(self, field_cache: t.Optional[FieldCache], ttl: int, scope: str) -> None:
+        self.__field_cache = field_cache
+        self.__ttl = ttl
+        self.__scope = scope
+
+    def wrap_field(self, field: t.Any,
+                   field_args: t.Mapping[str, PrimitiveType]) -> t.Any:
+        if self.__field_cache is None:
+            return field
+        return self.__field_cache.wrap(field, field_args, self.__ttl, self.__scope)
+
+
 class _DirectivesEnv:
-    def __init__(self, parent_directives: t.MutableSet[Directive],
-                 own_directives: t.Sequence[qm.Directive],
-                 directives_constructors: t.Mapping[str, t.Callable[..., Directive]],
-                 vars_values: t.Mapping[str, PrimitiveType],
-                 type_registry: gt.TypeRegistry) -> None:
+    def __init__(self, parent_directives: t.MutableSet[Directive], own_directives: t.Sequence[Directive]) -> None:
         self.__parent_directives = parent_directives
         self.__own_directives = own_directives
-        self.__type_registry = type_registry
-        self.__directives_constructors = directives_constructors
-        self.__vars_values = vars_values
-        self.__added_directives: t.MutableSet[Directive] = set()
 
     def __enter__(self) -> None:
-        for d in self.__own_directives:
-            dir_c = self.__directives_constructors[d.name]
-            d_def = self.__type_registry.directive(d.name)
-            args = _prepare_args(d.arguments, self.__vars_values, d_def.args)
-            directive = dir_c(**args)
+        for directive in self.__own_directives:
             self.__parent_directives.add(directive)
-            self.__added_directives.add(directive)
 
     def __exit__(self, exc_type: t.Any, exc_val: t.Any, exc_tb: t.Any) -> None:
-        for d in self.__added_directives:
+        for d in self.__own_directives:
             self.__parent_directives.remove(d)
 
 
+class PreparedQuery:
+    """Parsed and validated query with plans of its operations"""
+
+    def __init__(self, document: qm.Document, validation: DocumentValidation, query: t.Optional[str] = None) -> None:
+        self.document = document
+        self.validation = validation
+        # text of the query, results of prepared queries without text are not cached
+        self.query = query
+        self.plans: t.Dict[t.Optional[str], OperationPlan] = {}
+
+
 class Executor:
     def __init__(self, schema: s.Schema, query_resolver: SomeResolver,
                  mutation_resolver: t.Optional[SomeResolver] = None,
-                 directives: t.Optional[t.Mapping[str, t.Callable[..., Directive]]] = None) -> None:
+                 directives: t.Optional[t.Mapping[str, t.Callable[..., Directive]]] = None,
+                 document_cache_size: t.Optional[int] = None,
+                 max_cost: t.Optional[int] = None,
+                 default_list_size: int = 10,
+                 thread_pool: t.Optional[concurrent.futures.Executor] = None,
+                 max_request_threads: t.Optional[int] = None,
+                 memoize_fields: bool = False,
+                 response_cache: t.Optional[ResponseCache] = None,
+                 default_max_age: int = 0,
+                 field_cache: t.Optional[FieldCache] = None,
+                 hooks: t.Sequence[ExecutionHooks] = (),
+                 codegen: bool = False,
+                 result_checks: str = "full") -> None:
         self.schema = schema
         self.type_registry = schema.type_registry
         self.query_resolver = query_resolver
@@ -93,14 +127,382 @@ class Executor:
         self.directives["skip"] = _SkipDirective
         self.directives["include"] = _IncludeDirective
 
+        # fields marked with `cached` directive or cache_ttl reuse values between requests
+        # without field cache `cached` directive resolves fields as usual
+        self.field_cache = field_cache
+        self.directives.setdefault("cached", functools.partial(_CachedDirective, field_cache))
+
+        # operations estimated above max_cost are rejected before execution
+        self.max_cost = max_cost
+        self.default_list_size = default_list_size
+
+        # blocking resolvers of one request run in the pool, at most max_request_threads at once
+        self.thread_pool = thread_pool
+        self.max_request_threads = max_request_threads
+
+        # resolver called once per request for the same field and arguments
+        self.memoize_fields = memoize_fields
+
+        # results of queries are reused while all their fields are fresh, see operation_max_age
+        self.response_cache = response_cache
+        self.default_max_age = default_max_age
+
+        # None without hooks, so requests check for them once
+        self.hooks = compose_hooks(hooks)
+
+        # operations without directives are run by Python code generated for each of them, see generate_operation;
+        # code is kept with the plan, so only plans of prepared queries or cached documents get it
+        self.codegen = codegen
+
+        # values of leaf fields are checked against their types: "full", "sampled" (long lists by few items) or "off"
+        if result_checks not in _result_checks:
+            raise GqlExecutionError("Unknown result checks `{}`, one of {} expected".format(
+                result_checks, ", ".join(sorted(_result_checks))
+            ))
+        self.result_checks = result_checks
+
+        self.document_cache: t.Optional[LruCache[str, qm.Document]] = None
+        self.validation_cache: t.Optional[LruCache[t.Tuple[qm.Document, t.Optional[str]], DocumentValidation]] = None
+        self.plan_cache: t.Optional[LruCache[t.Tuple[qm.Document, t.Optional[str]], OperationPlan]] = None
+        if document_cache_size is not None:
+            self.document_cache = LruCache(document_cache_size)
+            self.validation_cache = LruCache(document_cache_size)
+            self.plan_cache = LruCache(document_cache_size)
+
         if self.mutation_object_name is not None and mutation_resolver is None:
             raise GqlExecutionError("Mutation resolver required with schema that supports mutations")
 
-    def query(self, query: str, variables: t.Mapping[str, PrimitiveType],
+        self.schema_hash: t.Optional[str] = None
+
+        self.introspection = Introspection(schema)
+        self.__query_root_resolver = IntrospectionResolver(query_resolver, self.introspection)
+
+    def query(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
               op_to_run: t.Optional[str] = None) -> PrimitiveType:
+        if self.thread_pool is not None:
+            return _thread_loop().run_until_complete(self.query_async(query, variables, op_to_run))
+
+        cache_key = self.__response_cache_key(query, variables, op_to_run)
+        if cache_key is not None:
+            cached = t.cast(ResponseCache, self.response_cache).get(cache_key)
+            if cached is not None:
+                return json.loads(cached)
+
+        plan, result = self.__execute(query, variables, op_to_run, self.hooks)
+        self.__cache_response(cache_key, plan, result)
+        return result
+
+    async def query_async(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+                          op_to_run: t.Optional[str] = None) -> PrimitiveType:
+        """Same as query, but resolvers may return awaitables; sibling fields and list items run concurrently"""
+        cache_key = self.__response_cache_key(query, variables, op_to_run)
+        if cache_key is not None:
+            cached = t.cast(ResponseCache, self.response_cache).get(cache_key)
+            if cached is not None:
+                return json.loads(cached)
+
+        plan, result = await self.__execute_async(query, variables, op_to_run, self.hooks)
+        self.__cache_response(cache_key, plan, result)
+        return result
+
+    def query_traced(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+                     op_to_run: t.Optional[str] = None) -> t.Dict[str, PrimitiveType]:
+        """Same as query, but result is returned as `data` with timings of the request in `extensions.tracing`
+
+        Response cache is not used for traced requests.
+        """
+        tracer = Tracer()
+        hooks = compose_hooks([self.hooks, tracer])
+
+        if self.thread_pool is not None:
+            _, result = _thread_loop().run_until_complete(self.__execute_async(query, variables, op_to_run, hooks))
+        else:
+            _, result = self.__execute(query, variables, op_to_run, hooks)
+
+        return {"data": result, "extensions": {"tracing": tracer.to_primitive()}}
+
+    async def query_async_traced(self, query: t.Union[str, 'PreparedQuery'],
+                                 variables: t.Mapping[str, PrimitiveType],
+                                 op_to_run: t.Optional[str] = None) -> t.Dict[str, PrimitiveType]:
+        """Same as query_traced, for query_async"""
+        tracer = Tracer()
+        _, result = await self.__execute_async(query, variables, op_to_run, compose_hooks([self.hooks, tracer]))
+        return {"data": result, "extensions": {"tracing": tracer.to_primitive()}}
+
+    def query_stream(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+                     op_to_run: t.Optional[str] = None, chunk_size: int = 8192) -> t.Iterator[bytes]:
+        """Same as query, but result is returned as JSON encoded chunks produced while fields resolve
+
+        Query is validated before the call returns. Batch fields are loaded one key at a time.
+        """
+        cache_key = self.__response_cache_key(query, variables, op_to_run)
+        if cache_key is not None:
+            cached = t.cast(ResponseCache, self.response_cache).get(cache_key)
+            if cached is not None:
+                return _chunks(cached.encode("utf-8"), chunk_size)
+
+        hooks = self.hooks
+        try:
+            plan, resolver = self.__prepare(query, variables, op_to_run, hooks)
+            self.__check_cost(plan, variables)
+        except Exception as e:
+            if hooks is not None:
+                hooks.on_error(e)
+            raise
+
+        if plan.introspection_only:
+            chunks = _chunks(self.__introspection_json(plan, resolver).encode("utf-8"), chunk_size)
+        else:
+            chunks = _StreamingPlanRunner(
+                self.type_registry, variables, self.directives, chunk_size, self.memoize_fields, self.field_cache,
+                self.result_checks
+            ).run_operation(plan, resolver)
+
+        if hooks is not None:
+            hooks.on_operation_start(plan.operation, variables)
+            chunks = _hooked_stream(hooks, plan.operation, chunks)
+
+        max_age = self.__response_max_age(cache_key, plan)
+        if max_age > 0:
+            return self.__cache_stream(t.cast(str, cache_key), max_age, chunks)
+        return chunks
+
+    def __execute(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+                  op_to_run: t.Optional[str],
+                  hooks: t.Optional[ExecutionHooks]) -> t.Tuple[OperationPlan, t.Mapping[str, PrimitiveType]]:
+        if hooks is None:
+            plan, resolver = self.__prepare(query, variables, op_to_run)
+            self.__check_cost(plan, variables)
+            if plan.introspection_only:
+                return plan, json.loads(self.__introspection_json(plan, resolver))
+            return plan, self.__run_plan(plan, resolver, variables)
+
+        try:
+            plan, resolver = self.__prepare(query, variables, op_to_run, hooks)
+            self.__check_cost(plan, variables)
+            hooks.on_operation_start(plan.operation, variables)
+
+            if plan.introspection_only and not hooks.wants_fields():
+                result = json.loads(self.__introspection_json(plan, resolver))
+            else:
+                result = self.__run_plan(plan, resolver, variables, hooks if hooks.wants_fields() else None)
+
+            hooks.on_operation_end(plan.operation, result)
+            return plan, result
+        except Exception as e:
+            hooks.on_error(e)
+            raise
+
+    def __run_plan(self, plan: OperationPlan, resolver: Resolver, variables: t.Mapping[str, PrimitiveType],
+                   field_hooks: t.Optional[ExecutionHooks] = None) -> t.Mapping[str, PrimitiveType]:
+        if field_hooks is None and not self.memoize_fields:
+            if plan.compiled is None and self.codegen:
+                generated = generate_operation(plan, self.type_registry)
+                plan.compiled = (generated.compile(self.type_registry, self.result_checks) if generated is not None
+                                 else False)
+
+            if plan.compiled:
+                batch_values: t.Dict[t.Tuple[BatchField, str], t.Dict[t.Any, t.Any]] = {}
+                result = plan.compiled(resolver, _with_defaults(plan, variables), batch_values, self.field_cache)
+                # generated code loads batch fields one key at a time, such plans are left to the runner
+                if len(batch_values) > 0:
+                    plan.compiled = False
+                return t.cast(t.Mapping[str, PrimitiveType], result)
+
+        return _PlanRunner(
+            self.type_registry, variables, self.directives, self.memoize_fields, self.field_cache, field_hooks,
+            self.result_checks
+        ).run_operation(plan, resolver)
+
+    async def __execute_async(
+            self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+            op_to_run: t.Optional[str], hooks: t.Optional[ExecutionHooks]
+    ) -> t.Tuple[OperationPlan, t.Mapping[str, PrimitiveType]]:
+        if hooks is None:
+            plan, resolver = self.__prepare(query, variables, op_to_run)
+            self.__check_cost(plan, variables)
+            if plan.introspection_only:
+                return plan, json.loads(self.__introspection_json(plan, resolver))
+            return plan, await _AsyncPlanRunner(
+                self.type_registry, variables, self.directives, self.thread_pool, self.max_request_threads,
+                self.memoize_fields, self.field_cache, result_checks=self.result_checks
+            ).run_operation(plan, resolver)
+
+        try:
+            plan, resolver = self.__prepare(query, variables, op_to_run, hooks)
+            self.__check_cost(plan, variables)
+            hooks.on_operation_start(plan.operation, variables)
+
+            if plan.introspection_only and not hooks.wants_fields():
+                result = json.loads(self.__introspection_json(plan, resolver))
+            else:
+                result = await _AsyncPlanRunner(
+                    self.type_registry, variables, self.directives, self.thread_pool, self.max_request_threads,
+                    self.memoize_fields, self.field_cache, hooks if hooks.wants_fields() else None, self.result_checks
+                ).run_operation(plan, resolver)
+
+            hooks.on_operation_end(plan.operation, result)
+            return plan, result
+        except Exception as e:
+            hooks.on_error(e)
+            raise
+
+    def cost(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+             op_to_run: t.Optional[str] = None) -> int:
+        """Estimated cost of the operation, see `operation_cost`"""
+        plan, _ = self.__prepare(query, variables, op_to_run)
+        return operation_cost(plan, self.type_registry, variables, self.default_list_size)
+
+    def prepare(self, query: str) -> 'PreparedQuery':
+        """Parse, validate and compile plans of all operations of the query once for many executions"""
         document = parse_document(query)
+        prepared = PreparedQuery(document, validate_document(document, self.schema), query)
+
+        for op in document.operations:
+            prepared.plans[op.name] = self.__compile_plan((document, op.name))
+        if len(document.operations) == 1:
+            prepared.plans[None] = prepared.plans[document.operations[0].name]
+
+        return prepared
+
+    def load_compiled(self, module: types.ModuleType) -> 'PreparedQuery':
+        """Prepared query from the module written by `python -m gql_alchemy.compile`
+
+        Document and variables of the module are used as they are and operations run by the code of the module.
+        Module compiled for another schema is prepared from its text.
+        """
+        if self.schema_hash is None:
+            self.schema_hash = schema_hash(self.schema)
+        if module.SCHEMA != self.schema_hash:
+            return self.prepare(module.QUERY)
+
+        document: qm.Document = module.DOCUMENT
+        environments = dict(((name, Env(definitions, None))
+                             for name, definitions in module.variables(self.type_registry).items()))
+        prepared = PreparedQuery(document, DocumentValidation(document, self.type_registry, environments),
+                                 module.QUERY)
+
+        for op in document.operations:
+            plan = self.__compile_plan((document, op.name))
+            bind = module.OPERATIONS[op.name]
+            plan.compiled = bind(self.type_registry, self.result_checks) if bind is not None else False
+            prepared.plans[op.name] = plan
+        if len(document.operations) == 1:
+            prepared.plans[None] = prepared.plans[document.operations[0].name]
+
+        return prepared
+
+    def __prepare(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+                  op_to_run: t.Optional[str],
+                  hooks: t.Optional[ExecutionHooks] = None) -> t.Tuple[OperationPlan, Resolver]:
+        if isinstance(query, PreparedQuery):
+            started = time.perf_counter() if hooks is not None else 0.0
+
+            validate_op_to_run(query.document, op_to_run)
+            validate_variables(query.validation, variables, op_to_run)
+
+            plan = query.plans.get(op_to_run)
+            if plan is None:
+                plan = self.__compile_plan((query.document, op_to_run))
+
+            if hooks is not None:
+                hooks.on_validate(query.document, op_to_run, started, time.perf_counter() - started)
+
+            return plan, self.__root_resolver(plan)
 
-        validate(document, self.schema, variables, op_to_run)
+        started = time.perf_counter() if hooks is not None else 0.0
+
+        if self.document_cache is not None:
+            document = self.document_cache.get_or_compute(query, parse_document)
+        else:
+            document = parse_document(query)
+
+        if hooks is not None:
+            hooks.on_parse(query, started, time.perf_counter() - started)
+            started = time.perf_counter()
+
+        validate_op_to_run(document, op_to_run)
+
+        # validation and plan cover the operation to run and its fragments only
+        if self.validation_cache is not None:
+            validation = self.validation_cache.get_or_compute((document, op_to_run), self.__validate_document)
+        else:
+            validation = self.__validate_document((document, op_to_run))
+
+        validate_variables(validation, variables, op_to_run)
+
+        if self.plan_cache is not None:
+            plan = self.plan_cache.get_or_compute((validation.document, op_to_run), self.__compile_plan)
+        else:
+            plan = self.__compile_plan((validation.document, op_to_run))
+            # code generated for the plan of one request would never be reused
+            plan.compiled = False
+
+        if hooks is not None:
+            hooks.on_validate(document, op_to_run, started, time.perf_counter() - started)
+
+        return plan, self.__root_resolver(plan)
+
+    def invalidate_response(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+                            op_to_run: t.Optional[str] = None) -> None:
+        cache_key = self.__response_cache_key(query, variables, op_to_run)
+        if cache_key is not None:
+            t.cast(ResponseCache, self.response_cache).invalidate(cache_key)
+
+    def __response_cache_key(self, query: t.Union[str, 'PreparedQuery'], variables: t.Mapping[str, PrimitiveType],
+                             op_to_run: t.Optional[str]) -> t.Optional[str]:
+        if self.response_cache is None:
+            return None
+
+        text = query.query if isinstance(query, PreparedQuery) else query
+        if text is None:
+            return None
+
+        # cache hit skips parsing, so the key is built from the query text
+        return json.dumps([text, op_to_run, variables], sort_keys=True, separators=(",", ":"))
+
+    def __response_max_age(self, cache_key: t.Optional[str], plan: OperationPlan) -> int:
+        if cache_key is None:
+            return 0
+        return operation_max_age(plan, self.type_registry, self.default_max_age)
+
+    def __cache_response(self, cache_key: t.Optional[str], plan: OperationPlan,
+                         result: t.Mapping[str, PrimitiveType]) -> None:
+        max_age = self.__response_max_age(cache_key, plan)
+        if max_age > 0:
+            t.cast(ResponseCache, self.response_cache).put(
+                t.cast(str, cache_key), _json_encoder.encode(result), max_age
+            )
+
+    def __cache_stream(self, cache_key: str, max_age: int, chunks: t.Iterator[bytes]) -> t.Iterator[bytes]:
+        written: t.List[bytes] = []
+        for chunk in chunks:
+            written.append(chunk)
+            yield chunk
+        t.cast(ResponseCache, self.response_cache).put(cache_key, b"".join(written).decode("utf-8"), max_age)
+
+    def __check_cost(self, plan: OperationPlan, variables: t.Mapping[str, PrimitiveType]) -> None:
+        if self.max_cost is None:
+            return
+
+        cost = operation_cost(plan, self.type_registry, variables, self.default_list_size)
+        if cost > self.max_cost:
+            raise GqlValidationError("Operation cost {} exceeds the limit of {}".format(cost, self.max_cost))
+
+    def __root_resolver(self, plan: OperationPlan) -> Resolver:
+        if isinstance(plan.operation, qm.Query):
+            return self.__query_root_resolver
+        return t.cast(Resolver, self.mutation_resolver)
+
+    def __introspection_json(self, plan: OperationPlan, resolver: Resolver) -> str:
+        if plan.result_json is None:
+            plan.result_json = _json_encoder.encode(
+                _PlanRunner(self.type_registry, {}, self.directives).run_operation(plan, resolver)
+            )
+        return plan.result_json
+
+    def __compile_plan(self, key: t.Tuple[qm.Document, t.Optional[str]]) -> OperationPlan:
+        document, op_to_run = key
 
         if op_to_run is None and len(document.operations) > 1:
             raise GqlExecutionError("Operation name is needed for queries with multiple operations defined")
@@ -118,208 +520,883 @@ class Executor:
 
         if isinstance(operation, qm.Query):
             root_object = self.type_registry.resolve_type(self.query_object_name)
-            resolver: Resolver = IntrospectionResolver(self.query_resolver, Introspection(self.schema))
         else:
             if self.mutation_object_name is None or self.mutation_resolver is None:
                 raise GqlExecutionError("Server does not support mutations")
             root_object = self.type_registry.resolve_type(self.mutation_object_name)
-            resolver = self.mutation_resolver
 
-        return _OperationRunner(self.type_registry, variables, document, self.directives).run_operation(
-            t.cast(gt.Object, root_object),
-            operation,
-            resolver
-        )
+        return compile_operation(self.type_registry, document, operation, t.cast(gt.Object, root_object))
+
+    def __validate_document(self, key: t.Tuple[qm.Document, t.Optional[str]]) -> DocumentValidation:
+        return validate_document(key[0], self.schema, key[1])
+
+
+_Target = t.Tuple[t.Dict[str, PrimitiveType], Resolver]
+# resolver identity, field name and arguments
+_MemoKey = t.Tuple[int, str, str]
 
 
-class _OperationRunner:
+class _PlanRunner:
+    """Runs plan level by level, each field is resolved for all resolvers of the level together"""
+
     def __init__(self, type_registry: gt.TypeRegistry,
                  vars_values: t.Mapping[str, PrimitiveType],
-                 document: qm.Document,
-                 directives: t.Mapping[str, t.Callable[..., Directive]]) -> None:
+                 directives: t.Mapping[str, t.Callable[..., Directive]],
+                 memoize: bool = False,
+                 field_cache: t.Optional[FieldCache] = None,
+                 field_hooks: t.Optional[ExecutionHooks] = None,
+                 result_checks: str = "full") -> None:
         self.type_registry = type_registry
         self.vars_values = dict(vars_values)
-        self.fragments = dict(((f.name, f) for f in document.fragments))
         self.directives = directives
+        self.field_cache = field_cache
+        self.result_checks = result_checks
+        # paths of result objects by their ids are tracked for field hooks only
+        self.field_hooks = field_hooks
+        self.paths: t.Dict[int, Path] = {}
+        self.batch_values: t.Dict[t.Tuple[BatchField, str], t.Dict[t.Any, t.Any]] = {}
+        self.memo: t.Optional[t.Dict[_MemoKey, t.Tuple[Resolver, t.Any]]] = {} if memoize else None
+        self.mutation_resolver: t.Optional[Resolver] = None
+        self.directive_instances: t.Dict[int, t.Any] = {}
+        self.result: t.Dict[str, PrimitiveType] = {}
+
+    def run_operation(self, plan: OperationPlan, root_resolver: Resolver) -> t.Mapping[str, PrimitiveType]:
+        for var in plan.operation.variables:
+            if var.default is not None:
+                self.vars_values.setdefault(var.name, var.default.to_py_value({}))
+
+        if isinstance(plan.operation, qm.Mutation):
+            self.mutation_resolver = root_resolver
+        self.directive_instances = plan.directive_instances
 
-    def run_operation(self, root_object: gt.Object, operation: qm.Operation,
-                      root_resolver: Resolver) -> t.Mapping[str, PrimitiveType]:
-        for var in operation.variables:
+        result = self.result
+        directives: t.MutableSet[Directive] = set()
+
+        with _DirectivesEnv(directives, self.__own_directives(plan.operation.directives)):
+            self.__select(directives, [(result, root_resolver)], plan.selections)
+        return result
+
+    def __own_directives(self, own_directives: t.Sequence[qm.Directive]) -> t.Sequence[Directive]:
+        return _plan_directives(self.directive_instances, own_directives, self.directives, self.vars_values,
+                                self.type_registry)
+
+    def __select(self, parent_directives: t.MutableSet[Directive], targets: t.List[_Target],
+                 steps: SelectionSet) -> None:
+        for step in steps:
+            if type(step) is FieldStep:
+                self.__select_field(parent_directives, targets, t.cast(FieldStep, step))
+            else:
+                self.__select_fragment(parent_directives, targets, t.cast(FragmentStep, step))
+
+    def __select_fragment(self, parent_directives: t.MutableSet[Directive], targets: t.List[_Target],
+                          step: FragmentStep) -> None:
+        if len(step.conditions) > 0 and not conditions_hold(step.conditions, self.vars_values):
+            return
+
+        if len(step.directives) == 0:
+            self.__select_fragment_selections(parent_directives, targets, step)
+            return
+
+        with _DirectivesEnv(parent_directives, self.__own_directives(step.directives)):
+            self.__select_fragment_selections(parent_directives, targets, step)
+
+    def __select_fragment_selections(self, parent_directives: t.MutableSet[Directive], targets: t.List[_Target],
+                                     step: FragmentStep) -> None:
+        if step.selections_by_object is None:
+            self.__select(parent_directives, targets, t.cast(SelectionSet, step.selections))
+            return
+
+        groups: t.Dict[int, t.Tuple[SelectionSet, t.List[_Target]]] = {}
+        for target in targets:
+            selections = step.selections_by_object.get(target[1].for_gql_type)
+            if selections is not None:
+                groups.setdefault(id(selections), (selections, []))[1].append(target)
+
+        for selections, group in groups.values():
+            self.__select(parent_directives, group, selections)
+
+    def __select_field(self, parent_directives: t.MutableSet[Directive], targets: t.List[_Target],
+                       step: FieldStep) -> None:
+        # conditions are checked before resolvers are touched, selections without directives need no environment
+        if len(step.conditions) > 0 and not conditions_hold(step.conditions, self.vars_values):
+            return
+
+        if len(step.directives) == 0:
+            self.__resolve_field(parent_directives, targets, step)
+            return
+
+        with _DirectivesEnv(parent_directives, self.__own_directives(step.directives)):
+            self.__resolve_field(parent_directives, targets, step)
+
+    def __resolve_field(self, parent_directives: t.MutableSet[Directive], targets: t.List[_Target],
+                        step: FieldStep) -> None:
+        if len(parent_directives) > 0:
+            targets = [target for target in targets
+                       if all(d.should_select_field(target[1], step.name) for d in parent_directives)]
+
+        if step.repeated:
+            targets = [target for target in targets if step.response_key not in target[0]]
+
+        if len(targets) == 0:
+            return
+
+        args = _field_args(step, self.vars_values)
+        values = self.__field_values(parent_directives, targets, step, args)
+
+        if step.selections is None:
+            check = _value_check(self.type_registry, step.field_type, self.result_checks)
+            for (result, resolver), field_raw_value in zip(targets, values):
+                result[step.response_key] = _plain_value(check, resolver, step, field_raw_value)
+            return
+
+        sub_targets: t.List[_Target] = []
+        names = t.cast(t.FrozenSet[str], step.object_names)
+        for (result, resolver), field_raw_value in zip(targets, values):
+            result[step.response_key] = self.__collect_subresolvers(
+                sub_targets, names, result, resolver, step, step.field_type, field_raw_value, (step.response_key,),
+                self.paths.get(id(result), ()) if self.field_hooks is not None else None
+            )
+
+        if len(sub_targets) > 0:
+            self.__select(parent_directives, sub_targets, step.selections)
+
+    def __collect_subresolvers(self, sub_targets: t.List[_Target], names: t.FrozenSet[str],
+                               parent: t.Dict[str, PrimitiveType], resolver: Resolver, step: FieldStep,
+                               field_type: gt.GqlType, field_raw_value: t.Any, path: Path,
+                               parent_path: t.Optional[Path]) -> PrimitiveType:
+        """Result of the value checked against the field type, its objects are resolved with the next level"""
+        if isinstance(field_type, gt.NonNull):
+            if field_raw_value is None:
+                raise self.__non_compatible_error(parent, resolver, step, field_raw_value, path)
+            field_type = field_type.of_type(self.type_registry)
+        elif field_raw_value is None:
+            return None
+
+        if isinstance(field_type, gt.List):
+            if not isinstance(field_raw_value, list):
+                raise self.__non_compatible_error(parent, resolver, step, field_raw_value, path)
+            item_type = field_type.of_type(self.type_registry)
+            return [self.__collect_subresolvers(sub_targets, names, parent, resolver, step, item_type, item_raw_value,
+                                                path + (i,), parent_path)
+                    for i, item_raw_value in enumerate(field_raw_value)]
+
+        if getattr(field_raw_value, "for_gql_type", None) not in names:
+            raise self.__non_compatible_error(parent, resolver, step, field_raw_value, path)
+
+        result_dict: t.Dict[str, PrimitiveType] = {}
+        sub_targets.append((result_dict, field_raw_value))
+        if parent_path is not None:
+            self.paths[id(result_dict)] = parent_path + path
+        return result_dict
+
+    def __non_compatible_error(self, parent: t.Dict[str, PrimitiveType], resolver: Resolver, step: FieldStep,
+                               field_raw_value: t.Any, path: Path) -> GqlExecutionError:
+        # objects of previous levels are already in the result, their paths are looked up on errors only
+        return _non_compatible_error(resolver, step.attr_name, step.field_type, field_raw_value,
+                                     t.cast(Path, _result_path(self.result, parent)) + path)
+
+    def __field_values(self, parent_directives: t.MutableSet[Directive], targets: t.List[_Target],
+                       step: FieldStep, args: t.Mapping[str, PrimitiveType]) -> t.List[t.Any]:
+        values: t.List[t.Any] = []
+        batches: t.Dict[BatchField, t.List[int]] = {}
+
+        for i, (result, resolver) in enumerate(targets):
+            started = time.perf_counter() if self.field_hooks is not None else 0.0
+            attr = _field_attr(resolver, step, args, self.field_cache)
+
+            if isinstance(attr, BatchField):
+                batches.setdefault(attr, []).append(i)
+                values.append(None)
+                continue
+
+            values.append(_call_memoized(
+                self.memo if resolver is not self.mutation_resolver else None,
+                parent_directives, resolver, attr, step, args
+            ))
+
+            if self.field_hooks is not None:
+                self.__field_resolved(result, resolver, step, started)
+
+        for field, indexes in batches.items():
+            started = time.perf_counter() if self.field_hooks is not None else 0.0
+            keys = [_batch_key(field, targets[i][1]) for i in indexes]
+            loaded = _load_batch(self.batch_values, parent_directives, field, keys, args)
+
+            for i, k in zip(indexes, keys):
+                values[i] = loaded[k]
+                if self.field_hooks is not None:
+                    # every field loaded together takes the time of the whole batch
+                    self.__field_resolved(targets[i][0], targets[i][1], step, started)
+
+        return values
+
+    def __field_resolved(self, result: t.Mapping[str, PrimitiveType], resolver: Resolver, step: FieldStep,
+                         started: float) -> None:
+        t.cast(ExecutionHooks, self.field_hooks).on_field_resolve(
+            self.paths.get(id(result), ()) + (step.response_key,), resolver.for_gql_type, step.name, step.field_type,
+            started, time.perf_counter() - started
+        )
+
+
+class _StreamingPlanRunner:
+    """Runs plan depth first writing JSON of the result while fields resolve"""
+
+    def __init__(self, type_registry: gt.TypeRegistry,
+                 vars_values: t.Mapping[str, PrimitiveType],
+                 directives: t.Mapping[str, t.Callable[..., Directive]],
+                 chunk_size: int,
+                 memoize: bool = False,
+                 field_cache: t.Optional[FieldCache] = None,
+                 result_checks: str = "full") -> None:
+        self.type_registry = type_registry
+        self.vars_values = dict(vars_values)
+        self.directives = directives
+        self.field_cache = field_cache
+        self.result_checks = result_checks
+        self.chunk_size = chunk_size
+        self.batch_values: t.Dict[t.Tuple[BatchField, str], t.Dict[t.Any, t.Any]] = {}
+        self.memo: t.Optional[t.Dict[_MemoKey, t.Tuple[Resolver, t.Any]]] = {} if memoize else None
+        self.mutation_resolver: t.Optional[Resolver] = None
+        self.directive_instances: t.Dict[int, t.Any] = {}
+        self.buffer: t.List[str] = []
+        self.buffered = 0
+        # path of the object being written
+        self.path: t.List[t.Union[str, int]] = []
+
+    def run_operation(self, plan: OperationPlan, root_resolver: Resolver) -> t.Iterator[bytes]:
+        for var in plan.operation.variables:
             if var.default is not None:
                 self.vars_values.setdefault(var.name, var.default.to_py_value({}))
 
-        result: t.Dict[str, PrimitiveType] = {}
+        if isinstance(plan.operation, qm.Mutation):
+            self.mutation_resolver = root_resolver
+        self.directive_instances = plan.directive_instances
+
         directives: t.MutableSet[Directive] = set()
 
-        with _DirectivesEnv(directives, operation.directives, self.directives, self.vars_values, self.type_registry):
-            self.__select(directives, result, operation.selections, root_object, root_resolver)
+        with _DirectivesEnv(directives, self.__own_directives(plan.operation.directives)):
+            yield from self.__write_object(directives, plan.selections, root_resolver)
+
+        if len(self.buffer) > 0:
+            yield "".join(self.buffer).encode("utf-8")
+
+    def __own_directives(self, own_directives: t.Sequence[qm.Directive]) -> t.Sequence[Directive]:
+        return _plan_directives(self.directive_instances, own_directives, self.directives, self.vars_values,
+                                self.type_registry)
+
+    def __write(self, text: str) -> t.Iterator[bytes]:
+        self.buffer.append(text)
+        self.buffered += len(text)
+
+        if self.buffered >= self.chunk_size:
+            chunk = "".join(self.buffer)
+            self.buffer = []
+            self.buffered = 0
+            yield chunk.encode("utf-8")
+
+    def __write_object(self, parent_directives: t.MutableSet[Directive], steps: SelectionSet,
+                       resolver: Resolver) -> t.Iterator[bytes]:
+        written: t.Set[str] = set()
+        yield from self.__write("{")
+        yield from self.__write_selections(parent_directives, written, steps, resolver)
+        yield from self.__write("}")
+
+    def __write_selections(self, parent_directives: t.MutableSet[Directive], written: t.Set[str],
+                           steps: SelectionSet, resolver: Resolver) -> t.Iterator[bytes]:
+        for step in steps:
+            if type(step) is FieldStep:
+                yield from self.__write_field(parent_directives, written, t.cast(FieldStep, step), resolver)
+                continue
+
+            fragment_step = t.cast(FragmentStep, step)
+            if len(fragment_step.conditions) > 0 and not conditions_hold(fragment_step.conditions, self.vars_values):
+                continue
+
+            if len(fragment_step.directives) == 0:
+                yield from self.__write_fragment(parent_directives, written, fragment_step, resolver)
+                continue
+
+            with _DirectivesEnv(parent_directives, self.__own_directives(fragment_step.directives)):
+                yield from self.__write_fragment(parent_directives, written, fragment_step, resolver)
+
+    def __write_fragment(self, parent_directives: t.MutableSet[Directive], written: t.Set[str],
+                         step: FragmentStep, resolver: Resolver) -> t.Iterator[bytes]:
+        if step.selections_by_object is not None:
+            selections = step.selections_by_object.get(resolver.for_gql_type)
+            if selections is not None:
+                yield from self.__write_selections(parent_directives, written, selections, resolver)
+        else:
+            yield from self.__write_selections(parent_directives, written, t.cast(SelectionSet, step.selections),
+                                               resolver)
+
+    def __write_field(self, parent_directives: t.MutableSet[Directive], written: t.Set[str], step: FieldStep,
+                      resolver: Resolver) -> t.Iterator[bytes]:
+        # written members can not be overwritten, the first selected field of the response key is written
+        if step.repeated and step.response_key in written:
+            return
+
+        if len(step.conditions) > 0 and not conditions_hold(step.conditions, self.vars_values):
+            return
+
+        if len(step.directives) == 0:
+            yield from self.__write_field_value(parent_directives, written, step, resolver)
+            return
+
+        with _DirectivesEnv(parent_directives, self.__own_directives(step.directives)):
+            yield from self.__write_field_value(parent_directives, written, step, resolver)
+
+    def __write_field_value(self, parent_directives: t.MutableSet[Directive], written: t.Set[str], step: FieldStep,
+                            resolver: Resolver) -> t.Iterator[bytes]:
+        for d in parent_directives:
+            if not d.should_select_field(resolver, step.name):
+                return
+
+        args = _field_args(step, self.vars_values)
+        attr = _field_attr(resolver, step, args, self.field_cache)
+
+        if isinstance(attr, BatchField):
+            key = _batch_key(attr, resolver)
+            field_raw_value = _load_batch(self.batch_values, parent_directives, attr, [key], args)[key]
+        else:
+            field_raw_value = _call_memoized(
+                self.memo if resolver is not self.mutation_resolver else None,
+                parent_directives, resolver, attr, step, args
+            )
+
+        if step.selections is None:
+            value = _plain_value(_value_check(self.type_registry, step.field_type, self.result_checks),
+                                 resolver, step, field_raw_value)
+
+        yield from self.__write(
+            ("," if len(written) > 0 else "") + _json_encoder.encode(step.response_key) + ":"
+        )
+        written.add(step.response_key)
+
+        if step.selections is None:
+            yield from self.__write(_json_encoder.encode(value))
+        else:
+            yield from self.__write_subresolvers(
+                parent_directives, step.selections, t.cast(t.FrozenSet[str], step.object_names),
+                resolver, step, step.field_type, field_raw_value, (step.response_key,)
+            )
+
+    def __write_subresolvers(self, parent_directives: t.MutableSet[Directive], selections: SelectionSet,
+                             names: t.FrozenSet[str], resolver: Resolver, step: FieldStep, field_type: gt.GqlType,
+                             field_raw_value: t.Any, path: Path) -> t.Iterator[bytes]:
+        if isinstance(field_type, gt.NonNull):
+            if field_raw_value is None:
+                raise _non_compatible_error(resolver, step.attr_name, step.field_type, field_raw_value,
+                                            tuple(self.path) + path)
+            field_type = field_type.of_type(self.type_registry)
+        elif field_raw_value is None:
+            yield from self.__write("null")
+            return
+
+        if isinstance(field_type, gt.List):
+            if not isinstance(field_raw_value, list):
+                raise _non_compatible_error(resolver, step.attr_name, step.field_type, field_raw_value,
+                                            tuple(self.path) + path)
+            item_type = field_type.of_type(self.type_registry)
+            yield from self.__write("[")
+            for i, item_raw_value in enumerate(field_raw_value):
+                if i > 0:
+                    yield from self.__write(",")
+                yield from self.__write_subresolvers(parent_directives, selections, names, resolver, step, item_type,
+                                                     item_raw_value, path + (i,))
+            yield from self.__write("]")
+            return
+
+        if getattr(field_raw_value, "for_gql_type", None) not in names:
+            raise _non_compatible_error(resolver, step.attr_name, step.field_type, field_raw_value,
+                                        tuple(self.path) + path)
+
+        self.path.extend(path)
+        yield from self.__write_object(parent_directives, selections, field_raw_value)
+        del self.path[-len(path):]
+
+
+class _AsyncPlanRunner:
+    def __init__(self, type_registry: gt.TypeRegistry,
+                 vars_values: t.Mapping[str, PrimitiveType],
+                 directives: t.Mapping[str, t.Callable[..., Directive]],
+                 thread_pool: t.Optional[concurrent.futures.Executor] = None,
+                 max_threads: t.Optional[int] = None,
+                 memoize: bool = False,
+                 field_cache: t.Optional[FieldCache] = None,
+                 field_hooks: t.Optional[ExecutionHooks] = None,
+                 result_checks: str = "full") -> None:
+        self.type_registry = type_registry
+        self.vars_values = dict(vars_values)
+        self.directives = directives
+        self.field_cache = field_cache
+        self.result_checks = result_checks
+        self.field_hooks = field_hooks
+        self.thread_pool = thread_pool
+        self.max_threads = max_threads
+        self.threads_semaphore: t.Optional[asyncio.Semaphore] = None
+        self.batch_values: t.Dict[t.Tuple[BatchField, str], t.Dict[t.Any, asyncio.Future]] = {}
+        self.batch_pending: t.Dict[t.Tuple[BatchField, str], t.List[t.Any]] = {}
+        # concurrent selections of the same field wait for the first call
+        self.memo: t.Optional[t.Dict[_MemoKey, t.Tuple[Resolver, asyncio.Future]]] = {} if memoize else None
+        self.mutation_resolver: t.Optional[Resolver] = None
+        self.directive_instances: t.Dict[int, t.Any] = {}
+
+    async def run_operation(self, plan: OperationPlan, root_resolver: Resolver) -> t.Mapping[str, PrimitiveType]:
+        for var in plan.operation.variables:
+            if var.default is not None:
+                self.vars_values.setdefault(var.name, var.default.to_py_value({}))
+
+        self.directive_instances = plan.directive_instances
+        directives = self.__with_own(frozenset(), plan.operation.directives)
+
+        if isinstance(plan.operation, qm.Mutation):
+            self.mutation_resolver = root_resolver
+
+        if self.thread_pool is not None and self.max_threads is not None:
+            self.threads_semaphore = asyncio.Semaphore(self.max_threads)
+
+        result: t.Dict[str, PrimitiveType] = {}
+        # spec requires mutation root fields to be executed serially
+        await self.__select(directives, result, plan.selections, root_resolver, (),
+                            serially=isinstance(plan.operation, qm.Mutation))
         return result
 
-    def __select(self, parent_directives: t.MutableSet[Directive], result: t.Dict[str, PrimitiveType],
-                 selections: t.Sequence[qm.Selection],
-                 from_selectable: gt.SpreadableType,
-                 resolver: Resolver) -> None:
-        for sel in selections:
-            if isinstance(sel, qm.FieldSelection):
-                selectable = gt.assert_selectable(from_selectable)
-                field = selectable.fields(self.type_registry)[sel.name]
-                self.__select_field(parent_directives, result, sel, field, resolver)
+    def __with_own(self, parent_directives: t.FrozenSet[Directive],
+                   own_directives: t.Sequence[qm.Directive]) -> t.FrozenSet[Directive]:
+        # directives sets are never mutated, concurrently resolved siblings do not see each other directives
+        if len(own_directives) == 0:
+            return parent_directives
+        return parent_directives.union(
+            _plan_directives(self.directive_instances, own_directives, self.directives, self.vars_values,
+                             self.type_registry)
+        )
+
+    def __collect_fields(self, parent_directives: t.FrozenSet[Directive],
+                         fields: t.List[t.Tuple[FieldStep, t.FrozenSet[Directive]]],
+                         steps: SelectionSet, resolver: Resolver) -> None:
+        for step in steps:
+            if len(step.conditions) > 0 and not conditions_hold(step.conditions, self.vars_values):
                 continue
-            if isinstance(sel, qm.FragmentSpread):
-                with _DirectivesEnv(parent_directives, sel.directives, self.directives, self.vars_values,
-                                    self.type_registry):
-                    self.__select_fragment(parent_directives, result, self.fragments[sel.fragment_name],
-                                           from_selectable,
-                                           resolver)
-            if isinstance(sel, qm.InlineFragment):
-                self.__select_fragment(parent_directives, result, sel, from_selectable, resolver)
-
-    def __select_fragment(self, parent_directives: t.MutableSet[Directive],
-                          result: t.Dict[str, PrimitiveType], frg: qm.Fragment,
-                          from_selectable: gt.SpreadableType,
-                          resolver: SomeResolver) -> None:
-        with _DirectivesEnv(parent_directives, frg.directives, self.directives, self.vars_values, self.type_registry):
-            if frg.on_type is not None:
-                on_type = gt.assert_spreadable(self.__resolve_type(frg.on_type.name))
-                if isinstance(on_type, gt.Interface) or isinstance(on_type, gt.Union):
-                    possible_objects = {str(o) for o in on_type.of_objects(self.type_registry)}
+
+            if type(step) is FieldStep:
+                field_step = t.cast(FieldStep, step)
+                if field_step.repeated and any((f.response_key == field_step.response_key for f, _ in fields)):
+                    continue
+                directives = self.__with_own(parent_directives, field_step.directives)
+                for d in directives:
+                    if not d.should_select_field(resolver, field_step.name):
+                        break
                 else:
-                    if not isinstance(on_type, gt.Object):
-                        raise RuntimeError("Object expected here")
-                    possible_objects = {str(on_type)}
+                    fields.append((field_step, directives))
+                continue
+
+            fragment_step = t.cast(FragmentStep, step)
+            directives = self.__with_own(parent_directives, fragment_step.directives)
+            if fragment_step.selections_by_object is not None:
+                selections = fragment_step.selections_by_object.get(resolver.for_gql_type)
+                if selections is not None:
+                    self.__collect_fields(directives, fields, selections, resolver)
+            else:
+                self.__collect_fields(directives, fields, t.cast(SelectionSet, fragment_step.selections), resolver)
 
-                if resolver.for_gql_type not in possible_objects:
-                    return
+    async def __select(self, parent_directives: t.FrozenSet[Directive], result: t.Dict[str, PrimitiveType],
+                       steps: SelectionSet, resolver: Resolver, path: Path, serially: bool = False) -> None:
+        fields: t.List[t.Tuple[FieldStep, t.FrozenSet[Directive]]] = []
+        self.__collect_fields(parent_directives, fields, steps, resolver)
 
-                resolver_type = gt.assert_selectable(self.__resolve_type(resolver.for_gql_type))
+        if serially or len(fields) == 1:
+            values = [await self.__select_field(directives, step, resolver, path) for step, directives in fields]
+        else:
+            values = await asyncio.gather(
+                *(self.__select_field(directives, step, resolver, path) for step, directives in fields)
+            )
 
-                self.__select(parent_directives, result, frg.selections, resolver_type, resolver)
+        for (step, _), value in zip(fields, values):
+            result[step.response_key] = value
 
-            else:
-                self.__select(parent_directives, result, frg.selections, from_selectable, resolver)
-
-    def __select_field(self, parent_directives: t.MutableSet[Directive], result: t.Dict[str, PrimitiveType],
-                       field_selection: qm.FieldSelection,
-                       field_definition: gt.Field,
-                       resolver: SomeResolver) -> None:
-        with _DirectivesEnv(parent_directives, field_selection.directives, self.directives, self.vars_values,
-                            self.type_registry):
-            for d in parent_directives:
-                if not d.should_select_field(resolver, field_selection.name):
-                    return
-
-            args = _prepare_args(field_selection.arguments, self.vars_values, field_definition.args)
-
-            field_type = field_definition.type(self.type_registry)
-            alias = field_selection.alias if field_selection.alias is not None else field_selection.name
-
-            field_name = field_selection.name
-            if field_name in _py_reserved:
-                field_name = "_" + field_name
-            elif field_name.startswith("__"):
-                field_name = "f" + field_name
-
-            if not hasattr(resolver, field_name):
-                raise GqlExecutionError("Resolver `{}` for `{}` type does not have `{}` attribute".format(
-                    type(resolver).__name__, resolver.for_gql_type, field_name
-                ))
-
-            attr = getattr(resolver, field_name)
-            for d in parent_directives:
-                attr = d.wrap_field(attr, args)
-
-            if len(args) == 0 and not callable(attr):
+    async def __select_field(self, directives: t.FrozenSet[Directive], step: FieldStep,
+                             resolver: Resolver, parent_path: Path) -> PrimitiveType:
+        started = time.perf_counter() if self.field_hooks is not None else 0.0
+        args = _field_args(step, self.vars_values)
+        attr = _field_attr(resolver, step, args, self.field_cache)
+
+        if isinstance(attr, BatchField):
+            field_raw_value = await self.__load(directives, attr, resolver, args)
+        elif self.memo is not None and resolver is not self.mutation_resolver:
+            field_raw_value = await self.__call_memoized(directives, step, resolver, attr, args)
+        else:
+            field_raw_value = await self.__call_field(directives, step, attr, args)
+
+        if self.field_hooks is not None:
+            self.field_hooks.on_field_resolve(
+                parent_path + (step.response_key,), resolver.for_gql_type, step.name, step.field_type, started,
+                time.perf_counter() - started
+            )
+
+        if step.selections is None:
+            return _plain_value(_value_check(self.type_registry, step.field_type, self.result_checks),
+                                resolver, step, field_raw_value)
+
+        return await self.__resolve_subresolvers(
+            directives, step.selections, t.cast(t.FrozenSet[str], step.object_names), resolver, step,
+            step.field_type, field_raw_value, (step.response_key,), parent_path
+        )
+
+    async def __call_field(self, directives: t.FrozenSet[Directive], step: FieldStep, attr: t.Any,
+                           args: t.Mapping[str, PrimitiveType]) -> t.Any:
+        for d in directives:
+            attr = d.wrap_field(attr, args)
+
+        try:
+            if not step.has_args and not callable(attr):
                 field_raw_value = attr
             else:
-                try:
-                    field_raw_value = attr(**args)
-                except Exception as e:
-                    raise GqlExecutionError("Resolver internal error") from e
-
-            if len(field_selection.selections) > 0:
-                result[alias] = self.__process_spreadable_field(
-                    parent_directives, field_type, field_raw_value, field_selection.selections
-                )
-            else:
-                result[alias] = self.__select_plain_field(resolver, field_name, field_type, field_raw_value)
+                field_raw_value = await self.__call(attr, args)
 
-    def __process_spreadable_field(self, parent_directives: t.MutableSet[Directive], field_type: gt.GqlType,
-                                   field_raw_value: t.Any,
-                                   selections: t.Sequence[qm.Selection]) -> PrimitiveType:
+            if inspect.isawaitable(field_raw_value):
+                field_raw_value = await field_raw_value
+        except Exception as e:
+            raise GqlExecutionError("Resolver internal error") from e
 
-        if not self.__resolver_compatible(field_type, field_raw_value):
-            raise GqlExecutionError("Resolver returns non compatible sub-resolver")
+        return field_raw_value
 
-        return self.__resolve_subresolvers(
-            parent_directives,
-            selections,
-            gt.assert_spreadable(self.__resolve_and_unwrap(field_type)),
-            field_raw_value
-        )
+    async def __call_memoized(self, directives: t.FrozenSet[Directive], step: FieldStep, resolver: Resolver,
+                              attr: t.Any, args: t.Mapping[str, PrimitiveType]) -> t.Any:
+        memo = t.cast(t.Dict[_MemoKey, t.Tuple[Resolver, asyncio.Future]], self.memo)
+        key = (id(resolver), step.name, args_key(args))
+
+        memoized = memo.get(key)
+        if memoized is not None:
+            return await memoized[1]
+
+        future = asyncio.get_event_loop().create_future()
+        memo[key] = (resolver, future)
 
-    def __resolver_compatible(self, field_type: gt.GqlType, field_raw_value: t.Any) -> bool:
+        try:
+            future.set_result(await self.__call_field(directives, step, attr, args))
+        except Exception as e:
+            future.set_exception(e)
+            # nobody may wait for the same field, error is raised to the caller anyway
+            future.exception()
+            raise
+
+        return future.result()
+
+    async def __resolve_subresolvers(self, directives: t.FrozenSet[Directive], selections: SelectionSet,
+                                     names: t.FrozenSet[str], resolver: Resolver, step: FieldStep,
+                                     field_type: gt.GqlType, field_raw_value: t.Any, path: Path,
+                                     parent_path: Path) -> PrimitiveType:
         if isinstance(field_type, gt.NonNull):
             if field_raw_value is None:
-                return False
-            return self.__resolver_compatible(field_type.of_type(self.type_registry), field_raw_value)
-
-        if field_raw_value is None:
-            return True
+                raise _non_compatible_error(resolver, step.attr_name, step.field_type, field_raw_value,
+                                            parent_path + path)
+            field_type = field_type.of_type(self.type_registry)
+        elif field_raw_value is None:
+            return None
 
         if isinstance(field_type, gt.List):
             if not isinstance(field_raw_value, list):
-                return False
-            for resolver in field_raw_value:
-                if not self.__resolver_compatible(field_type.of_type(self.type_registry), resolver):
-                    return False
-            return True
-
-        if isinstance(field_type, gt.Interface) or isinstance(field_type, gt.Union):
-            possible_objects = field_type.of_objects(self.type_registry)
-            possible_objects_names = {str(o) for o in possible_objects}
-            return field_raw_value.for_gql_type in possible_objects_names
-
-        if isinstance(field_type, gt.Object):
-            resolver_type = t.cast(t.Optional[str], field_raw_value.for_gql_type)
-            return str(field_type) == resolver_type
-
-        raise RuntimeError("Wrapper or spreadable expected here, but got {}".format(type(field_type).__name__))
-
-    def __resolve_subresolvers(self, parent_directives: t.MutableSet[Directive], selections: t.Sequence[qm.Selection],
-                               field_type: gt.SpreadableType,
-                               field_raw_value: t.Any) -> PrimitiveType:
-        if field_raw_value is None:
-            return None
-
-        if isinstance(field_raw_value, list):
-            result_arr: t.List[PrimitiveType] = []
-            for item_raw_value in field_raw_value:
-                result_arr.append(
-                    self.__resolve_subresolvers(parent_directives, selections, field_type, item_raw_value)
-                )
-            return result_arr
+                raise _non_compatible_error(resolver, step.attr_name, step.field_type, field_raw_value,
+                                            parent_path + path)
+            item_type = field_type.of_type(self.type_registry)
+            return list(await asyncio.gather(*(
+                self.__resolve_subresolvers(directives, selections, names, resolver, step, item_type, item,
+                                            path + (i,), parent_path)
+                for i, item in enumerate(field_raw_value)
+            )))
+
+        if getattr(field_raw_value, "for_gql_type", None) not in names:
+            raise _non_compatible_error(resolver, step.attr_name, step.field_type, field_raw_value, parent_path + path)
 
         result_dict: t.Dict[str, PrimitiveType] = {}
-        self.__select(parent_directives, result_dict, selections, field_type, field_raw_value)
+        await self.__select(directives, result_dict, selections, field_raw_value, parent_path + path)
         return result_dict
 
-    def __select_plain_field(self, resolver: Resolver, field_name: str, field_type: gt.GqlType,
-                             field_raw_value: t.Any) -> PrimitiveType:
-        if not field_type.is_assignable(field_raw_value, self.type_registry):
-            raise GqlExecutionError(
-                "Resolver `{}` for type `{}` returns not assignable value '{}' for field `{}` of type `{}`".format(
-                    type(resolver).__name__, resolver.for_gql_type, json.dumps(field_raw_value), field_name,
-                    str(field_type)
-                )
-            )
+    def __load(self, directives: t.FrozenSet[Directive], field: BatchField, resolver: Resolver,
+               args: t.Mapping[str, PrimitiveType]) -> asyncio.Future:
+        # keys requested until the loop runs scheduled dispatch are loaded together
+        batch_id = (field, args_key(args))
+        key = _batch_key(field, resolver)
+        futures = self.batch_values.setdefault(batch_id, {})
+
+        if key not in futures:
+            futures[key] = asyncio.get_event_loop().create_future()
+
+            pending = self.batch_pending.get(batch_id)
+            if pending is None:
+                pending = self.batch_pending[batch_id] = []
+                asyncio.ensure_future(self.__dispatch(batch_id, directives, field, args))
+            pending.append(key)
+
+        return futures[key]
+
+    async def __call(self, func: t.Callable[..., t.Any], args: t.Mapping[str, PrimitiveType],
+                     *positional: t.Any) -> t.Any:
+        """Call resolver; blocking resolvers are run in the thread pool if executor has one"""
+        if self.thread_pool is None or inspect.iscoroutinefunction(func):
+            return func(*positional, **args)
+
+        call = functools.partial(func, *positional, **args)
+
+        if self.threads_semaphore is None:
+            return await asyncio.get_event_loop().run_in_executor(self.thread_pool, call)
+
+        async with self.threads_semaphore:
+            return await asyncio.get_event_loop().run_in_executor(self.thread_pool, call)
+
+    async def __dispatch(self, batch_id: t.Tuple[BatchField, str], directives: t.FrozenSet[Directive],
+                         field: BatchField, args: t.Mapping[str, PrimitiveType]) -> None:
+        keys = self.batch_pending.pop(batch_id)
+        futures = self.batch_values[batch_id]
+
+        load = field.load
+        for d in directives:
+            load = d.wrap_field(load, args)
+
+        try:
+            try:
+                values = await self.__call(load, args, keys)
+                if inspect.isawaitable(values):
+                    values = await values
+            except Exception as e:
+                raise GqlExecutionError("Resolver internal error") from e
+
+            for k, value in zip(keys, _check_batch(field, keys, values)):
+                futures[k].set_result(value)
+        except GqlExecutionError as e:
+            for k in keys:
+                futures[k].set_exception(e)
+
+
+def _hooked_stream(hooks: ExecutionHooks, operation: qm.Operation, chunks: t.Iterator[bytes]) -> t.Iterator[bytes]:
+    try:
+        yield from chunks
+    except Exception as e:
+        hooks.on_error(e)
+        raise
+    hooks.on_operation_end(operation, None)
+
+
+def _chunks(data: bytes, chunk_size: int) -> t.Iterator[bytes]:
+    return (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+
+def _plan_directives(instances: t.Dict[int, t.Any], own_directives: t.Sequence[qm.Directive],
+                     directives_constructors: t.Mapping[str, t.Callable[..., Directive]],
+                     vars_values: t.Mapping[str, PrimitiveType],
+                     type_registry: gt.TypeRegistry) -> t.Sequence[Directive]:
+    """Directives of the selection, created once per plan if their arguments do not depend on variables"""
+    directives = instances.get(id(own_directives))
+    if directives is not None:
+        return t.cast(t.Sequence[Directive], directives)
+
+    directives = _create_directives(own_directives, directives_constructors, vars_values, type_registry)
+    if all((_is_constant(arg.value) for d in own_directives for arg in d.arguments)):
+        instances[id(own_directives)] = directives
+    return directives
+
+
+def _is_constant(value: qm.Value) -> bool:
+    if isinstance(value, qm.Variable):
+        return False
+    if isinstance(value, qm.ListValue):
+        return all((_is_constant(v) for v in value.values))
+    if isinstance(value, qm.ObjectValue):
+        return all((_is_constant(v) for v in value.values.values()))
+    return True
+
 
-        return t.cast(PrimitiveType, field_raw_value)
+def _create_directives(own_directives: t.Sequence[qm.Directive],
+                       directives_constructors: t.Mapping[str, t.Callable[..., Directive]],
+                       vars_values: t.Mapping[str, PrimitiveType],
+                       type_registry: gt.TypeRegistry) -> t.List[Directive]:
+    directives = []
+    for d in own_directives:
+        d_def = type_registry.directive(d.name)
+        args = _prepare_args(d.arguments, vars_values, d_def.args)
+        directives.append(directives_constructors[d.name](**args))
+    return directives
 
-    def __resolve_type(self, schema_type: t.Union[gt.GqlType, str]) -> gt.GqlType:
-        return self.type_registry.resolve_type(schema_type)
 
-    def __resolve_and_unwrap(self, schema_type: t.Union[gt.GqlType, str]) -> gt.NonWrapperType:
-        return self.type_registry.resolve_and_unwrap(schema_type)
+def _with_defaults(plan: OperationPlan, vars_values: t.Mapping[str, PrimitiveType]) -> t.Mapping[str, PrimitiveType]:
+    values = dict(vars_values)
+    for var in plan.operation.variables:
+        if var.default is not None:
+            values.setdefault(var.name, var.default.to_py_value({}))
+    return values
+
+
+def _field_args(step: FieldStep, vars_values: t.Mapping[str, PrimitiveType]) -> t.Mapping[str, PrimitiveType]:
+    if len(step.dynamic_args) == 0:
+        return step.static_args
+
+    args = dict(step.static_args)
+    for arg_name, value in step.dynamic_args:
+        args[arg_name] = value.to_py_value(vars_values)
+    return args
+
+
+def _field_attr(resolver: Resolver, step: FieldStep, args: t.Mapping[str, PrimitiveType],
+                field_cache: t.Optional[FieldCache]) -> t.Any:
+    attr = getattr(resolver, step.attr_name, _missing)
+    if attr is _missing:
+        raise _missing_attribute_error(resolver, step.attr_name)
+
+    if field_cache is not None and step.field.cache_ttl is not None:
+        return field_cache.wrap(attr, args, step.field.cache_ttl, step.field.cache_scope)
+
+    return attr
+
+
+def _value_check(type_registry: gt.TypeRegistry, field_type: gt.GqlType,
+                 result_checks: str) -> t.Optional[gt.ValueChecker]:
+    if result_checks == "off":
+        return None
+    return field_type.checker(type_registry, result_checks == "sampled")
+
+
+def _plain_value(check: t.Optional[gt.ValueChecker], resolver: Resolver, step: FieldStep,
+                 field_raw_value: t.Any) -> PrimitiveType:
+    if check is not None and not check(field_raw_value):
+        raise _not_assignable_error(resolver, step.attr_name, step.field_type, field_raw_value)
+
+    return t.cast(PrimitiveType, field_raw_value)
+
+
+def _missing_attribute_error(resolver: Resolver, attr_name: str) -> GqlExecutionError:
+    return GqlExecutionError("Resolver `{}` for `{}` type does not have `{}` attribute".format(
+        type(resolver).__name__, resolver.for_gql_type, attr_name
+    ))
+
+
+def _non_compatible_error(resolver: Resolver, attr_name: str, field_type: gt.GqlType, field_raw_value: t.Any,
+                          path: Path) -> GqlExecutionError:
+    if field_raw_value is None:
+        value = "null"
+    elif isinstance(field_raw_value, Resolver):
+        value = "resolver for `{}`".format(field_raw_value.for_gql_type)
+    else:
+        value = "`{}` value".format(type(field_raw_value).__name__)
+
+    return GqlExecutionError(
+        "Resolver `{}` for type `{}` returns non compatible {} at `{}` for field `{}` of type `{}`".format(
+            type(resolver).__name__, resolver.for_gql_type, value, ".".join((str(p) for p in path)), attr_name,
+            str(field_type)
+        )
+    )
+
+
+def _not_assignable_error(resolver: Resolver, attr_name: str, field_type: gt.GqlType,
+                          field_raw_value: t.Any) -> GqlExecutionError:
+    return GqlExecutionError(
+        "Resolver `{}` for type `{}` returns not assignable value '{}' for field `{}` of type `{}`".format(
+            type(resolver).__name__, resolver.for_gql_type, json.dumps(field_raw_value), attr_name, str(field_type)
+        )
+    )
+
+
+def _call_field(directives: t.Iterable[Directive], attr: t.Any, step: FieldStep,
+                args: t.Mapping[str, PrimitiveType]) -> t.Any:
+    for d in directives:
+        attr = d.wrap_field(attr, args)
+
+    if not step.has_args and not callable(attr):
+        return attr
+
+    try:
+        return attr(**args)
+    except Exception as e:
+        raise GqlExecutionError("Resolver internal error") from e
+
+
+def _call_memoized(memo: t.Optional[t.Dict[_MemoKey, t.Tuple[Resolver, t.Any]]], directives: t.Iterable[Directive],
+                   resolver: Resolver, attr: t.Any, step: FieldStep, args: t.Mapping[str, PrimitiveType]) -> t.Any:
+    if memo is None:
+        return _call_field(directives, attr, step, args)
+
+    key = (id(resolver), step.name, args_key(args))
+
+    # resolver is kept with the value, so its id is not reused by another object within the request
+    memoized = memo.get(key)
+    if memoized is None:
+        memoized = memo[key] = (resolver, _call_field(directives, attr, step, args))
+
+    return memoized[1]
+
+
+def _load_batch(batch_values: t.Dict[t.Tuple[BatchField, str], t.Dict[t.Any, t.Any]],
+                directives: t.Iterable[Directive], field: BatchField, keys: t.Sequence[t.Any],
+                args: t.Mapping[str, PrimitiveType]) -> t.Mapping[t.Any, t.Any]:
+    loaded = batch_values.setdefault((field, args_key(args)), {})
+
+    missing = [k for k in dict.fromkeys(keys) if k not in loaded]
+    if len(missing) > 0:
+        load = field.load
+        for d in directives:
+            load = d.wrap_field(load, args)
+
+        try:
+            values = load(missing, **args)
+        except Exception as e:
+            raise GqlExecutionError("Resolver internal error") from e
+
+        loaded.update(zip(missing, _check_batch(field, missing, values)))
+
+    return loaded
+
+
+def _load_one(batch_values: t.Dict[t.Tuple[BatchField, str], t.Dict[t.Any, t.Any]], field: BatchField,
+              resolver: Resolver, args: t.Mapping[str, PrimitiveType]) -> t.Any:
+    key = _batch_key(field, resolver)
+    return _load_batch(batch_values, (), field, [key], args)[key]
+
+
+def _thread_loop() -> asyncio.AbstractEventLoop:
+    """Loop running sync requests of executors with thread pool, created once per thread"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        # loop of the thread can not run nested one
+        raise GqlExecutionError("Executor with thread pool can not run sync requests inside running event loop, "
+                                "await `query_async` instead")
+
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None:
+        loop = _thread_loops.loop = asyncio.new_event_loop()
+    return loop
+
+
+def _result_path(result: PrimitiveType, target: t.Dict[str, PrimitiveType]) -> t.Optional[Path]:
+    if result is target:
+        return ()
+
+    items: t.Iterable[t.Tuple[t.Union[str, int], PrimitiveType]]
+    if isinstance(result, dict):
+        items = result.items()
+    elif isinstance(result, list):
+        items = enumerate(result)
+    else:
+        return None
+
+    for key, value in items:
+        path = _result_path(value, target)
+        if path is not None:
+            return (key,) + path
+    return None
+
+
+def _batch_key(field: BatchField, resolver: Resolver) -> t.Any:
+    return field.key(resolver) if field.key is not None else resolver
+
+
+def _check_batch(field: BatchField, keys: t.Sequence[t.Any], values: t.Any) -> t.Sequence[t.Any]:
+    if not isinstance(values, (list, tuple)) or len(values) != len(keys):
+        raise GqlExecutionError("Batch resolver `{}` must return list of {} values".format(
+            getattr(field.load, "__name__", type(field.load).__name__), len(keys)
+        ))
+    return values
 
 
 def _prepare_args(arguments: t.Sequence[qm.Argument],
@@ -327,11 +1404,10 @@ def _prepare_args(arguments: t.Sequence[qm.Argument],
                   args_def: t.Mapping[str, gt.Argument]) -> t.Mapping[str, PrimitiveType]:
     args_values = {}
     for arg in arguments:
-        name = arg.name if arg.name not in _py_reserved else "_" + arg.name
-        args_values[name] = arg.value.to_py_value(vars_values)
+        args_values[py_arg_name(arg.name)] = arg.value.to_py_value(vars_values)
 
     for arg_name, arg_def in args_def.items():
-        name = arg_name if arg_name not in _py_reserved else "_" + arg_name
-        args_values.setdefault(name, arg_def.default)
+        args_values.setdefault(py_arg_name(arg_name), arg_def.default)
 
     return args_values
+
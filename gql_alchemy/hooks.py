@@ -0,0 +1,86 @@
+import typing as t
+
+import gql_alchemy.query_model as qm
+import gql_alchemy.types as gt
+from .utils import PrimitiveType
+
+Path = t.Tuple[t.Union[str, int], ...]
+
+
+class ExecutionHooks:
+    """Callbacks around execution of requests, override the needed ones
+
+    Times are values of `time.perf_counter()`, durations are in seconds. Fields are timed only if on_field_resolve
+    is overridden, otherwise resolving costs nothing extra.
+    """
+
+    def on_parse(self, query: str, started: float, duration: float) -> None:
+        pass
+
+    def on_validate(self, document: qm.Document, op_to_run: t.Optional[str], started: float, duration: float) -> None:
+        pass
+
+    def on_operation_start(self, operation: qm.Operation, variables: t.Mapping[str, PrimitiveType]) -> None:
+        pass
+
+    def on_operation_end(self, operation: qm.Operation, result: t.Optional[t.Mapping[str, PrimitiveType]]) -> None:
+        """Result is None for streamed operations"""
+        pass
+
+    def on_field_resolve(self, path: Path, parent_type: str, field_name: str, return_type: gt.GqlType,
+                         started: float, duration: float) -> None:
+        pass
+
+    def on_error(self, error: Exception) -> None:
+        pass
+
+    def wants_fields(self) -> bool:
+        return type(self).on_field_resolve is not ExecutionHooks.on_field_resolve
+
+
+class _ComposedHooks(ExecutionHooks):
+    def __init__(self, hooks: t.Sequence[ExecutionHooks]) -> None:
+        self.hooks = hooks
+        self.field_hooks = [h for h in hooks if h.wants_fields()]
+
+    def on_parse(self, query: str, started: float, duration: float) -> None:
+        for h in self.hooks:
+            h.on_parse(query, started, duration)
+
+    def on_validate(self, document: qm.Document, op_to_run: t.Optional[str], started: float, duration: float) -> None:
+        for h in self.hooks:
+            h.on_validate(document, op_to_run, started, duration)
+
+    def on_operation_start(self, operation: qm.Operation, variables: t.Mapping[str, PrimitiveType]) -> None:
+        for h in self.hooks:
+            h.on_operation_start(operation, variables)
+
+    def on_operation_end(self, operation: qm.Operation, result: t.Optional[t.Mapping[str, PrimitiveType]]) -> None:
+        for h in self.hooks:
+            h.on_operation_end(operation, result)
+
+    def on_field_resolve(self, path: Path, parent_type: str, field_name: str, return_type: gt.GqlType,
+                         started: float, duration: float) -> None:
+        for h in self.field_hooks:
+            h.on_field_resolve(path, parent_type, field_name, return_type, started, duration)
+
+    def on_error(self, error: Exception) -> None:
+        for h in self.hooks:
+            h.on_error(error)
+
+    def wants_fields(self) -> bool:
+        return len(self.field_hooks) > 0
+
+
+def compose_hooks(hooks: t.Sequence[t.Optional[ExecutionHooks]]) -> t.Optional[ExecutionHooks]:
+    """Single hooks object calling all given hooks in order, None without hooks"""
+    present = [h for h in hooks if h is not None]
+
+    if len(present) == 0:
+        return None
+    if len(present) == 1:
+        return present[0]
+    return _ComposedHooks(present)
+
+
+__all__ = ["Path", "ExecutionHooks", "compose_hooks"]
@@ -1,3 +1,4 @@
+import itertools
 import json
 import logging
 import re
@@ -5,7 +6,7 @@ import typing as t
 
 import gql_alchemy.query_model as qm
 from .errors import GqlParsingError
-from .raw_reader import Reader, format_position
+from .raw_reader import Reader, tokenize, token_values, format_position
 from .utils import PrimitiveType, add_if_not_empty, add_if_not_none
 
 logger = logging.getLogger("gql_alchemy")
@@ -30,6 +31,13 @@ def log_position(reader: Reader) -> None:
         logger.debug(line)
 
 
+def verify_document(document: qm.Document) -> None:
+    """Check variables and fragments usage; fragments reachable from each operation are saved to the document"""
+    verify = VerifyDocument()
+    document.visit(verify)
+    document.operation_fragments = verify.operation_fragments
+
+
 class VerifyDocument(qm.QueryVisitor):
     def __init__(self) -> None:
         self.__current_op_name: t.Optional[str] = None
@@ -40,6 +48,9 @@ class VerifyDocument(qm.QueryVisitor):
         self.__direct_fragments_variables: t.Dict[str, t.MutableSet[str]] = {}
         self.__fragments_variables: t.Dict[str, t.Dict[str, t.MutableSet[str]]] = {}  # fragment -> (var -> fragment)
 
+        # operation name -> fragments it spreads directly or through other fragments
+        self.operation_fragments: t.Dict[t.Optional[str], t.FrozenSet[str]] = {}
+
     def visit_query_begin(self, query: qm.Query) -> None:
         self.__current_op_name = query.name if query.name is not None else "!non-named"
         self.__o2f_calls[self.__current_op_name] = set()
@@ -97,6 +108,12 @@ class VerifyDocument(qm.QueryVisitor):
 
                 self.__verify_fragment_vars(op, fr)
 
+        for op, frs in self.__o2f_calls.items():
+            reachable: t.Set[str] = set()
+            for fr in frs:
+                self.__collect_reachable(fr, reachable)
+            self.operation_fragments[None if op == "!non-named" else op] = frozenset(reachable)
+
         called_from_ops = set(self.__fragments_variables.keys())
         defined = set(self.__direct_fragments_variables.keys())
         unused = list(defined.difference(called_from_ops))
@@ -106,6 +123,13 @@ class VerifyDocument(qm.QueryVisitor):
                 ", ".join(('`' + f + '`' for f in unused))
             ))
 
+    def __collect_reachable(self, fr: str, reachable: t.Set[str]) -> None:
+        if fr in reachable:
+            return
+        reachable.add(fr)
+        for called_fr in self.__f2f_calls[fr]:
+            self.__collect_reachable(called_fr, reachable)
+
     def __check_cycles_and_collect_variables(self, fr: str, visited: t.MutableSet[str]) -> None:
         if fr in self.__fragments_variables:
             return
@@ -146,7 +170,21 @@ class VerifyDocument(qm.QueryVisitor):
                 )
 
 
-def parse_document(text_input: str) -> qm.Document:
+STACK_ENGINE = "stack"
+DESCENT_ENGINE = "descent"
+
+# selection sets, list and object values and list types nested deeper are rejected by the descent engine before
+# its recursion reaches the interpreter limit
+MAX_DEPTH = 128
+
+
+def parse_document(text_input: str, engine: str = DESCENT_ENGINE) -> qm.Document:
+    if engine == DESCENT_ENGINE:
+        return DescentParser(text_input).parse(DescentParser.parse_document)
+
+    if engine != STACK_ENGINE:
+        raise ValueError("Unknown parser engine: {}".format(engine))
+
     document: t.List[qm.Document] = []
 
     def set_document(d: qm.Document) -> None:
@@ -237,9 +275,10 @@ NAME_RE = re.compile(r'[_A-Za-z][_0-9A-Za-z]*')
 class ElementParser:
     @staticmethod
     def assert_ch(reader: Reader, ch: str) -> None:
-        next_ch = reader.read_ch()
+        next_ch = reader.lookup_ch()
         if next_ch != ch:
             raise LiteralExpected([ch], reader)
+        reader.read_ch()
 
     @staticmethod
     def assert_literal(reader: Reader, literal: str) -> None:
@@ -332,7 +371,7 @@ class DocumentParser(ElementParser):
         raise GqlParsingError("One of top-level declaration expected", reader)
 
     def __verify_and_set_document(self, document: qm.Document) -> None:
-        document.visit(VerifyDocument())
+        verify_document(document)
 
         self.set_document(document)
 
@@ -1148,7 +1187,439 @@ class FragmentParser(ElementParser):
         return d
 
 
-__all__ = ["parse_document", "parse", "ElementParser", "DocumentParser", "OperationParser", "VariablesParser",
+_ESCAPE_RE = re.compile(r'\\(?:u[0-9A-Fa-f]{4}|.)')
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+
+    def replace(m: t.Match[str]) -> str:
+        escape = m.group(0)
+        if escape[1] == "u":
+            return chr(int(escape[2:], 16))
+        return _ESCAPES[escape[1]]
+
+    return _ESCAPE_RE.sub(replace, value)
+
+
+_NAME_START = frozenset("_ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+_NUMBER_START = frozenset("-0123456789")
+
+RuleResult = t.TypeVar("RuleResult")
+
+
+class DescentParser:
+    """Recursive descent over token values, builds the same model as the element parsers"""
+
+    # punctuators, names, numbers and strings never share a value, so rules compare values directly; token
+    # offsets are only computed to report an error
+
+    def __init__(self, text_input: str) -> None:
+        self.text_input = text_input
+        self.values = token_values(text_input)
+        self.pos = 0
+        self.depth = 0
+
+    def parse(self, rule: t.Callable[['DescentParser'], RuleResult]) -> RuleResult:
+        result = rule(self)
+
+        if self.values[self.pos] != "":
+            raise self.__error("Not all input parsed", self.__offset())
+
+        return result
+
+    def parse_document(self) -> qm.Document:
+        values = self.values
+
+        operations: t.List[qm.Operation] = []
+        fragments: t.List[qm.NamedFragment] = []
+
+        selection_allowed = True
+        query_allowed = True
+
+        while True:
+            value = values[self.pos]
+            ch = value[:1]
+
+            if selection_allowed and ch == "{":
+                selection_allowed = False
+                query_allowed = False
+                operations.append(qm.Query(None, [], [], self.parse_selections(None)))
+            elif ch == "m":
+                operations.append(self.parse_operation("mutation", operations))
+            elif query_allowed and ch == "q":
+                selection_allowed = False
+                operations.append(self.parse_operation("query", operations))
+            elif ch == "f":
+                fragments.append(self.parse_fragment(fragments))
+            elif value == "":
+                break
+            else:
+                raise self.__error("One of top-level declaration expected", self.__offset())
+
+        document = qm.Document(operations, fragments)
+        verify_document(document)
+
+        return document
+
+    def parse_operation(self, operation_type: str, operations: t.Sequence[qm.Operation]) -> qm.Operation:
+        self.__expect(operation_type)
+
+        values = self.values
+        value = values[self.pos]
+
+        name: t.Optional[str] = None
+
+        if value not in {"(", "@", "{"}:
+            if value[:1] not in _NAME_START:
+                raise self.__error("One of `name`, '(', '@' or '{' expected", self.__offset())
+            self.pos += 1
+            name = value
+
+        if name in {op.name for op in operations}:
+            raise self.__error("Operation with the same name already exists",
+                               self.__offset() if name is None else self.__end_of_previous())
+
+        variables: t.List[qm.VariableDefinition] = []
+        directives: t.List[qm.Directive] = []
+        expected = ["(", "@", "{"]
+
+        if values[self.pos] == "(":
+            variables = self.parse_variables()
+            expected = ["@", "{"]
+
+        if values[self.pos] == "@":
+            directives = self.parse_directives()
+            expected = ["{"]
+
+        if values[self.pos] != "{":
+            raise LiteralExpected(expected, self.__reader_at(self.__offset()))
+
+        selections = self.parse_selections(None)
+
+        if operation_type == "query":
+            return qm.Query(name, variables, directives, selections)
+        return qm.Mutation(name, variables, directives, selections)
+
+    def parse_variables(self) -> t.List[qm.VariableDefinition]:
+        self.__expect("(")
+
+        variables: t.List[qm.VariableDefinition] = []
+
+        while True:
+            value = self.values[self.pos]
+
+            if value == "$":
+                variables.append(self.parse_variable_definition(variables))
+            elif value == ")":
+                if len(variables) == 0:
+                    raise self.__error("Empty variable definition is not allowed", self.__offset())
+                self.pos += 1
+                return variables
+            else:
+                raise LiteralExpected(["$", ")"], self.__reader_at(self.__offset()))
+
+    def parse_variable_definition(self, variables: t.Sequence[qm.VariableDefinition]) -> qm.VariableDefinition:
+        self.__expect("$")
+
+        name = self.__name()
+
+        if name in {v.name for v in variables}:
+            raise self.__error("Variable with the same name already defined", self.__end_of_previous())
+
+        self.__expect(":")
+
+        var_type = self.parse_type()
+
+        default: t.Optional[qm.ConstValue] = None
+
+        if self.__skip("="):
+            default = self.parse_const_value()
+
+        return qm.VariableDefinition(name, var_type, default)
+
+    def parse_type(self) -> qm.Type:
+        if self.__skip("["):
+            self.__nest()
+            el_type = self.parse_type()
+            self.__expect("]")
+            self.depth -= 1
+            return qm.ListType(el_type, not self.__skip("!"))
+
+        return qm.NamedType(self.__name(), not self.__skip("!"))
+
+    def parse_directives(self) -> t.List[qm.Directive]:
+        values = self.values
+        directives: t.List[qm.Directive] = []
+
+        while values[self.pos] == "@":
+            self.pos += 1
+            name = self.__name()
+
+            if values[self.pos] == "(":
+                directives.append(qm.Directive(name, self.parse_arguments()))
+            else:
+                directives.append(qm.Directive(name, []))
+
+        return directives
+
+    def parse_arguments(self) -> t.List[qm.Argument]:
+        self.__expect("(")
+
+        arguments: t.List[qm.Argument] = []
+
+        while not self.__skip(")"):
+            name = self.__name()
+
+            if name in {a.name for a in arguments}:
+                raise self.__error("Argument with the same name already defined", self.__end_of_previous())
+
+            self.__expect(":")
+
+            arguments.append(qm.Argument(name, self.parse_value()))
+
+        if len(arguments) == 0:
+            raise self.__error("Empty arguments list is not allowed", self.__end_of_previous())
+
+        return arguments
+
+    def parse_selections(self, selected_aliases: t.Optional[t.MutableSet[str]]) -> t.List[qm.Selection]:
+        self.__expect("{")
+        self.__nest()
+
+        if selected_aliases is None:
+            selected_aliases = set()
+
+        values = self.values
+        selections: t.List[qm.Selection] = []
+
+        while True:
+            value = values[self.pos]
+
+            if value == "}":
+                self.pos += 1
+
+                if len(selections) == 0:
+                    raise self.__error("Empty selection set is not allowed", self.__end_of_previous())
+
+                self.depth -= 1
+                return selections
+
+            if value[:1] == ".":
+                after_ellipsis = values[self.pos + 1]
+                if after_ellipsis[:1] in _NAME_START and after_ellipsis != "on":
+                    selections.append(self.parse_fragment_spread())
+                else:
+                    selections.append(self.parse_inline_fragment(selected_aliases))
+            else:
+                selections.append(self.parse_field(selected_aliases))
+
+    def parse_field(self, selected_aliases: t.MutableSet[str]) -> qm.FieldSelection:
+        name = self.__name()
+
+        if name in selected_aliases:
+            raise self.__error("Selection under `{}` alias already defined".format(name), self.__end_of_previous())
+        selected_aliases.add(name)
+
+        alias: t.Optional[str] = None
+
+        if self.__skip(":"):
+            alias = name
+            name = self.__name()
+
+        values = self.values
+
+        arguments: t.List[qm.Argument] = []
+        directives: t.List[qm.Directive] = []
+        selections: t.List[qm.Selection] = []
+
+        if values[self.pos] == "(":
+            arguments = self.parse_arguments()
+
+        if values[self.pos] == "@":
+            directives = self.parse_directives()
+
+        if values[self.pos] == "{":
+            selections = self.parse_selections(None)
+
+        return qm.FieldSelection(alias, name, arguments, directives, selections)
+
+    def parse_value(self) -> qm.Value:
+        return t.cast(qm.Value, self.__parse_value(False))
+
+    def parse_const_value(self) -> qm.ConstValue:
+        return t.cast(qm.ConstValue, self.__parse_value(True))
+
+    def __parse_value(self, const: bool) -> t.Union[qm.Value, qm.ConstValue]:
+        value = self.values[self.pos]
+        ch = value[:1]
+
+        if ch in _NAME_START:
+            self.pos += 1
+
+            if value == "true":
+                return qm.BoolValue(True)
+            if value == "false":
+                return qm.BoolValue(False)
+            if value == "null":
+                return qm.NullValue()
+            return qm.EnumValue(value)
+
+        if ch in _NUMBER_START and value != "-":
+            self.pos += 1
+
+            if "." in value or "e" in value or "E" in value:
+                return qm.FloatValue(float(value))
+            return qm.IntValue(int(value))
+
+        if ch == '"':
+            return self.parse_string_value()
+
+        if ch == "$":
+            if const:
+                raise self.__error("Unexpected '$'", self.__offset())
+            self.pos += 1
+            return qm.Variable(self.__name())
+
+        if ch == "[":
+            self.pos += 1
+            self.__nest()
+            items = []
+
+            while not self.__skip("]"):
+                items.append(self.__parse_value(const))
+            self.depth -= 1
+
+            if const:
+                return qm.ConstListValue(items)
+            return qm.ListValue(items)
+
+        if ch == "{":
+            self.pos += 1
+            self.__nest()
+            fields = {}
+
+            while not self.__skip("}"):
+                name = self.__name()
+                self.__expect(":")
+                fields[name] = self.__parse_value(const)
+            self.depth -= 1
+
+            if const:
+                return qm.ConstObjectValue(fields)
+            return qm.ObjectValue(fields)
+
+        raise self.__error("Value expected", self.__offset())
+
+    def parse_string_value(self) -> qm.StrValue:
+        value = self.values[self.pos]
+
+        if len(value) > 1 and value[0] == '"':
+            self.pos += 1
+            return qm.StrValue(_unescape(value[1:-1]))
+
+        if value != '"':
+            raise LiteralExpected(['"'], self.__reader_at(self.__offset()))
+
+        # lexer did not recognize the literal, walk it char by char to report the exact problem
+        reader = self.__reader_at(self.__offset())
+        reader.index += 1
+        StringValueParser(lambda v: None).next(reader)
+
+        raise RuntimeError("String literal rejected by lexer was accepted by parser")
+
+    def parse_fragment_spread(self) -> qm.FragmentSpread:
+        self.__expect("...")
+
+        name = self.__name()
+
+        return qm.FragmentSpread(name, self.parse_directives())
+
+    def parse_inline_fragment(self, selected_aliases: t.MutableSet[str]) -> qm.InlineFragment:
+        self.__expect("...")
+
+        on_type: t.Optional[qm.NamedType] = None
+
+        if self.__skip("on"):
+            on_type = qm.NamedType(self.__name(), True)
+
+        directives = self.parse_directives()
+
+        return qm.InlineFragment(on_type, directives, self.parse_selections(selected_aliases))
+
+    def parse_fragment(self, fragments: t.Sequence[qm.NamedFragment]) -> qm.NamedFragment:
+        self.__expect("fragment")
+
+        name = self.__name()
+
+        if name == "on":
+            raise self.__error("Fragment can not have name \"on\"", self.__end_of_previous())
+
+        if name in {f.name for f in fragments}:
+            raise self.__error("Fragment with the same name already defined", self.__end_of_previous())
+
+        self.__expect("on")
+
+        on_type = qm.NamedType(self.__name(), True)
+
+        directives = self.parse_directives()
+
+        return qm.NamedFragment(name, on_type, directives, self.parse_selections(None))
+
+    def __expect(self, value: str) -> None:
+        if self.values[self.pos] != value:
+            raise LiteralExpected([value], self.__reader_at(self.__offset()))
+
+        self.pos += 1
+
+    def __skip(self, value: str) -> bool:
+        if self.values[self.pos] == value:
+            self.pos += 1
+            return True
+
+        return False
+
+    def __name(self) -> str:
+        value = self.values[self.pos]
+
+        if value[:1] not in _NAME_START:
+            raise self.__error("Name expected", self.__offset())
+
+        self.pos += 1
+
+        return value
+
+    def __nest(self) -> None:
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise self.__error("Nesting deeper than {} levels is not allowed".format(MAX_DEPTH),
+                               self.__end_of_previous())
+
+    def __offset(self, pos: t.Optional[int] = None) -> int:
+        token = next(itertools.islice(tokenize(self.text_input), self.pos if pos is None else pos, None), None)
+
+        if token is None:
+            return len(self.text_input)
+
+        return token.offset
+
+    def __end_of_previous(self) -> int:
+        return self.__offset(self.pos - 1) + len(self.values[self.pos - 1])
+
+    def __reader_at(self, index: int) -> Reader:
+        reader = Reader(self.text_input)
+        reader.index = index
+        reader.lineno = self.text_input.count("\n", 0, index) + 1
+        return reader
+
+    def __error(self, msg: str, index: int) -> GqlParsingError:
+        return GqlParsingError(msg, self.__reader_at(index))
+
+
+__all__ = ["parse_document", "parse", "verify_document", "STACK_ENGINE", "DESCENT_ENGINE", "MAX_DEPTH", "DescentParser",
+           "ElementParser", "DocumentParser", "OperationParser", "VariablesParser",
            "VariableDefinitionParser", "DirectivesParser", "DirectiveParser", "ArgumentsParser",
            "ArgumentParser", "SelectionsParser", "FieldParser", "ValueParser", "ConstValueParser",
            "ListValueParser", "ConstListValueParser", "ObjectValueParser", "ConstObjectValueParser",
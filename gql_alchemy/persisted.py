@@ -0,0 +1,155 @@
+import hashlib
+import importlib.util
+import os
+import types
+import typing as t
+
+from .cache import LruCache
+from .errors import GqlPersistedQueryError
+from .executor import Executor, PreparedQuery
+from .utils import PrimitiveType
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class PersistedQueryStorage:
+    """Texts of persisted queries by their SHA-256 hashes"""
+
+    def get(self, sha256: str) -> t.Optional[str]:
+        raise NotImplementedError()
+
+    def put(self, sha256: str, query: str) -> None:
+        raise NotImplementedError()
+
+
+class MemoryStorage(PersistedQueryStorage):
+    def __init__(self) -> None:
+        self.__queries: t.Dict[str, str] = {}
+
+    def get(self, sha256: str) -> t.Optional[str]:
+        return self.__queries.get(sha256)
+
+    def put(self, sha256: str, query: str) -> None:
+        self.__queries[sha256] = query
+
+
+class DirectoryStorage(PersistedQueryStorage):
+    """Keeps every query in `<hash>.graphql` file of the directory"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def get(self, sha256: str) -> t.Optional[str]:
+        try:
+            with open(self.__file(sha256), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, sha256: str, query: str) -> None:
+        file_name = self.__file(sha256)
+        tmp_name = "{}.{}.tmp".format(file_name, os.getpid())
+        with open(tmp_name, "w", encoding="utf-8") as f:
+            f.write(query)
+        os.replace(tmp_name, file_name)
+
+    def __file(self, sha256: str) -> str:
+        return os.path.join(self.path, _checked_hash(sha256) + ".graphql")
+
+
+def compiled_module_name(sha256: str) -> str:
+    return "q_" + _checked_hash(sha256)
+
+
+def load_compiled_module(path: str, sha256: str) -> t.Optional[types.ModuleType]:
+    """Module of the query written to the directory by `python -m gql_alchemy.compile`, None if there is no such"""
+    name = compiled_module_name(sha256)
+    file_name = os.path.join(path, name + ".py")
+    if not os.path.exists(file_name):
+        return None
+
+    spec = importlib.util.spec_from_file_location(name, file_name)
+    module = importlib.util.module_from_spec(spec)
+    t.cast(t.Any, spec.loader).exec_module(module)
+    return module
+
+
+def _checked_hash(sha256: str) -> str:
+    if len(sha256) != 64 or any((c not in "0123456789abcdef" for c in sha256)):
+        raise GqlPersistedQueryError("Wrong persisted query hash `{}`".format(sha256))
+    return sha256
+
+
+class PersistedQueries:
+    """Queries executed by SHA-256 hash of their text
+
+    Queries are registered up front or, unless only allowed queries can run, on the first request that sends both
+    hash and text. Prepared queries of the most recent hashes are kept in memory. Queries compiled to compiled_path
+    by `python -m gql_alchemy.compile` are loaded from their modules and count as registered.
+    """
+
+    def __init__(self, executor: Executor, storage: t.Optional[PersistedQueryStorage] = None,
+                 allow_list_only: bool = False, cache_size: int = 1000,
+                 compiled_path: t.Optional[str] = None) -> None:
+        self.executor = executor
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.allow_list_only = allow_list_only
+        self.prepared: LruCache[str, PreparedQuery] = LruCache(cache_size)
+        self.compiled_path = compiled_path
+
+    def register(self, query: str) -> str:
+        sha256 = query_hash(query)
+        self.__register(sha256, query)
+        return sha256
+
+    def __register(self, sha256: str, query: str) -> PreparedQuery:
+        prepared = self.executor.prepare(query)
+        self.storage.put(sha256, query)
+        self.prepared.put(sha256, prepared)
+        return prepared
+
+    def resolve(self, sha256: str, query: t.Optional[str] = None) -> PreparedQuery:
+        prepared = self.prepared.get(sha256)
+        if prepared is not None:
+            return prepared
+
+        if self.compiled_path is not None:
+            module = load_compiled_module(self.compiled_path, sha256)
+            if module is not None:
+                prepared = self.executor.load_compiled(module)
+                self.prepared.put(sha256, prepared)
+                return prepared
+
+        stored_query = self.storage.get(sha256)
+
+        if stored_query is None:
+            if query is None:
+                raise GqlPersistedQueryError("Persisted query `{}` not found".format(sha256))
+            if self.allow_list_only:
+                raise GqlPersistedQueryError("Persisted query `{}` is not allowed".format(sha256))
+            if query_hash(query) != sha256:
+                raise GqlPersistedQueryError("Query does not match `{}` hash".format(sha256))
+            return self.__register(sha256, query)
+
+        prepared = self.executor.prepare(stored_query)
+        self.prepared.put(sha256, prepared)
+        return prepared
+
+    def query(self, sha256: str, variables: t.Mapping[str, PrimitiveType], op_to_run: t.Optional[str] = None,
+              query: t.Optional[str] = None) -> PrimitiveType:
+        return self.executor.query(self.resolve(sha256, query), variables, op_to_run)
+
+    async def query_async(self, sha256: str, variables: t.Mapping[str, PrimitiveType],
+                          op_to_run: t.Optional[str] = None, query: t.Optional[str] = None) -> PrimitiveType:
+        return await self.executor.query_async(self.resolve(sha256, query), variables, op_to_run)
+
+    def query_stream(self, sha256: str, variables: t.Mapping[str, PrimitiveType], op_to_run: t.Optional[str] = None,
+                     query: t.Optional[str] = None, chunk_size: int = 8192) -> t.Iterator[bytes]:
+        return self.executor.query_stream(self.resolve(sha256, query), variables, op_to_run, chunk_size)
+
+
+__all__ = ["query_hash", "PersistedQueryStorage", "MemoryStorage", "DirectoryStorage", "compiled_module_name",
+           "load_compiled_module", "PersistedQueries"]
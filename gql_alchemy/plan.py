@@ -0,0 +1,319 @@
+import types
+import typing as t
+
+import gql_alchemy.query_model as qm
+import gql_alchemy.types as gt
+from .utils import PrimitiveType
+
+_py_reserved = {
+    "False", "class", "finally", "is", "return",
+    "None", "continue", "for", "lambda", "try",
+    "True", "def", "from", "nonlocal", "while",
+    "and", "del", "global", "not", "with",
+    "as", "elif", "if", "or", "yield",
+    "assert", "else", "import", "pass",
+    "break", "except", "in", "raise"
+}
+
+
+def py_arg_name(name: str) -> str:
+    if name in _py_reserved:
+        return "_" + name
+    return name
+
+
+def py_attr_name(name: str) -> str:
+    if name in _py_reserved:
+        return "_" + name
+    if name.startswith("__"):
+        return "f" + name
+    return name
+
+
+# `skip` and `include` directives, selection merged from several selections has their conditions as list of
+# alternatives, see conditions_hold
+Conditions = t.Sequence[t.Union[qm.Directive, t.Sequence[t.Sequence[qm.Directive]]]]
+
+
+class FieldStep:
+    def __init__(self, response_key: str, name: str, field: gt.Field, field_type: gt.GqlType,
+                 static_args: t.Mapping[str, PrimitiveType],
+                 dynamic_args: t.Sequence[t.Tuple[str, qm.Value]],
+                 directives: t.Sequence[qm.Directive],
+                 selections: t.Optional['SelectionSet'],
+                 object_names: t.Optional[t.FrozenSet[str]] = None,
+                 conditions: Conditions = (),
+                 repeated: bool = False) -> None:
+        self.response_key = response_key
+        self.name = name
+        self.attr_name = py_attr_name(name)
+        self.field = field
+        self.field_type = field_type
+        self.static_args = static_args
+        self.dynamic_args = dynamic_args
+        self.has_args = len(static_args) > 0 or len(dynamic_args) > 0
+        self.directives = directives
+        self.selections = selections
+        # objects resolvers of the field values may resolve, for fields with selections
+        self.object_names = object_names
+        # `skip` and `include` depending on variables, see conditions_hold
+        self.conditions = conditions
+        # response key is also selected by an earlier field of the object, the first selected one is written
+        self.repeated = repeated
+
+
+class FragmentStep:
+    def __init__(self, directives: t.Sequence[qm.Directive],
+                 selections: t.Optional['SelectionSet'],
+                 selections_by_object: t.Optional[t.Mapping[str, 'SelectionSet']],
+                 conditions: t.Sequence[qm.Directive] = ()) -> None:
+        self.directives = directives
+        self.conditions = conditions
+        # fragment without type condition
+        self.selections = selections
+        # fragment with type condition, selections compiled for every object matching it
+        self.selections_by_object = selections_by_object
+
+
+SelectionSet = t.Sequence[t.Union[FieldStep, FragmentStep]]
+
+
+class OperationPlan:
+    def __init__(self, operation: qm.Operation, root_object: gt.Object, selections: SelectionSet) -> None:
+        self.operation = operation
+        self.root_object = root_object
+        self.selections = selections
+
+        self.has_directives = _has_directives(operation.directives, selections)
+
+        # result of such operation depends on schema only and can be computed once
+        self.introspection_only = (
+            isinstance(operation, qm.Query)
+            and len(operation.variables) == 0
+            and all((type(step) is FieldStep and step.name in _introspection_fields for step in selections))
+            and not self.has_directives
+        )
+        self.result_json: t.Optional[str] = None
+
+        # function generated for the operation by executor with codegen, False if it can not be generated
+        self.compiled: t.Any = None
+
+        # directives with constant arguments are created by executor once, keyed by id of the directives list
+        self.directive_instances: t.Dict[int, t.Any] = {}
+
+
+_introspection_fields = {"__schema", "__type"}
+
+
+def _has_directives(directives: t.Sequence[qm.Directive], selections: SelectionSet) -> bool:
+    if len(directives) > 0:
+        return True
+
+    for step in selections:
+        if len(step.directives) > 0 or len(step.conditions) > 0:
+            return True
+
+        if isinstance(step, FragmentStep) and step.selections_by_object is not None:
+            nested = list(step.selections_by_object.values())
+        else:
+            nested = [step.selections] if step.selections is not None else []
+
+        if any((_has_directives((), n) for n in nested)):
+            return True
+
+    return False
+
+
+_conditions = {"skip", "include"}
+
+
+def conditions_hold(conditions: Conditions, vars_values: t.Mapping[str, PrimitiveType]) -> bool:
+    """Whether selection with these `skip` and `include` directives is selected"""
+    for d in conditions:
+        if isinstance(d, qm.Directive):
+            if bool(d.arguments[0].value.to_py_value(vars_values)) == (d.name == "skip"):
+                return False
+        elif not any((conditions_hold(alternative, vars_values) for alternative in d)):
+            return False
+    return True
+
+
+def _split_directives(
+        directives: t.Sequence[qm.Directive]
+) -> t.Optional[t.Tuple[t.List[qm.Directive], t.List[qm.Directive]]]:
+    """Directives and conditions left for runtime, None if constant conditions never select the selection"""
+    others: t.List[qm.Directive] = []
+    conditions: t.List[qm.Directive] = []
+
+    for d in directives:
+        if d.name not in _conditions:
+            others.append(d)
+        elif isinstance(d.arguments[0].value, qm.Variable):
+            conditions.append(d)
+        elif not conditions_hold([d], {}):
+            return None
+
+    return others, conditions
+
+
+_scalar_values = (qm.IntValue, qm.FloatValue, qm.StrValue, qm.BoolValue, qm.EnumValue, qm.NullValue)
+
+
+# field selected under the response key with its own and enclosing fragments directives and conditions
+_Occurrence = t.Tuple[qm.FieldSelection, t.List[qm.Directive], t.List[qm.Directive]]
+
+
+class _PlanCompiler:
+    def __init__(self, type_registry: gt.TypeRegistry, document: qm.Document) -> None:
+        self.__type_registry = type_registry
+        self.__fragments = dict(((f.name, f) for f in document.fragments))
+        # the same fragment is compiled once per type it is selected from; selections are kept with the steps,
+        # so ids of merged sub-selections lists are not reused
+        self.__compiled: t.Dict[t.Tuple[int, str], t.Tuple[t.Sequence[qm.Selection], SelectionSet]] = {}
+
+    def compile_selections(self, selections: t.Sequence[qm.Selection],
+                           from_selectable: gt.SpreadableType) -> SelectionSet:
+        key = (id(selections), str(from_selectable))
+
+        if key in self.__compiled:
+            return self.__compiled[key][1]
+
+        steps: t.List[t.Union[FieldStep, FragmentStep]] = []
+
+        if not isinstance(from_selectable, gt.Object) and any((
+                not isinstance(sel, qm.FieldSelection) for sel in selections
+        )):
+            # fields of abstract type and its fragments are collected for every object it can be
+            steps.append(FragmentStep((), None, dict(
+                ((str(o), self.compile_selections(selections, o)) for o in _possible_objects(from_selectable,
+                                                                                              self.__type_registry))
+            )))
+        else:
+            # fields that can not be merged may share the response key when selected from different fragments
+            response_keys: t.Set[str] = set()
+            for group in self.__collect_fields(selections, from_selectable, [], {}, ()):
+                step = self.__compile_field(group, from_selectable, response_keys)
+                response_keys.add(step.response_key)
+                steps.append(step)
+
+        self.__compiled[key] = (selections, steps)
+
+        return steps
+
+    def __collect_fields(self, selections: t.Sequence[qm.Selection], from_selectable: gt.SpreadableType,
+                         groups: t.List[t.List[_Occurrence]],
+                         by_response_key: t.Dict[str, t.List[_Occurrence]],
+                         outer_directives: t.Sequence[qm.Directive]) -> t.List[t.List[_Occurrence]]:
+        """Group fields by response key, fragments are merged into selections with their directives"""
+        for sel in selections:
+            if isinstance(sel, qm.FieldSelection):
+                split = _split_directives(list(outer_directives) + list(sel.directives))
+                if split is None:
+                    continue
+
+                response_key = sel.alias if sel.alias is not None else sel.name
+                group = by_response_key.get(response_key)
+
+                if group is not None and _same_field(group[0][0], sel):
+                    group.append((sel, split[0], split[1]))
+                else:
+                    by_response_key[response_key] = [(sel, split[0], split[1])]
+                    groups.append(by_response_key[response_key])
+                continue
+
+            if isinstance(sel, qm.FragmentSpread):
+                fragment: qm.Fragment = self.__fragments[sel.fragment_name]
+                directives: t.Sequence[qm.Directive] = list(sel.directives) + list(fragment.directives)
+            else:
+                fragment = t.cast(qm.InlineFragment, sel)
+                directives = sel.directives
+
+            if _split_directives(directives) is None:
+                continue
+
+            # fragments are collected for objects only, see compile_selections
+            if fragment.on_type is not None:
+                on_type = gt.assert_spreadable(self.__type_registry.resolve_type(fragment.on_type.name))
+                if str(from_selectable) not in self.__type_registry.possible_object_names(on_type):
+                    continue
+
+            self.__collect_fields(fragment.selections, from_selectable, groups, by_response_key,
+                                  list(outer_directives) + list(directives))
+
+        return groups
+
+    def __compile_field(self, group: t.Sequence[_Occurrence], from_selectable: gt.SpreadableType,
+                        response_keys: t.AbstractSet[str]) -> FieldStep:
+        sel = group[0][0]
+        field = gt.assert_selectable(from_selectable).fields(self.__type_registry)[sel.name]
+        field_type = field.type(self.__type_registry)
+
+        static_args: t.Dict[str, PrimitiveType] = {}
+        dynamic_args: t.List[t.Tuple[str, qm.Value]] = []
+
+        for arg in sel.arguments:
+            # scalars are immutable and can be shared between requests
+            if isinstance(arg.value, _scalar_values):
+                static_args[py_arg_name(arg.name)] = arg.value.to_py_value({})
+            else:
+                dynamic_args.append((py_arg_name(arg.name), arg.value))
+
+        for arg_name, arg_def in field.args.items():
+            static_args.setdefault(py_arg_name(arg_name), arg_def.default)
+
+        selections: t.Optional[SelectionSet] = None
+        object_names: t.Optional[t.FrozenSet[str]] = None
+
+        # directives of all selections apply to the field
+        directives: t.List[qm.Directive] = []
+        for _, others, _ in group:
+            directives.extend((d for d in others if d not in directives))
+
+        conditions: Conditions = group[0][2]
+        sub_selections = sel.selections
+        if len(group) > 1:
+            # field is selected if any of its selections is, their sub-selections only with them
+            alternatives = [c for _, _, c in group]
+            conditions = [alternatives] if all((len(c) > 0 for c in alternatives)) else []
+            sub_selections = []
+            for g, _, g_conditions in group:
+                if len(g_conditions) > 0 and len(g.selections) > 0:
+                    sub_selections.append(qm.InlineFragment(None, g_conditions, g.selections))
+                else:
+                    sub_selections.extend(g.selections)
+
+        if len(sub_selections) > 0:
+            spreadable = gt.assert_spreadable(self.__type_registry.resolve_and_unwrap(field_type))
+            selections = self.compile_selections(sub_selections, spreadable)
+            object_names = self.__type_registry.possible_object_names(spreadable)
+
+        response_key = sel.alias if sel.alias is not None else sel.name
+        return FieldStep(
+            response_key, sel.name, field, field_type, types.MappingProxyType(static_args), dynamic_args,
+            directives, selections, object_names, conditions, response_key in response_keys
+        )
+
+
+def _possible_objects(spreadable: gt.SpreadableType, type_registry: gt.TypeRegistry) -> t.Sequence[gt.Object]:
+    if isinstance(spreadable, gt.Interface) or isinstance(spreadable, gt.Union):
+        return spreadable.of_objects(type_registry)
+    if not isinstance(spreadable, gt.Object):
+        raise RuntimeError("Object expected here")
+    return [spreadable]
+
+
+def _same_field(a: qm.FieldSelection, b: qm.FieldSelection) -> bool:
+    return a.name == b.name and dict(((arg.name, arg.value.to_primitive()) for arg in a.arguments)) == dict(
+        ((arg.name, arg.value.to_primitive()) for arg in b.arguments)
+    )
+
+
+def compile_operation(type_registry: gt.TypeRegistry, document: qm.Document, operation: qm.Operation,
+                      root_object: gt.Object) -> OperationPlan:
+    """Compile validated operation into the tree of steps the executor runs"""
+    compiler = _PlanCompiler(type_registry, document)
+    return OperationPlan(operation, root_object, compiler.compile_selections(operation.selections, root_object))
+
+
+__all__ = ["py_arg_name", "py_attr_name", "FieldStep", "FragmentStep", "SelectionSet", "OperationPlan",
+           "conditions_hold", "compile_operation"]
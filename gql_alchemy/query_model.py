@@ -1,4 +1,4 @@
-from typing import Sequence, Union, Optional, Mapping, Dict, Tuple
+from typing import Sequence, Union, Optional, Mapping, Dict, Tuple, FrozenSet
 
 from .utils import add_if_not_empty, add_if_not_none, PrimitiveType, PrimitiveSerializable
 
@@ -110,6 +110,8 @@ class Document(GraphQlModelType):
     def __init__(self, operations: Sequence['Operation'], fragments: Sequence['NamedFragment']) -> None:
         self.operations = operations
         self.fragments = fragments
+        # filled when document is verified
+        self.operation_fragments: Optional[Mapping[Optional[str], FrozenSet[str]]] = None
 
     def visit(self, visitor: QueryVisitor) -> None:
         visitor.visit_document_begin(self)
@@ -1,6 +1,60 @@
+import re
 import typing as t
 
 
+class Token(t.NamedTuple):
+    kind: str
+    value: str
+    offset: int
+
+
+PUNCTUATOR = "punctuator"
+NAME = "name"
+INT = "int"
+FLOAT = "float"
+STRING = "string"
+INVALID = "invalid"
+
+# Ignored tokens (whitespaces, line terminators, commas and comments) are eaten
+# by the same match as the significant token following them, so every token
+# costs exactly one regex call.
+_IGNORED = r'[ \t\r\n,]*(?:#[^\n]*[ \t\r\n,]*)*'
+_TOKEN_PATTERNS = [
+    (PUNCTUATOR, r'[.]{3}|[!$():=@\[\]{}|]'),
+    (NAME, r'[_A-Za-z][_0-9A-Za-z]*'),
+    (FLOAT, r'-?(?:[1-9][0-9]*|0)(?:\.[0-9]+(?:[eE][+-]?[0-9]+)?|[eE][+-]?[0-9]+)'),
+    (INT, r'-?(?:[1-9][0-9]*|0)'),
+    (STRING, r'"[^"\\\n\r]*(?:\\(?:["\\/bfnrt]|u[0-9A-Fa-f]{4})[^"\\\n\r]*)*"'),
+    (INVALID, r'.')
+]
+_TOKEN_RE = re.compile(
+    _IGNORED + r'(?:' + r'|'.join(r'(?P<' + kind + r'>' + pattern + r')' for kind, pattern in _TOKEN_PATTERNS) + r'|$)',
+    re.DOTALL
+)
+_TOKEN_VALUE_RE = re.compile(
+    _IGNORED + r'(' + r'|'.join(pattern for _, pattern in _TOKEN_PATTERNS) + r'|$)',
+    re.DOTALL
+)
+
+
+def tokenize(text_input: str, start: int = 0) -> t.Iterator[Token]:
+    # tuple.__new__ skips the python level constructor of the named tuple
+    new_token = tuple.__new__
+
+    for m in _TOKEN_RE.finditer(text_input, start):
+        kind = m.lastgroup
+
+        if kind is None:
+            return
+
+        yield new_token(Token, (kind, m.group(kind), m.start(kind)))
+
+
+def token_values(text_input: str) -> t.List[str]:
+    """Values of the tokens `tokenize` yields, followed by at least one empty string marking the end of input"""
+    return _TOKEN_VALUE_RE.findall(text_input)
+
+
 class Reader:
     text_input: str
     index: int
@@ -137,4 +191,5 @@ def format_position(lineno: int, line_pos: int, lines: t.Sequence[t.Optional[str
     return result
 
 
-__all__ = ["Reader", "format_position"]
+__all__ = ["Token", "PUNCTUATOR", "NAME", "INT", "FLOAT", "STRING", "INVALID", "tokenize", "token_values", "Reader",
+           "format_position"]
@@ -17,17 +17,49 @@ class Resolver:
                 self.for_gql_type = name
 
 
+class BatchField:
+    """Resolver field loaded for many resolvers of the same type with one call"""
+
+    def __init__(self, load: t.Callable[..., t.Sequence[t.Any]],
+                 key: t.Optional[t.Callable[[t.Any], t.Hashable]] = None) -> None:
+        self.load = load
+        self.key = key
+
+
+def batch(key: t.Optional[t.Callable[[t.Any], t.Hashable]] = None
+          ) -> t.Callable[[t.Callable[..., t.Sequence[t.Any]]], BatchField]:
+    """Make field loader called once per query level with list of keys and field arguments
+
+    Loader returns values in the order of keys. Keys are resolvers themselves unless key function given.
+    """
+
+    def decorator(load: t.Callable[..., t.Sequence[t.Any]]) -> BatchField:
+        return BatchField(load, key)
+
+    return decorator
+
+
 _scalar_types = {"Int", "Float", "String", "Boolean", "ID"}
 
 
 class Introspection:
+    """Introspection data of the schema; type resolvers and their fields are built once and reused"""
+
     def __init__(self, schema: s.Schema) -> None:
         self.__schema = schema
         self.__types_map = dict(((user_type.name, user_type) for user_type in schema.types))
+        self.__type_resolvers: t.Dict[str, Resolver] = {}
+        self.__types: t.Optional[t.Sequence[Resolver]] = None
+        self.__directives: t.Optional[t.Sequence[Resolver]] = None
 
         self.type_registry = schema.type_registry
 
     def types(self) -> t.Sequence[Resolver]:
+        if self.__types is None:
+            self.__types = self.__collect_types()
+        return self.__types
+
+    def __collect_types(self) -> t.Sequence[Resolver]:
         types: t.List[Resolver] = []
 
         for scalar_type in _scalar_types:
@@ -68,7 +100,9 @@ class Introspection:
         return res
 
     def directives(self) -> t.Sequence[Resolver]:
-        return [_DirectiveResolver(d, self) for d in self.__schema.directives]
+        if self.__directives is None:
+            self.__directives = [_DirectiveResolver(d, self) for d in self.__schema.directives]
+        return self.__directives
 
     def get_type_resolver(self, type_ref: t.Union[str, gt.GqlType, s.TypeDefinition]) -> Resolver:
         resolver = self.search_type_resolver(type_ref)
@@ -77,6 +111,17 @@ class Introspection:
         return resolver
 
     def search_type_resolver(self, type_ref: t.Union[str, gt.GqlType, s.TypeDefinition]) -> t.Optional[Resolver]:
+        key = type_ref.name if isinstance(type_ref, s.TypeDefinition) else str(type_ref)
+
+        resolver = self.__type_resolvers.get(key)
+        if resolver is None:
+            resolver = self.__create_type_resolver(type_ref)
+            if resolver is not None:
+                self.__type_resolvers[key] = resolver
+
+        return resolver
+
+    def __create_type_resolver(self, type_ref: t.Union[str, gt.GqlType, s.TypeDefinition]) -> t.Optional[Resolver]:
         if isinstance(type_ref, str):
             if type_ref in _scalar_types:
                 return _ScalarTypeResolver(type_ref)
@@ -90,7 +135,7 @@ class Introspection:
         if wrapper is not None:
             return _WrapperTypeResolver(wrapper, self)
 
-        return self.search_type_resolver(str(type_ref))
+        return self.__create_type_resolver(str(type_ref))
 
     def possible_types(self, interface: s.Interface) -> t.Sequence[Resolver]:
         possible_types = []
@@ -146,6 +191,8 @@ class _UserTypeResolver(Resolver):
         self.name = self.__s_type.name
         self.description = self.__s_type.description
 
+        self.__fields: t.Dict[bool, t.Optional[t.Sequence[Resolver]]] = {}
+
     def kind(self) -> str:
         if isinstance(self.__s_type, s.Object):
             return "OBJECT"
@@ -160,6 +207,11 @@ class _UserTypeResolver(Resolver):
         raise RuntimeError("Object, Interface, Union, Enum or InputObject expected here")
 
     def fields(self, includeDeprecated: bool) -> t.Optional[t.Sequence[Resolver]]:
+        if includeDeprecated not in self.__fields:
+            self.__fields[includeDeprecated] = self.__collect_fields(includeDeprecated)
+        return self.__fields[includeDeprecated]
+
+    def __collect_fields(self, includeDeprecated: bool) -> t.Optional[t.Sequence[Resolver]]:
         if isinstance(self.__s_type, s.Interface):
             return [
                 _FieldResolver(n, f, self.__introspection)
@@ -232,8 +284,12 @@ class _FieldResolver(Resolver):
         self.isDeprecated = field.is_deprecated
         self.deprecationReason = field.deprecation_reason
 
+        self.__args: t.Optional[t.List[Resolver]] = None
+
     def args(self) -> t.List[Resolver]:
-        return [_InputValueResolver(n, i, self.__introspection) for n, i in self.__field.args.items()]
+        if self.__args is None:
+            self.__args = [_InputValueResolver(n, i, self.__introspection) for n, i in self.__field.args.items()]
+        return self.__args
 
     def type(self) -> Resolver:
         return self.__introspection.get_type_resolver(self.__field.type)
@@ -88,7 +88,12 @@ class Field:
                  args: t.Mapping[str, t.Union[InputValue, gt.InlineType, str]] = {},
                  description: t.Optional[str] = None,
                  is_deprecated: bool = False,
-                 deprecation_reason: t.Optional[str] = None) -> None:
+                 deprecation_reason: t.Optional[str] = None,
+                 cost: int = 1,
+                 list_size: t.Optional[int] = None,
+                 max_age: t.Optional[int] = None,
+                 cache_ttl: t.Optional[int] = None,
+                 cache_scope: str = "ID") -> None:
         self.type = type
 
         norm_args: t.Dict[str, InputValue] = {}
@@ -102,9 +107,20 @@ class Field:
         self.description = description
         self.is_deprecated = is_deprecated
         self.deprecation_reason = deprecation_reason
+        # cost analysis: weight of the field and expected size of the list it returns
+        self.cost = cost
+        self.list_size = list_size
+        # response cache: seconds the field value stays fresh
+        self.max_age = max_age
+        # field cache: seconds resolved values are reused between requests, see `cached_directive`
+        self.cache_ttl = cache_ttl
+        self.cache_scope = cache_scope
 
     def to_type_field(self) -> gt.Field:
-        return gt.Field(self.type, dict(((arg_name, arg.to_type_arg()) for arg_name, arg in self.args.items())))
+        return gt.Field(
+            self.type, dict(((arg_name, arg.to_type_arg()) for arg_name, arg in self.args.items())), self.cost,
+            self.list_size, self.max_age, self.cache_ttl, self.cache_scope
+        )
 
     def format(self, name: str) -> str:
         lines: t.List[str] = []
@@ -166,15 +182,18 @@ class _SelectableTypeDefinition(TypeDefinition):
 class Object(_SelectableTypeDefinition):
     def __init__(self, name: str, fields: t.Mapping[str, t.Union[Field, gt.InlineType, str]],
                  interfaces: t.Set[str] = set(),
-                 description: t.Optional[str] = None) -> None:
+                 description: t.Optional[str] = None,
+                 max_age: t.Optional[int] = None) -> None:
         super().__init__(name, fields, description)
 
         self.interfaces = interfaces
+        # response cache: seconds values of the type stay fresh unless the field tells otherwise
+        self.max_age = max_age
 
     def to_type(self) -> gt.Object:
         return gt.Object(self.name,
                          dict(((field_name, field.to_type_field()) for field_name, field in self.fields.items())),
-                         self.interfaces)
+                         self.interfaces, self.max_age)
 
     def _format_first_line(self) -> str:
         first_line = "type " + self.name
@@ -274,11 +293,11 @@ class Directive:
 
         norm_args: t.Dict[str, InputValue] = {}
         if args is not None:
-            for name, arg in args:
+            for arg_name, arg in args.items():
                 if isinstance(arg, InputValue):
-                    norm_args[name] = arg
+                    norm_args[arg_name] = arg
                 else:
-                    norm_args[name] = InputValue(arg)
+                    norm_args[arg_name] = InputValue(arg)
 
         self.args: t.Mapping[str, InputValue] = norm_args
 
@@ -305,6 +324,15 @@ class Directive:
         return "\n".join(lines)
 
 
+# values of the field are reused between requests for ttl seconds; with ID scope they are kept per `id` attribute of
+# resolver (or per resolver object without one), with TYPE scope they are shared by all resolvers of the type
+cached_directive = Directive(
+    "cached", {DirectiveLocations.FIELD},
+    {"ttl": InputValue(NonNull(Int)), "scope": InputValue(String, "ID")},
+    "Reuse values of the field between requests"
+)
+
+
 class Schema:
     def __init__(self,
                  types: t.Sequence[t.Union[Enum, Object, Interface, Union, InputObject]],
@@ -328,6 +356,7 @@ class Schema:
             )),
             [dir_def.to_directive() for dir_def in self.directives]
         )
+        self.type_registry.freeze()
 
         self.types.append(query)
 
@@ -408,11 +437,11 @@ class _IntrospectionQueryObject(gt.Object):
 
         self.__query_obj = query_obj
 
-    def fields(self, type_registry: gt.TypeRegistry) -> t.Mapping[str, gt.Field]:
+    def _merge_fields(self, type_registry: gt.TypeRegistry) -> t.Mapping[str, gt.Field]:
         return dict(
             chain(
                 self.__query_obj.fields(type_registry).items(),
-                super().fields(type_registry).items()
+                super()._merge_fields(type_registry).items()
             )
         )
 
@@ -430,4 +459,4 @@ class _IntrospectionQueryObject(gt.Object):
 
 __all__ = ["Boolean", "Int", "Float", "String", "ID", "NonNull", "List", "EnumValue", "Enum", "InputValue",
            "Field", "Object", "Interface", "Union", "IoField", "InputObject", "DirectiveLocations", "Directive",
-           "Schema"]
+           "cached_directive", "Schema"]
@@ -0,0 +1,69 @@
+import time
+import typing as t
+from datetime import datetime, timezone
+
+import gql_alchemy.query_model as qm
+import gql_alchemy.types as gt
+from .hooks import ExecutionHooks, Path
+from .utils import PrimitiveType
+
+
+class Tracer(ExecutionHooks):
+    """Timings of one request in Apollo tracing format, offsets and durations are in nanoseconds"""
+
+    def __init__(self) -> None:
+        self.start_time = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+
+        self.phases: t.Dict[str, t.Tuple[int, int]] = {}
+        self.resolvers: t.List[t.Dict[str, PrimitiveType]] = []
+
+    def on_parse(self, query: str, started: float, duration: float) -> None:
+        self.phases["parsing"] = (self.__offset(started), _ns(duration))
+
+    def on_validate(self, document: qm.Document, op_to_run: t.Optional[str], started: float, duration: float) -> None:
+        self.phases["validation"] = (self.__offset(started), _ns(duration))
+
+    def on_field_resolve(self, path: Path, parent_type: str, field_name: str, return_type: gt.GqlType,
+                         started: float, duration: float) -> None:
+        self.resolvers.append({
+            "path": list(path),
+            "parentType": parent_type,
+            "fieldName": field_name,
+            "returnType": str(return_type),
+            "startOffset": self.__offset(started),
+            "duration": _ns(duration)
+        })
+
+    def to_primitive(self) -> t.Dict[str, PrimitiveType]:
+        duration = self.__offset(time.perf_counter())
+        end_time = self.start_time.timestamp() + duration / 1e9
+
+        tracing: t.Dict[str, PrimitiveType] = {
+            "version": 1,
+            "startTime": _format_time(self.start_time),
+            "endTime": _format_time(datetime.fromtimestamp(end_time, timezone.utc)),
+            "duration": duration
+        }
+
+        for name in ("parsing", "validation"):
+            start_offset, phase_duration = self.phases.get(name, (0, 0))
+            tracing[name] = {"startOffset": start_offset, "duration": phase_duration}
+
+        tracing["execution"] = {"resolvers": self.resolvers}
+
+        return tracing
+
+    def __offset(self, moment: float) -> int:
+        return _ns(moment - self.start)
+
+
+def _ns(seconds: float) -> int:
+    return int(seconds * 1e9)
+
+
+def _format_time(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + "{:03d}Z".format(moment.microsecond // 1000)
+
+
+__all__ = ["Tracer"]
@@ -1,6 +1,7 @@
 import json
 import re
 import typing as t
+from types import MappingProxyType
 
 import gql_alchemy.query_model as qm
 from .errors import GqlSchemaError
@@ -41,13 +42,37 @@ class NonCompatibleVariableType(RuntimeError):
         return t.cast(str, self.args[0])
 
 
+ValueChecker = t.Callable[[PrimitiveType], bool]
+
+# lists longer than that are checked by this number of items in sampled mode
+_list_sample_size = 16
+
+
 class GqlType:
     def __init__(self, name: str) -> None:
         self.__name = name
+        self.__checkers: t.Dict[bool, ValueChecker] = {}
 
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
         raise NotImplementedError()
 
+    def checker(self, type_registry: 'TypeRegistry', sampled: bool = False) -> ValueChecker:
+        """Function checking values as is_assignable does, built once for the type
+
+        Sampled checker checks evenly spaced items of long lists only.
+        """
+        checker = self.__checkers.get(sampled)
+        if checker is None:
+            checker = self.__checkers[sampled] = self._create_checker(type_registry, sampled)
+        return checker
+
+    def _create_checker(self, type_registry: 'TypeRegistry', sampled: bool) -> ValueChecker:
+        return lambda value: self.is_assignable(value, type_registry)
+
+    def _value_types(self, type_registry: 'TypeRegistry') -> t.Optional[t.FrozenSet[type]]:
+        """Types of assignable values if the type of a value is enough to check it"""
+        return None
+
     def __str__(self) -> str:
         return self.__name
 
@@ -112,6 +137,28 @@ class List(_TypeWrapper):
 
         return True
 
+    def _create_checker(self, type_registry: 'TypeRegistry', sampled: bool) -> ValueChecker:
+        wrapped_type = self.of_type(type_registry)
+        check_item = wrapped_type.checker(type_registry, sampled)
+        item_types = wrapped_type._value_types(type_registry)
+
+        def check(value: PrimitiveType) -> bool:
+            if value is None:
+                return True
+            if not isinstance(value, list):
+                return False
+
+            items = t.cast(t.List[PrimitiveType], value)
+            if sampled and len(items) > _list_sample_size:
+                items = items[::len(items) // _list_sample_size]
+
+            # lists of plain values are usually checked by set of types of items
+            if item_types is not None and item_types.issuperset(map(type, items)):
+                return True
+            return all(map(check_item, items))
+
+        return check
+
     def validate_input(self, value: t.Union[qm.Value, qm.ConstValue],
                        vars_values: t.Optional[t.Mapping[str, PrimitiveType]],
                        vars_defs: t.Mapping[str, GqlType],
@@ -154,6 +201,16 @@ class NonNull(_TypeWrapper):
 
         return wrapped_type.is_assignable(value, type_registry)
 
+    def _create_checker(self, type_registry: 'TypeRegistry', sampled: bool) -> ValueChecker:
+        check_wrapped = self.of_type(type_registry).checker(type_registry, sampled)
+        return lambda value: value is not None and check_wrapped(value)
+
+    def _value_types(self, type_registry: 'TypeRegistry') -> t.Optional[t.FrozenSet[type]]:
+        value_types = self.of_type(type_registry)._value_types(type_registry)
+        if value_types is None:
+            return None
+        return value_types - {type(None)}
+
     def validate_input(self, value: t.Union[qm.Value, qm.ConstValue],
                        vars_values: t.Optional[t.Mapping[str, PrimitiveType]],
                        vars_defs: t.Mapping[str, GqlType],
@@ -202,9 +259,16 @@ class Argument:
 
 
 class Field:
-    def __init__(self, field_type: t.Union['InlineType', str], args: t.Mapping[str, Argument]) -> None:
+    def __init__(self, field_type: t.Union['InlineType', str], args: t.Mapping[str, Argument],
+                 cost: int = 1, list_size: t.Optional[int] = None, max_age: t.Optional[int] = None,
+                 cache_ttl: t.Optional[int] = None, cache_scope: str = "ID") -> None:
         self.__type = field_type
         self.args = args
+        self.cost = cost
+        self.list_size = list_size
+        self.max_age = max_age
+        self.cache_ttl = cache_ttl
+        self.cache_scope = cache_scope
         self.__type_resolved: t.Optional[t.Union[OutputType, WrapperType]] = None
 
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
@@ -226,8 +290,17 @@ class _GqlCompositeType(GqlType):
     def __init__(self, name: str, fields: t.Mapping[str, Field]) -> None:
         super().__init__(name)
         self._fields = fields
+        self.__frozen_fields: t.Optional[t.Mapping[str, Field]] = None
 
     def fields(self, type_registry: 'TypeRegistry') -> t.Mapping[str, Field]:
+        if self.__frozen_fields is not None:
+            return self.__frozen_fields
+        return self._merge_fields(type_registry)
+
+    def freeze(self, type_registry: 'TypeRegistry') -> None:
+        self.__frozen_fields = MappingProxyType(dict(self._merge_fields(type_registry)))
+
+    def _merge_fields(self, type_registry: 'TypeRegistry') -> t.Mapping[str, Field]:
         return self._fields
 
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
@@ -235,12 +308,23 @@ class _GqlCompositeType(GqlType):
 
 
 class _Scalar(_PossibleInputType):
+    # exact types of values, values of other types are checked by is_assignable
+    python_types: t.FrozenSet[type] = frozenset()
+
     def __init__(self) -> None:
         super().__init__(type(self).__name__[1:])
 
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
         raise NotImplementedError()
 
+    def _create_checker(self, type_registry: 'TypeRegistry', sampled: bool) -> ValueChecker:
+        value_types = self._value_types(type_registry)
+        is_assignable = self.is_assignable
+        return lambda value: type(value) in value_types or is_assignable(value, type_registry)
+
+    def _value_types(self, type_registry: 'TypeRegistry') -> t.Optional[t.FrozenSet[type]]:
+        return self.python_types | {type(None)}
+
     def validate_input(self, value: t.Union[qm.Value, qm.ConstValue],
                        vars_values: t.Optional[t.Mapping[str, PrimitiveType]],
                        vars_defs: t.Mapping[str, GqlType],
@@ -249,6 +333,8 @@ class _Scalar(_PossibleInputType):
 
 
 class _Boolean(_Scalar):
+    python_types = frozenset((bool,))
+
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
         return value is None or isinstance(value, bool)
 
@@ -268,6 +354,8 @@ class _Boolean(_Scalar):
 
 
 class _Int(_Scalar):
+    python_types = frozenset((int, bool,))
+
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
         return value is None or isinstance(value, int)
 
@@ -287,6 +375,8 @@ class _Int(_Scalar):
 
 
 class _Float(_Scalar):
+    python_types = frozenset((float,))
+
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
         return value is None or isinstance(value, float)
 
@@ -306,6 +396,8 @@ class _Float(_Scalar):
 
 
 class _String(_Scalar):
+    python_types = frozenset((str,))
+
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
         return value is None or isinstance(value, str)
 
@@ -325,6 +417,8 @@ class _String(_Scalar):
 
 
 class _ID(_Scalar):
+    python_types = frozenset((int, str, bool,))
+
     def is_assignable(self, value: PrimitiveType, type_registry: 'TypeRegistry') -> bool:
         return value is None or isinstance(value, int) or isinstance(value, str)
 
@@ -464,16 +558,17 @@ class InputObject(_PossibleInputType):
 
 class Object(_GqlCompositeType):
     def __init__(self, name: str, fields: t.Mapping[str, Field],
-                 implements: t.Set[str]) -> None:
+                 implements: t.Set[str], max_age: t.Optional[int] = None) -> None:
         super().__init__(name, fields)
 
         if len(fields) == 0 and len(implements) == 0:
             raise GqlSchemaError("Object must define at least one field or implement interface")
 
+        self.max_age = max_age
         self.__implements = implements
         self.__implements_resolved: t.Optional[t.Sequence[Interface]] = None
 
-    def fields(self, type_registry: 'TypeRegistry') -> t.Mapping[str, Field]:
+    def _merge_fields(self, type_registry: 'TypeRegistry') -> t.Mapping[str, Field]:
         fields: t.Dict[str, Field] = {}
         for i in self.implements(type_registry):
             for n, f in i.fields(type_registry).items():
@@ -844,6 +939,9 @@ class TypeRegistry:
 
         self.__validate()
 
+        self.frozen = False
+        self.__possible_object_names: t.Dict[str, t.FrozenSet[str]] = {}
+
         self.__objects_by_interfaces: t.Dict[str, t.List[Object]] = {}
 
         for gql_type in self.__types:
@@ -875,6 +973,45 @@ class TypeRegistry:
     def objects_by_interface(self, interface_name: str) -> t.Sequence[Object]:
         return self.__objects_by_interfaces[interface_name]
 
+    def possible_object_names(self, spreadable: 'SpreadableType') -> t.FrozenSet[str]:
+        names = self.__possible_object_names.get(str(spreadable))
+
+        if names is None:
+            if isinstance(spreadable, Object):
+                names = frozenset((str(spreadable),))
+            else:
+                names = frozenset((str(o) for o in spreadable.of_objects(self)))
+            self.__possible_object_names[str(spreadable)] = names
+
+        return names
+
+    def freeze(self) -> None:
+        """Precompute merged fields, resolved types and possible objects; types must not change after that"""
+        if self.frozen:
+            return
+
+        for gql_type in self.__types:
+            if isinstance(gql_type, _GqlCompositeType):
+                for field in gql_type.fields(self).values():
+                    self.resolve_and_unwrap(field.type(self))
+                    for arg in field.args.values():
+                        self.resolve_and_unwrap(arg.type(self))
+                gql_type.freeze(self)
+
+            if isinstance(gql_type, InputObject):
+                for field_type in gql_type.fields(self).values():
+                    self.resolve_and_unwrap(field_type)
+
+            spreadable = is_spreadable(gql_type)
+            if spreadable is not None:
+                self.possible_object_names(spreadable)
+
+        for directive in self.__directives:
+            for arg in directive.args.values():
+                self.resolve_and_unwrap(arg.type(self))
+
+        self.frozen = True
+
     def directive(self, name: str) -> Directive:
         if name in self.__directives_by_names:
             return self.__directives_by_names[name]
@@ -1026,8 +1163,8 @@ def _validate_variable(var: qm.Variable, expected: GqlType, vars_defs: t.Mapping
         raise NonCompatibleVariableType(var.name, expected, var_def)
 
 
-__all__ = ["TypeResolvingError", "GqlType", "List", "NonNull", "Argument", "Field", "Boolean", "Int", "Float",
-           "String", "ID", "Enum", "Interface", "InputObject", "Object", "Union", "ScalarType", "is_scalar",
+__all__ = ["TypeResolvingError", "ValueChecker", "GqlType", "List", "NonNull", "Argument", "Field", "Boolean", "Int",
+           "Float", "String", "ID", "Enum", "Interface", "InputObject", "Object", "Union", "ScalarType", "is_scalar",
            "assert_scalar", "WrapperType", "is_wrapper", "assert_wrapper", "NonWrapperType", "is_non_wrapper",
            "assert_non_wrapper", "SpreadableType", "is_spreadable", "assert_spreadable", "SelectableType",
            "is_selectable", "assert_selectable", "InputType", "is_input", "assert_input", "OutputType",
@@ -6,6 +6,7 @@ import gql_alchemy.query_model as qm
 import gql_alchemy.schema as s
 import gql_alchemy.types as gt
 from .errors import GqlValidationError
+from .parser import verify_document
 from .utils import PrimitiveType
 
 logger = logging.getLogger("gql_alchemy")
@@ -113,7 +114,7 @@ class Validator(qm.QueryVisitor):
                     )
                 self._spreadables.append(spreadable)
             elif isinstance(spreadable, gt.Union) or isinstance(spreadable, gt.Interface):
-                of_objects = {str(o) for o in spreadable.of_objects(self.type_registry)}
+                of_objects = self.type_registry.possible_object_names(spreadable)
                 if on_type_name not in of_objects:
                     of_objects_list = list(of_objects)
                     of_objects_list.sort()
@@ -202,13 +203,9 @@ class PassOne(Validator):
 
 class PassTwo(Validator):
     def __init__(self, fragments: t.Dict[str, gt.SpreadableType],
-                 type_registry: gt.TypeRegistry, query: gt.Object, mutation: t.Optional[gt.Object],
-                 vars_values: t.Mapping[str, PrimitiveType],
-                 op_to_run: t.Optional[str]) -> None:
+                 type_registry: gt.TypeRegistry, query: gt.Object, mutation: t.Optional[gt.Object]) -> None:
         super().__init__(type_registry, query, mutation)
         self.__fragments = fragments
-        self.__vars_values = vars_values
-        self.__op_to_run = op_to_run
 
         self.__root: t.Optional[t.Union[qm.Operation, qm.NamedFragment]] = None
         self.fragment_calls: t.Dict[str, t.List[t.Union[qm.Operation, qm.NamedFragment]]] = {}
@@ -242,7 +239,7 @@ class PassTwo(Validator):
 
         if str(called_on_type) != str(defined_on_type):
             if isinstance(called_on_type, gt.Interface) or isinstance(called_on_type, gt.Union):
-                if str(defined_on_type) not in {str(o) for o in called_on_type.of_objects(self.type_registry)}:
+                if str(defined_on_type) not in self.type_registry.possible_object_names(called_on_type):
                     raise GqlValidationError(
                         "Fragment `{}` can not be called on `{}` type".format(spread.fragment_name, called_on_type)
                     )
@@ -287,16 +284,7 @@ class PassTwo(Validator):
 
             vars_defaults[var.name] = var.default
 
-        if self.__is_running(op):
-            vars_values = dict(self.__vars_values)
-            for var_name, default in vars_defaults.items():
-                if default is not None:
-                    vars_values.setdefault(var_name, default.to_py_value({}))
-            env = Env(vars_definitions, vars_values)
-        else:
-            env = Env(vars_definitions, None)
-
-        for var_name, var_type in env.vars_definitions.items():
+        for var_name, var_type in vars_definitions.items():
             default = vars_defaults[var_name]
             if default is not None:
                 if not var_type.validate_input(default, None, {}, self.type_registry):
@@ -304,26 +292,9 @@ class PassTwo(Validator):
                         "Variable can not be assigned to its default; "
                         "problem with `{}` variable in `{}` operation".format(var_name, op.name)
                     )
-            if env.vars_values is not None:
-                if var_name in env.vars_values:
-                    if not var_type.is_assignable(env.vars_values[var_name], self.type_registry):
-                        raise GqlValidationError(
-                            "Wrong value {} provided for `{}` variable of `{}` operation".format(
-                                json.dumps(env.vars_values[var_name]), var_name, op.name
-                            )
-                        )
-                elif vars_defaults[var_name] is None:
-                    raise GqlValidationError(
-                        "Variable `{}` is required in `{}` operation".format(var_name, op.name)
-                    )
 
-        self.environments[op.name if op.name is not None else "!"] = env
-
-    def __is_running(self, op: qm.Operation) -> bool:
-        if self.__op_to_run is None:
-            return True
-
-        return op.name == self.__op_to_run
+        # variables values are checked per request by `validate_variables`
+        self.environments[op.name if op.name is not None else "!"] = Env(vars_definitions, None)
 
 
 class PassThree(Validator):
@@ -457,14 +428,46 @@ class PassThree(Validator):
         return envs
 
 
-def validate(query: qm.Document, schema: s.Schema,
-             vars_values: t.Mapping[str, PrimitiveType], op_to_run: t.Optional[str] = None) -> None:
+class DocumentValidation:
+    """Result of validating a document against a schema, does not depend on variables values"""
+
+    def __init__(self, document: qm.Document, type_registry: gt.TypeRegistry,
+                 environments: t.Mapping[str, Env]) -> None:
+        self.document = document
+        self.type_registry = type_registry
+        self.environments = environments
+
+
+def validate_op_to_run(query: qm.Document, op_to_run: t.Optional[str]) -> None:
     if op_to_run is None and len(query.operations) > 1:
         raise GqlValidationError("You must specify query to run for queries with many operations")
 
     if op_to_run is not None and op_to_run not in {op.name for op in query.operations}:
         raise GqlValidationError("Operation requested to run is not defined in the query")
 
+
+def operation_document(query: qm.Document, op_to_run: t.Optional[str]) -> qm.Document:
+    """Document of the operation to run and the fragments it spreads"""
+    if op_to_run is None:
+        return query
+
+    if query.operation_fragments is None:
+        verify_document(query)
+
+    operation_fragments = t.cast(t.Mapping[t.Optional[str], t.FrozenSet[str]], query.operation_fragments)
+    reachable = operation_fragments[op_to_run]
+
+    document = qm.Document(
+        [op for op in query.operations if op.name == op_to_run],
+        [fr for fr in query.fragments if fr.name in reachable]
+    )
+    document.operation_fragments = {op_to_run: reachable}
+    return document
+
+
+def validate_document(query: qm.Document, schema: s.Schema, op_to_run: t.Optional[str] = None) -> DocumentValidation:
+    """Validate the whole document or, if op_to_run given, the operation and fragments it uses only"""
+    query = operation_document(query, op_to_run)
     type_registry = schema.type_registry
 
     query_obj = type_registry.resolve_type(schema.query_object_name)
@@ -480,8 +483,45 @@ def validate(query: qm.Document, schema: s.Schema,
     pass_one = PassOne(type_registry, query_obj, mutation_obj)
     query.visit(pass_one)
 
-    pass_two = PassTwo(pass_one.fragments, type_registry, query_obj, mutation_obj, vars_values, op_to_run)
+    pass_two = PassTwo(pass_one.fragments, type_registry, query_obj, mutation_obj)
     query.visit(pass_two)
 
     pass_three = PassThree(pass_two.environments, pass_two.fragment_calls, type_registry, query_obj, mutation_obj)
     query.visit(pass_three)
+
+    return DocumentValidation(query, type_registry, pass_two.environments)
+
+
+def validate_variables(validation: DocumentValidation, vars_values: t.Mapping[str, PrimitiveType],
+                       op_to_run: t.Optional[str] = None) -> None:
+    for op in validation.document.operations:
+        if op_to_run is None or op.name == op_to_run:
+            break
+    else:
+        return
+
+    vars_definitions = validation.environments[op.name if op.name is not None else "!"].vars_definitions
+
+    values = dict(vars_values)
+    for var in op.variables:
+        if var.default is not None:
+            values.setdefault(var.name, var.default.to_py_value({}))
+
+    for var in op.variables:
+        if var.name in values:
+            if not vars_definitions[var.name].is_assignable(values[var.name], validation.type_registry):
+                raise GqlValidationError(
+                    "Wrong value {} provided for `{}` variable of `{}` operation".format(
+                        json.dumps(values[var.name]), var.name, op.name
+                    )
+                )
+        else:
+            raise GqlValidationError(
+                "Variable `{}` is required in `{}` operation".format(var.name, op.name)
+            )
+
+
+def validate(query: qm.Document, schema: s.Schema,
+             vars_values: t.Mapping[str, PrimitiveType], op_to_run: t.Optional[str] = None) -> None:
+    validate_op_to_run(query, op_to_run)
+    validate_variables(validate_document(query, schema, op_to_run), vars_values, op_to_run)
@@ -1,6 +1,15 @@
+from .cache_control_test import *
+from .cache_test import *
+from .codegen_test import *
+from .compile_test import *
+from .cost_test import *
 from .documentation_examples_test import *
 from .executor_test import *
+from .hooks_test import *
 from .introspection_test import *
 from .parser_test import *
+from .persisted_test import *
+from .plan_test import *
+from .tracing_test import *
 from .types_test import *
 from .validator_test import *
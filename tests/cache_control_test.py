@@ -0,0 +1,112 @@
+import json
+import typing as t
+import unittest
+
+import gql_alchemy.schema as s
+from gql_alchemy.cache import LruResponseCache
+from gql_alchemy.cache_control import operation_max_age
+from gql_alchemy.executor import Executor, Resolver
+
+
+class CacheControlTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("User", {
+                "name": s.String,
+                "email": s.Field(s.String, max_age=30),
+                "friends": s.List("User")
+            }, max_age=120),
+            s.Object("Stats", {"count": s.Int})
+        ],
+        s.Object("Query", {
+            "me": "User",
+            "stats": "Stats",
+            "version": s.Field(s.String, max_age=3600),
+            "now": s.Int
+        }),
+        s.Object("Mutation", {"touch": s.Field(s.Int, max_age=60)})
+    )
+
+    def max_age(self, query: str, default_max_age: int = 0) -> int:
+        plan = Executor(self.schema, Resolver("Query"), Resolver("Mutation")).prepare(query).plans[None]
+        return operation_max_age(plan, self.schema.type_registry, default_max_age)
+
+    def test_max_age(self) -> None:
+        self.assertEqual(120, self.max_age("{ me { name friends { name } } }"))
+        self.assertEqual(30, self.max_age("{ me { name email } version }"))
+        self.assertEqual(3600, self.max_age("{ version }"))
+        # root fields and objects without hints are not cached by default
+        self.assertEqual(0, self.max_age("{ version now }"))
+        self.assertEqual(0, self.max_age("{ version stats { count } }"))
+        self.assertEqual(10, self.max_age("{ version stats { count } }", default_max_age=10))
+        self.assertEqual(30, self.max_age("{ ... on Query { me { ...F } } } fragment F on User { email }"))
+        self.assertEqual(0, self.max_age("mutation { touch }"))
+
+    def test_response_cache(self) -> None:
+        calls: t.List[str] = []
+
+        class User(Resolver):
+            name = "Ann"
+            email = "ann@example.com"
+
+        class Query(Resolver):
+            def me(self):
+                calls.append("me")
+                return User()
+
+        e = Executor(self.schema, Query(), Resolver("Mutation"), response_cache=LruResponseCache())
+
+        query = "query ($x: Boolean) { me { name @include(if: $x) email } }"
+        self.assertEqual({"me": {"name": "Ann", "email": "ann@example.com"}}, e.query(query, {"x": True}))
+        self.assertEqual({"me": {"name": "Ann", "email": "ann@example.com"}}, e.query(query, {"x": True}))
+        self.assertEqual(1, len(calls))
+
+        # variables are a part of the key
+        self.assertEqual({"me": {"email": "ann@example.com"}}, e.query(query, {"x": False}))
+        self.assertEqual(2, len(calls))
+
+        self.assertEqual({"me": {"email": "ann@example.com"}},
+                         json.loads(b"".join(e.query_stream(query, {"x": False})).decode("utf-8")))
+        self.assertEqual(2, len(calls))
+
+        e.invalidate_response(query, {"x": True})
+        e.query(query, {"x": True})
+        self.assertEqual(3, len(calls))
+
+        e.response_cache.clear()
+        e.query(query, {"x": False})
+        self.assertEqual(4, len(calls))
+
+    def test_not_cached(self) -> None:
+        calls: t.List[str] = []
+
+        class User(Resolver):
+            name = "Ann"
+
+        class Query(Resolver):
+            def me(self):
+                calls.append("me")
+                return User()
+
+        class Mutation(Resolver):
+            def touch(self):
+                calls.append("touch")
+                return len(calls)
+
+        e = Executor(self.schema, Query(), Mutation(), response_cache=LruResponseCache())
+
+        e.query("mutation { touch }", {})
+        e.query("mutation { touch }", {})
+        self.assertEqual(2, len(calls))
+
+        # result of the stream is stored once it is fully written
+        stream = e.query_stream("{ me { name } }", {})
+        e.query("{ me { name } }", {})
+        self.assertEqual(3, len(calls))
+        b"".join(stream)
+        e.query("{ me { name } }", {})
+        self.assertEqual(4, len(calls))
+
+        prepared = e.prepare("{ me { name } }")
+        e.query(prepared, {})
+        self.assertEqual(4, len(calls))
@@ -0,0 +1,149 @@
+import unittest
+
+from gql_alchemy.cache import FieldCache, LruCache, LruResponseCache, args_key
+from gql_alchemy.errors import GqlExecutionError
+
+
+class LruCacheTest(unittest.TestCase):
+    def test_get_put(self) -> None:
+        cache: LruCache[str, int] = LruCache(2)
+
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1)
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(1, len(cache))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_eviction(self) -> None:
+        cache: LruCache[str, int] = LruCache(2)
+
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(1, cache.evictions)
+
+    def test_get_or_compute(self) -> None:
+        cache: LruCache[str, int] = LruCache(10)
+        computed = []
+
+        def compute(key: str) -> int:
+            computed.append(key)
+            return len(key)
+
+        self.assertEqual(3, cache.get_or_compute("foo", compute))
+        self.assertEqual(3, cache.get_or_compute("foo", compute))
+        self.assertEqual(["foo"], computed)
+
+    def test_invalidate(self) -> None:
+        cache: LruCache[str, int] = LruCache(10)
+
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.invalidate("a")
+        self.assertNotIn("a", cache)
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_size_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            LruCache(0)
+
+
+class LruResponseCacheTest(unittest.TestCase):
+    def test_expiration(self) -> None:
+        now = [100.0]
+        cache = LruResponseCache(2, lambda: now[0])
+
+        cache.put("a", "{}", 10)
+        self.assertEqual("{}", cache.get("a"))
+
+        now[0] = 110.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(0, len(cache.entries))
+
+    def test_invalidate(self) -> None:
+        cache = LruResponseCache()
+
+        cache.put("a", "1", 10)
+        cache.put("b", "2", 10)
+        cache.invalidate("a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual("2", cache.get("b"))
+
+        cache.clear()
+        self.assertIsNone(cache.get("b"))
+
+
+class FieldCacheTest(unittest.TestCase):
+    class Foo:
+        for_gql_type = "Foo"
+
+        def __init__(self, foo_id=None) -> None:
+            self.id = foo_id
+            self.calls = 0
+
+        def bar(self, x: int) -> int:
+            self.calls += 1
+            return x * 2
+
+    def test_scopes(self) -> None:
+        now = [0.0]
+        cache = FieldCache(clock=lambda: now[0])
+
+        a, b, c = self.Foo(1), self.Foo(1), self.Foo()
+        self.assertEqual(2, cache.wrap(a.bar, {"x": 1}, 10)(x=1))
+        self.assertEqual(2, cache.wrap(b.bar, {"x": 1}, 10)(x=1))
+        self.assertEqual(4, cache.wrap(b.bar, {"x": 2}, 10)(x=2))
+        self.assertEqual(2, cache.wrap(c.bar, {"x": 1}, 10)(x=1))
+        self.assertEqual((1, 1, 1), (a.calls, b.calls, c.calls))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(3, cache.misses)
+        self.assertEqual(0.25, cache.hit_rate())
+
+        # shared by all resolvers of the type
+        cache.wrap(a.bar, {"x": 1}, 10, "TYPE")(x=1)
+        cache.wrap(c.bar, {"x": 1}, 10, "TYPE")(x=1)
+        self.assertEqual((2, 1), (a.calls, c.calls))
+
+        now[0] = 10.0
+        cache.wrap(a.bar, {"x": 1}, 10)(x=1)
+        self.assertEqual(3, a.calls)
+
+    def test_invalidate(self) -> None:
+        cache = FieldCache()
+        a = self.Foo(1)
+
+        cache.wrap(a.bar, {"x": 1}, 10)(x=1)
+        cache.invalidate("Foo", "bar")
+        cache.wrap(a.bar, {"x": 1}, 10)(x=1)
+        cache.clear()
+        cache.wrap(a.bar, {"x": 1}, 10)(x=1)
+        self.assertEqual(3, a.calls)
+
+    def test_input_object_args(self) -> None:
+        cache = FieldCache()
+        a = self.Foo(1)
+
+        # fields of input objects may come in any order
+        cache.wrap(a.bar, {"x": 1, "f": {"a": [{"b": 1, "c": 2}], "d": 3}}, 10)(x=1)
+        cache.wrap(a.bar, {"f": {"d": 3, "a": [{"c": 2, "b": 1}]}, "x": 1}, 10)(x=1)
+        self.assertEqual(1, a.calls)
+
+        self.assertNotEqual(args_key({"f": {"a": [1, 2]}}), args_key({"f": {"a": [2, 1]}}))
+        self.assertNotEqual(args_key({"f": {"a": 1}}), args_key({"f": {"a": True}}))
+
+    def test_not_cached(self) -> None:
+        cache = FieldCache()
+
+        self.assertEqual(3, cache.wrap(3, {}, 10))
+        self.assertEqual(len, cache.wrap(len, {}, 10))
+
+        with self.assertRaises(GqlExecutionError):
+            cache.wrap(self.Foo().bar, {}, 10, "SESSION")
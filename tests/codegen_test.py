@@ -0,0 +1,217 @@
+import typing as t
+import unittest
+
+import gql_alchemy.schema as s
+import tests.executor_test as executor_test
+from gql_alchemy.cache import FieldCache
+from gql_alchemy.codegen import generate_operation
+from gql_alchemy.errors import GqlExecutionError
+from gql_alchemy.executor import Executor, Resolver
+from gql_alchemy.resolvers import batch
+
+
+class CodegenExecutorTest(executor_test.ExecutorTest):
+    codegen = True
+
+
+class CodegenTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("User", {
+                "id": s.NonNull(s.Int),
+                "name": s.String,
+                "rank": s.Field(s.Int, cache_ttl=60),
+                "friends": s.List(s.NonNull("User")),
+                "best": "User"
+            })
+        ],
+        s.Object("Query", {
+            "user": s.Field(s.NonNull("User"), {"id": s.Int}),
+            "users": s.List("User")
+        })
+    )
+
+    def test_query(self) -> None:
+        class User(Resolver):
+            def __init__(self, user_id: int) -> None:
+                super().__init__("User")
+                self.id = user_id
+                self.name = "u{}".format(user_id)
+
+            def friends(self) -> t.List['User']:
+                return [User(self.id + 1), User(self.id + 2)]
+
+            @batch(key=lambda user: user.id)
+            def best(ids):
+                return [User(i * 10) if i < 3 else None for i in ids]
+
+        class Query(Resolver):
+            def user(self, id: int) -> User:
+                return User(id)
+
+            def users(self) -> t.List[t.Optional[User]]:
+                return [User(1), None]
+
+        e = Executor(self.schema, Query(), document_cache_size=10, codegen=True)
+
+        query = "query Q($id: Int = 1) { user(id: $id) { id friends { name best { id } } } users { id } }"
+        self.assertEqual(
+            {
+                "user": {"id": 1, "friends": [{"name": "u2", "best": {"id": 20}}, {"name": "u3", "best": None}]},
+                "users": [{"id": 1}, None]
+            },
+            e.query(query, {})
+        )
+
+        plan = e.prepare(query).plans[None]
+        self.assertIsNone(plan.compiled)
+        self.assertIn("return {'id': ", generate_operation(plan, e.type_registry).source)
+
+    def test_compiled_once(self) -> None:
+        class User(Resolver):
+            name = "u2"
+
+        class Query(Resolver):
+            def user(self, id: int) -> User:
+                return User()
+
+        e = Executor(self.schema, Query(), document_cache_size=10, codegen=True)
+        prepared = e.prepare("{ user(id: 2) { name } }")
+
+        e.query(prepared, {})
+        compiled = prepared.plans[None].compiled
+        self.assertTrue(callable(compiled))
+
+        self.assertEqual({"user": {"name": "u2"}}, e.query(prepared, {}))
+        self.assertIs(compiled, prepared.plans[None].compiled)
+
+    def test_cached_documents(self) -> None:
+        class User(Resolver):
+            name = "u2"
+
+        class Query(Resolver):
+            def user(self, id: int) -> User:
+                return User()
+
+        e = Executor(self.schema, Query(), document_cache_size=10, codegen=True)
+        query = "{ user(id: 2) { name } }"
+
+        e.query(query, {})
+        plan = e.plan_cache.get((e.document_cache.get(query), None))
+        compiled = plan.compiled
+        self.assertTrue(callable(compiled))
+
+        for _ in range(3):
+            self.assertEqual({"user": {"name": "u2"}}, e.query(query, {}))
+        self.assertIs(compiled, plan.compiled)
+
+    def test_directives(self) -> None:
+        class User(Resolver):
+            id = 2
+            name = "u2"
+            friends = []
+
+        class Query(Resolver):
+            def user(self, id: int) -> User:
+                return User()
+
+        e = Executor(self.schema, Query(), document_cache_size=10, codegen=True)
+        prepared = e.prepare("query Q($f: Boolean) { user(id: 2) { id friends @include(if: $f) { id } } }")
+
+        self.assertEqual({"user": {"id": 2}}, e.query(prepared, {"f": False}))
+        self.assertIs(False, prepared.plans[None].compiled)
+
+        # constant conditions are applied to the plan
+        prepared = e.prepare("{ user(id: 2) { id friends @include(if: false) { id } name @skip(if: false) } }")
+        self.assertEqual({"user": {"id": 2, "name": "u2"}}, e.query(prepared, {}))
+        self.assertTrue(callable(prepared.plans[None].compiled))
+
+    def test_errors(self) -> None:
+        class User(Resolver):
+            id = 0
+            name = 13
+
+        class Query(Resolver):
+            def user(self, id: int) -> t.Optional[User]:
+                return User() if id >= 0 else None
+
+        e = Executor(self.schema, Query(), document_cache_size=10, codegen=True)
+
+        with self.assertRaises(GqlExecutionError) as cm:
+            e.query("{ user(id: 0) { name } }", {})
+        self.assertEqual(
+            "Resolver `User` for type `User` returns not assignable value '13' for field `name` of type `String`",
+            str(cm.exception)
+        )
+
+        with self.assertRaises(GqlExecutionError) as cm:
+            e.query("{ user(id: -1) { id } }", {})
+        self.assertEqual("Resolver `IntrospectionResolver` for type `Query` returns non compatible null at `user` "
+                         "for field `user` of type `User!`", str(cm.exception))
+
+    def test_field_cache(self) -> None:
+        calls: t.List[str] = []
+
+        class User(Resolver):
+            id = 1
+
+            def rank(self) -> int:
+                calls.append("rank")
+                return 1
+
+        class Query(Resolver):
+            def user(self, id: int) -> User:
+                return User()
+
+        e = Executor(self.schema, Query(), document_cache_size=10, codegen=True, field_cache=FieldCache())
+
+        for _ in range(2):
+            self.assertEqual({"user": {"rank": 1}}, e.query("{ user(id: 1) { rank } }", {}))
+        self.assertEqual(["rank"], calls)
+
+    def test_batch(self) -> None:
+        calls: t.List[str] = []
+
+        class User(Resolver):
+            def __init__(self, user_id: int) -> None:
+                super().__init__("User")
+                self.id = user_id
+
+            def friends(self) -> t.List['User']:
+                return [User(self.id + 1), User(self.id + 2)]
+
+            @batch(key=lambda user: user.id)
+            def best(ids):
+                calls.append("best")
+                return [User(i * 10) if i < 3 else None for i in ids]
+
+        class Query(Resolver):
+            def user(self, id: int) -> User:
+                return User(id)
+
+            def users(self) -> t.List[t.Optional[User]]:
+                return [User(1), None]
+
+        e = Executor(self.schema, Query(), document_cache_size=10, codegen=True)
+
+        # batch fields are loaded once per key
+        e.query("{ users { best { id } } a: user(id: 1) { best { id } } }", {})
+        self.assertEqual(["best"], calls)
+
+        # plans loading batch fields run by the executor after the first run, so keys of a level load together
+        prepared = e.prepare("{ user(id: 1) { friends { best { id } } } }")
+        calls.clear()
+        e.query(prepared, {})
+        self.assertEqual(["best", "best"], calls)
+        self.assertIs(False, prepared.plans[None].compiled)
+
+        calls.clear()
+        self.assertEqual({"user": {"friends": [{"best": {"id": 20}}, {"best": None}]}}, e.query(prepared, {}))
+        self.assertEqual(["best"], calls)
+
+        # the same holds for plans of cached documents
+        query = "{ user(id: 1) { friends { best { id } } } }"
+        calls.clear()
+        for _ in range(3):
+            e.query(query, {})
+        self.assertEqual(["best", "best", "best", "best"], calls)
@@ -0,0 +1,173 @@
+import contextlib
+import io
+import os
+import tempfile
+import types
+import unittest
+
+import gql_alchemy.schema as s
+from gql_alchemy.compile import compile_query, main
+from gql_alchemy.errors import GqlValidationError
+from gql_alchemy.executor import Executor, Resolver
+from gql_alchemy.parser import parse_document
+from gql_alchemy.persisted import PersistedQueries, compiled_module_name, load_compiled_module, query_hash
+
+schema = s.Schema(
+    [
+        s.Object("Item", {"name": s.String, "price": s.Field(s.Float, {"discount": s.Float})}),
+        s.InputObject("Filter", {"prefix": s.String})
+    ],
+    s.Object("Query", {
+        "items": s.Field(s.List(s.NonNull("Item")), {"first": s.NonNull(s.Int), "filter": "Filter"})
+    })
+)
+
+items_query = """query Items($first: Int! = 2, $prefix: String, $discount: Float) {
+  items(first: $first, filter: {prefix: $prefix}) { name price(discount: $discount) }
+}"""
+
+
+class Item(Resolver):
+    def __init__(self, i: int) -> None:
+        super().__init__()
+        self.name = "item{}".format(i)
+        self.i = i
+
+    def price(self, discount: float) -> float:
+        return self.i * 10.0 - (discount or 0.0)
+
+
+class Query(Resolver):
+    def items(self, first: int, filter: dict) -> list:
+        prefix = (filter or {}).get("prefix") or ""
+        return [Item(i) for i in range(first) if "item{}".format(i).startswith(prefix)]
+
+
+class CompileTest(unittest.TestCase):
+    def directory(self) -> str:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return directory.name
+
+    def compile(self, *queries: str) -> str:
+        out_dir = self.directory()
+        queries_dir = self.directory()
+        for i, query in enumerate(queries):
+            with open(os.path.join(queries_dir, "{}.graphql".format(i)), "w", encoding="utf-8") as f:
+                f.write(query)
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(0, main(["tests.compile_test", queries_dir, out_dir]), stderr.getvalue())
+        return out_dir
+
+    def test_compiled_query(self) -> None:
+        out_dir = self.compile(items_query, "{ items(first: 1) { name } }")
+        sha256 = query_hash(items_query)
+        self.assertTrue(os.path.exists(os.path.join(out_dir, compiled_module_name(sha256) + ".py")))
+
+        e = Executor(schema, Query())
+        prepared = e.load_compiled(load_compiled_module(out_dir, sha256))
+        self.assertTrue(callable(prepared.plans["Items"].compiled))
+
+        self.assertEqual(
+            {"items": [{"name": "item0", "price": 0.0}, {"name": "item1", "price": 10.0}]},
+            e.query(prepared, {"prefix": None, "discount": None})
+        )
+        self.assertEqual(
+            {"items": [{"name": "item1", "price": 9.5}]},
+            e.query(prepared, {"first": 3, "prefix": "item1", "discount": 0.5})
+        )
+        # results do not depend on the way query is prepared
+        self.assertEqual(e.query(e.prepare(items_query), {"first": 5, "prefix": None, "discount": 1.0}),
+                         e.query(prepared, {"first": 5, "prefix": None, "discount": 1.0}))
+
+    def test_persisted_queries(self) -> None:
+        out_dir = self.compile(items_query)
+        queries = PersistedQueries(Executor(schema, Query()), allow_list_only=True, compiled_path=out_dir)
+
+        self.assertEqual({"items": [{"name": "item0", "price": 0.0}]},
+                         queries.query(query_hash(items_query), {"first": 1, "prefix": None, "discount": None}))
+        self.assertIsNone(load_compiled_module(out_dir, query_hash("{ items(first: 1) { name } }")))
+
+    def test_another_schema(self) -> None:
+        query = "{ items(first: 1) { name } }"
+        out_dir = self.compile(query, items_query)
+        other = s.Schema(
+            [s.Object("Item", {"name": s.String}), s.InputObject("Filter", {"prefix": s.String})],
+            s.Object("Query", {"items": s.Field(s.List("Item"), {"first": s.Int, "filter": "Filter"})})
+        )
+
+        # query is prepared from its text and validated against the schema
+        prepared = Executor(other, Query()).load_compiled(load_compiled_module(out_dir, query_hash(query)))
+        self.assertIsNone(prepared.plans[None].compiled)
+        self.assertEqual({"items": [{"name": "item0"}]}, Executor(other, Query()).query(prepared, {}))
+
+        with self.assertRaises(GqlValidationError):
+            Executor(other, Query()).load_compiled(load_compiled_module(out_dir, query_hash(items_query)))
+
+    def test_another_field_cache_ttl(self) -> None:
+        query = "{ items(first: 1) { name } }"
+        out_dir = self.compile(query)
+        cached = s.Schema(
+            [
+                s.Object("Item", {
+                    "name": s.Field(s.String, cache_ttl=60),
+                    "price": s.Field(s.Float, {"discount": s.Float})
+                }),
+                s.InputObject("Filter", {"prefix": s.String})
+            ],
+            s.Object("Query", {
+                "items": s.Field(s.List(s.NonNull("Item")), {"first": s.NonNull(s.Int), "filter": "Filter"})
+            })
+        )
+
+        # generated code wraps fields with cache_ttl, so schema text is not enough to reuse it
+        self.assertEqual(schema.format(), cached.format())
+        prepared = Executor(cached, Query()).load_compiled(load_compiled_module(out_dir, query_hash(query)))
+        self.assertIsNone(prepared.plans[None].compiled)
+        self.assertEqual({"items": [{"name": "item0"}]}, Executor(cached, Query()).query(prepared, {}))
+
+    def test_literals(self) -> None:
+        literals_schema = s.Schema(
+            [s.InputObject("Range", {"from": s.Int, "to": s.Int})],
+            s.Object("Query", {
+                "echo": s.Field(s.String, {"a": s.String, "b": s.List(s.Int), "c": "Range", "d": s.List("Range")})
+            })
+        )
+        query = "query ($b: [Int] = [1, null]) { echo(a: null, b: $b, c: {from: 1, to: null}, d: [{from: 2}]) " \
+                "other: echo(b: [3, null], c: null, d: [null, {to: 4}]) }"
+
+        class LiteralsQuery(Resolver):
+            def echo(self, a, b, c, d):
+                return repr((a, b, c, d))
+
+        module = types.ModuleType("q")
+        exec(compile_query(literals_schema, query), module.__dict__)
+        self.assertEqual(parse_document(query).to_primitive(), module.DOCUMENT.to_primitive())
+
+        e = Executor(literals_schema, LiteralsQuery())
+        prepared = e.load_compiled(module)
+        self.assertTrue(callable(prepared.plans[None].compiled))
+        self.assertEqual(
+            {
+                "echo": repr((None, [1, None], {"from": 1, "to": None}, [{"from": 2}])),
+                "other": repr((None, [3, None], None, [None, {"to": 4}]))
+            },
+            e.query(prepared, {})
+        )
+        self.assertEqual(e.query(query, {}), e.query(prepared, {}))
+
+    def test_directives(self) -> None:
+        source = compile_query(schema, "query ($f: Boolean) { items(first: 1) { name @include(if: $f) } }")
+        self.assertIn("OPERATIONS = {None: None}", source)
+
+    def test_invalid_query(self) -> None:
+        queries_dir = self.directory()
+        with open(os.path.join(queries_dir, "bad.graphql"), "w", encoding="utf-8") as f:
+            f.write("{ items(first: 1) { weight } }")
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(1, main(["tests.compile_test", queries_dir, self.directory()]))
+        self.assertTrue(stderr.getvalue().startswith("bad.graphql: "))
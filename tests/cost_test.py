@@ -0,0 +1,56 @@
+import unittest
+
+import gql_alchemy.schema as s
+from gql_alchemy.errors import GqlValidationError
+from gql_alchemy.executor import Executor, Resolver
+
+
+class CostTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Interface("Node", {"id": s.Int}),
+            s.Object("User", {
+                "name": s.String,
+                "friends": s.Field(s.List("User"), {"first": s.Int}, cost=2),
+                "posts": s.Field(s.NonNull(s.List(s.NonNull("Post"))), list_size=3)
+            }, {"Node"}),
+            s.Object("Post", {"title": s.Field(s.String, cost=5)}, {"Node"}),
+        ],
+        s.Object("Query", {
+            "me": "User",
+            "nodes": s.Field(s.List("Node"), {"limit": s.Int}),
+        })
+    )
+
+    def test_cost(self) -> None:
+        e = Executor(self.schema, Resolver("Query"))
+
+        self.assertEqual(3, e.cost("{ me { id name } }", {}))
+        # 1 + (2 + 4 * (1 + 1))
+        self.assertEqual(11, e.cost("{ me { friends(first: 4) { id name } } }", {}))
+        self.assertEqual(11, e.cost("query ($n: Int = 4) { me { friends(first: $n) { id name } } }", {}))
+        self.assertEqual(21, e.cost("query ($n: Int) { me { friends(first: $n) { id name } } }", {"n": 9}))
+        # default list size is used without first argument
+        self.assertEqual(23, e.cost("{ me { friends { id name } } }", {}))
+        # list size declared on field
+        self.assertEqual(17, e.cost("{ me { posts { title } } }", {}))
+        # most expensive of the fragment objects counts
+        self.assertEqual(
+            1 + 2 * (1 + 5),
+            e.cost("{ nodes(limit: 2) { id ... on User { name } ... on Post { title } } }", {})
+        )
+
+    def test_limit(self) -> None:
+        class Query(Resolver):
+            me = None
+
+        e = Executor(self.schema, Query(), max_cost=20, default_list_size=100)
+
+        self.assertEqual({"me": None}, e.query("{ me { friends(first: 8) { id name } } }", {}))
+
+        with self.assertRaises(GqlValidationError) as cm:
+            e.query("{ me { friends { id name } } }", {})
+        self.assertEqual("Operation cost 203 exceeds the limit of 20", str(cm.exception))
+
+        with self.assertRaises(GqlValidationError):
+            e.query_stream("{ me { friends(first: 10) { id name } } }", {})
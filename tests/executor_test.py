@@ -1,18 +1,28 @@
+import asyncio
 import json
+import threading
+import time
 import typing as t
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import gql_alchemy.schema as s
-from gql_alchemy.executor import Executor, Resolver, SomeResolver
+from gql_alchemy.cache import FieldCache
+from gql_alchemy.errors import GqlExecutionError, GqlValidationError
+from gql_alchemy.executor import Directive, Executor, Resolver, SomeResolver
+from gql_alchemy.resolvers import batch
 from gql_alchemy.utils import PrimitiveType
 
 
 class ExecutorTest(unittest.TestCase):
+    codegen = False
+
     def assertQueryResult(self, expected: str, schema: s.Schema, query: str, query_resolver: SomeResolver,
                           mutation_resolver: SomeResolver = None,
                           variables: t.Optional[t.Mapping[str, PrimitiveType]] = None,
                           op_name: t.Optional[str] = None) -> None:
-        e = Executor(schema, query_resolver, mutation_resolver)
+        e = Executor(schema, query_resolver, mutation_resolver, document_cache_size=1 if self.codegen else None,
+                     codegen=self.codegen)
         result = e.query(query, variables if variables is not None else {}, op_name)
         self.assertEqual(expected, json.dumps(result, sort_keys=True))
 
@@ -575,3 +585,838 @@ class ExecutorTest(unittest.TestCase):
             "query ($a: Int! = 3){ foo(a: $a) }",
             Query()
         )
+
+    def test_document_cache(self):
+        class Query(Resolver):
+            foo = 3
+
+        e = Executor(s.Schema([], s.Object("Query", {"foo": s.Int})), Query(), document_cache_size=1)
+
+        self.assertEqual({"foo": 3}, e.query("{ foo }", {}))
+        self.assertEqual({"foo": 3}, e.query("{ foo }", {}))
+        self.assertEqual(1, e.document_cache.hits)
+        self.assertEqual(1, e.document_cache.misses)
+        self.assertEqual(1, e.validation_cache.hits)
+
+        self.assertEqual({"bar": 3}, e.query("{ bar: foo }", {}))
+        self.assertEqual(1, e.document_cache.evictions)
+
+
+class AsyncExecutorTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("Foo", {"bar": s.Int})
+        ],
+        s.Object("Query", {
+            "a": s.Int,
+            "b": s.Int,
+            "foos": s.List("Foo")
+        }),
+        s.Object("Mutation", {
+            "a": s.Int,
+            "b": s.Int
+        })
+    )
+
+    def run_query(self, query: str, query_resolver: SomeResolver, mutation_resolver: SomeResolver):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(
+                Executor(self.schema, query_resolver, mutation_resolver).query_async(query, {})
+            )
+        finally:
+            loop.close()
+
+    def test_concurrent_siblings(self):
+        running = []
+        max_running = []
+
+        async def call(value: int) -> int:
+            running.append(value)
+            max_running.append(len(running))
+            await asyncio.sleep(0)
+            running.remove(value)
+            return value
+
+        class Foo(Resolver):
+            def __init__(self, bar: int) -> None:
+                super().__init__("Foo")
+                self.__bar = bar
+
+            async def bar(self) -> int:
+                return await call(self.__bar)
+
+        class Query(Resolver):
+            async def a(self) -> int:
+                return await call(1)
+
+            async def b(self) -> int:
+                return await call(2)
+
+            def foos(self):
+                return [Foo(3), Foo(4)]
+
+        class Mutation(Resolver):
+            async def a(self) -> int:
+                return await call(5)
+
+            async def b(self) -> int:
+                return await call(6)
+
+        self.assertEqual(
+            {"b": 2, "a": 1, "foos": [{"bar": 3}, {"bar": 4}]},
+            self.run_query("{ b a foos { bar } }", Query(), Mutation())
+        )
+        self.assertGreater(max(max_running), 1)
+
+        max_running.clear()
+        self.assertEqual({"b": 6, "a": 5}, self.run_query("mutation { b a }", Query(), Mutation()))
+        self.assertEqual(1, max(max_running))
+
+    def test_sync_resolvers_and_errors(self):
+        class Query(Resolver):
+            a = 1
+
+            def b(self) -> int:
+                return 2
+
+            async def foos(self):
+                raise ValueError()
+
+        class Mutation(Resolver):
+            pass
+
+        self.assertEqual({"a": 1, "b": 2}, self.run_query("{ a b @include(if: true) }", Query(), Mutation()))
+        self.assertEqual({"a": 1}, self.run_query("{ a b @skip(if: true) }", Query(), Mutation()))
+
+        with self.assertRaises(GqlExecutionError) as cm:
+            self.run_query("{ foos { bar } }", Query(), Mutation())
+        self.assertEqual("Resolver internal error", str(cm.exception))
+
+
+class ThreadPoolTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("Foo", {"bar": s.Int})
+        ],
+        s.Object("Query", {
+            "a": s.Int,
+            "b": s.Int,
+            "foos": s.List("Foo")
+        }),
+        s.Object("Mutation", {
+            "a": s.Int,
+            "b": s.Int
+        })
+    )
+
+    def setUp(self) -> None:
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def call(self, value: int) -> int:
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return value
+
+    def test_parallel_blocking_resolvers(self):
+        call = self.call
+
+        class Foo(Resolver):
+            def __init__(self, bar: int) -> None:
+                super().__init__("Foo")
+                self.__bar = bar
+
+            def bar(self) -> int:
+                return call(self.__bar)
+
+        class Query(Resolver):
+            def a(self) -> int:
+                return call(1)
+
+            def b(self) -> int:
+                return call(2)
+
+            def foos(self):
+                return [Foo(i) for i in range(3, 9)]
+
+        with ThreadPoolExecutor(8) as pool:
+            e = Executor(self.schema, Query(), Resolver("Mutation"), thread_pool=pool)
+
+            result = e.query("{ b a foos { bar } }", {})
+            self.assertEqual('{"b": 2, "a": 1, "foos": [{"bar": 3}, {"bar": 4}, {"bar": 5}, {"bar": 6}, '
+                             '{"bar": 7}, {"bar": 8}]}', json.dumps(result))
+            self.assertGreater(self.max_running, 1)
+
+    def test_request_threads_limit(self):
+        call = self.call
+
+        class Foo(Resolver):
+            def __init__(self, bar: int) -> None:
+                super().__init__("Foo")
+                self.__bar = bar
+
+            def bar(self) -> int:
+                return call(self.__bar)
+
+        class Query(Resolver):
+            def foos(self):
+                return [Foo(i) for i in range(3, 9)]
+
+        with ThreadPoolExecutor(8) as pool:
+            e = Executor(self.schema, Query(), Resolver("Mutation"), thread_pool=pool, max_request_threads=2)
+
+            self.assertEqual({"foos": [{"bar": i} for i in range(3, 9)]}, e.query("{ foos { bar } }", {}))
+            self.assertEqual(2, self.max_running)
+
+    def test_serial_mutations(self):
+        call = self.call
+
+        class Mutation(Resolver):
+            def a(self) -> int:
+                return call(10)
+
+            def b(self) -> int:
+                return call(11)
+
+        with ThreadPoolExecutor(8) as pool:
+            e = Executor(self.schema, Resolver("Query"), Mutation(), thread_pool=pool)
+
+            self.assertEqual('{"b": 11, "a": 10}', json.dumps(e.query("mutation { b a }", {})))
+            self.assertEqual(1, self.max_running)
+
+    def test_errors(self):
+        class Query(Resolver):
+            def a(self) -> int:
+                raise ValueError()
+
+        with ThreadPoolExecutor(2) as pool:
+            e = Executor(self.schema, Query(), Resolver("Mutation"), thread_pool=pool)
+
+            with self.assertRaises(GqlExecutionError) as cm:
+                e.query("{ a }", {})
+            self.assertEqual("Resolver internal error", str(cm.exception))
+
+    def test_running_loop(self):
+        async def run(e: Executor) -> None:
+            with self.assertRaises(GqlExecutionError) as cm:
+                e.query("{ a }", {})
+            self.assertEqual("Executor with thread pool can not run sync requests inside running event loop, "
+                             "await `query_async` instead", str(cm.exception))
+
+            with self.assertRaises(GqlExecutionError):
+                e.query_traced("{ a }", {})
+
+            self.assertEqual({"a": 1}, await e.query_async("{ a }", {}))
+
+        class Query(Resolver):
+            a = 1
+
+        with ThreadPoolExecutor(8) as pool:
+            asyncio.run(run(Executor(self.schema, Query(), Resolver("Mutation"), thread_pool=pool)))
+
+    def test_loop_per_thread(self):
+        loops = []
+
+        class Query(Resolver):
+            async def a(self) -> int:
+                loops.append(asyncio.get_event_loop())
+                return 1
+
+        with ThreadPoolExecutor(2) as pool:
+            e = Executor(self.schema, Query(), Resolver("Mutation"), thread_pool=pool)
+
+            for _ in range(2):
+                self.assertEqual({"a": 1}, e.query("{ a }", {}))
+                self.assertEqual({"a": 1}, e.query_traced("{ a }", {})["data"])
+            self.assertEqual(1, len(set(map(id, loops))))
+
+            thread = threading.Thread(target=e.query, args=("{ a }", {}))
+            thread.start()
+            thread.join()
+            self.assertEqual(2, len(set(map(id, loops))))
+
+
+class MemoizationTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("Foo", {"bar": s.Field(s.Int, {"x": s.InputValue(s.Int, 1)})})
+        ],
+        s.Object("Query", {
+            "foo": "Foo",
+            "foos": s.List("Foo")
+        }),
+        s.Object("Mutation", {
+            "inc": s.Int
+        })
+    )
+
+    def test_memoize(self):
+        calls: t.List[t.Tuple[int, int]] = []
+
+        class Foo(Resolver):
+            def __init__(self, i: int) -> None:
+                super().__init__("Foo")
+                self.i = i
+
+            def bar(self, x: int) -> int:
+                calls.append((self.i, x))
+                return self.i * 10 + x
+
+        class Query(Resolver):
+            def __init__(self) -> None:
+                super().__init__()
+                self.__foo = Foo(0)
+
+            def foo(self):
+                return self.__foo
+
+            def foos(self):
+                return [self.__foo, Foo(1)]
+
+        query = "{ foo { bar b2: bar(x: 1) b3: bar(x: 2) ... on Foo { b4: bar } } foos { bar } }"
+        expected = {"foo": {"bar": 1, "b2": 1, "b3": 2, "b4": 1}, "foos": [{"bar": 1}, {"bar": 11}]}
+        e = Executor(self.schema, Query(), Resolver("Mutation"), memoize_fields=True)
+
+        self.assertEqual(expected, e.query(query, {}))
+        self.assertEqual([(0, 1), (0, 2), (1, 1)], calls)
+
+        # memo lives for one request only
+        calls.clear()
+        e.query(query, {})
+        self.assertEqual(3, len(calls))
+
+        calls.clear()
+        self.assertEqual(expected, json.loads(b"".join(e.query_stream(query, {})).decode("utf-8")))
+        self.assertEqual([(0, 1), (0, 2), (1, 1)], calls)
+
+        calls.clear()
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(expected, loop.run_until_complete(e.query_async(query, {})))
+        finally:
+            loop.close()
+        self.assertEqual([(0, 1), (0, 2), (1, 1)], sorted(calls))
+
+        calls.clear()
+        self.assertEqual(expected, Executor(self.schema, Query(), Resolver("Mutation")).query(query, {}))
+        self.assertEqual(6, len(calls))
+
+    def test_mutation_fields_called(self):
+        calls: t.List[str] = []
+
+        class Mutation(Resolver):
+            def inc(self) -> int:
+                calls.append("inc")
+                return len(calls)
+
+        e = Executor(self.schema, Resolver("Query"), Mutation(), memoize_fields=True)
+
+        self.assertEqual({"a": 1, "b": 2}, e.query("mutation { a: inc b: inc }", {}))
+
+
+class FieldCacheTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("User", {
+                "id": s.Int,
+                "rating": s.Field(s.Int, {"scale": s.Int}),
+                "rank": s.Field(s.Int, cache_ttl=60)
+            })
+        ],
+        s.Object("Query", {
+            "users": s.List("User")
+        }),
+        directives=[s.cached_directive]
+    )
+
+    def test_cached_directive(self) -> None:
+        calls: t.List[str] = []
+
+        class User(Resolver):
+            def __init__(self, user_id: int) -> None:
+                super().__init__("User")
+                self.id = user_id
+
+            def rating(self, scale: int) -> int:
+                calls.append("rating")
+                return self.id * scale
+
+        class Query(Resolver):
+            def users(self):
+                return [User(1), User(2)]
+
+        e = Executor(self.schema, Query(), field_cache=FieldCache())
+
+        query = "{ users { id rating(scale: 10) @cached(ttl: 60) } }"
+        expected = {"users": [{"id": 1, "rating": 10}, {"id": 2, "rating": 20}]}
+        self.assertEqual(expected, e.query(query, {}))
+        self.assertEqual(expected, e.query(query, {}))
+        self.assertEqual(expected, json.loads(b"".join(e.query_stream(query, {})).decode("utf-8")))
+        self.assertEqual(2, len(calls))
+
+        e.query("{ users { rating(scale: 3) @cached(ttl: 60, scope: \"TYPE\") } }", {})
+        self.assertEqual(3, len(calls))
+
+        # not cached without directive
+        e.query("{ users { rating(scale: 10) } }", {})
+        self.assertEqual(5, len(calls))
+        self.assertEqual(5, e.field_cache.hits)
+
+    def test_cached_directive_without_cache(self) -> None:
+        class Query(Resolver):
+            def __init__(self) -> None:
+                super().__init__()
+                self.calls = 0
+
+            def users(self):
+                self.calls += 1
+                return []
+
+        e = Executor(self.schema, Query())
+        for _ in range(2):
+            self.assertEqual({"users": []}, e.query("{ users @cached(ttl: 5) { id } }", {}))
+        self.assertEqual(2, e.query_resolver.calls)
+
+    def test_schema_cache_ttl(self) -> None:
+        calls: t.List[str] = []
+
+        class User(Resolver):
+            def __init__(self, user_id: int) -> None:
+                super().__init__("User")
+                self.id = user_id
+
+            async def rank(self) -> int:
+                calls.append("rank")
+                return self.id
+
+        class Query(Resolver):
+            def users(self):
+                return [User(1), User(2)]
+
+        e = Executor(self.schema, Query(), field_cache=FieldCache())
+
+        loop = asyncio.new_event_loop()
+        try:
+            for _ in range(2):
+                result = loop.run_until_complete(e.query_async("{ users { rank } }", {}))
+                self.assertEqual({"users": [{"rank": 1}, {"rank": 2}]}, result)
+        finally:
+            loop.close()
+        self.assertEqual(["rank", "rank"], calls)
+
+
+class BatchTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("Post", {"id": s.Int, "author": "User"}),
+            s.Object("User", {"name": s.String, "title": s.Field(s.String, {"upper": s.Boolean})})
+        ],
+        s.Object("Query", {
+            "posts": s.List("Post")
+        })
+    )
+
+    def test_batch(self):
+        calls: t.List[t.Any] = []
+
+        class User(Resolver):
+            def __init__(self, name: str) -> None:
+                super().__init__()
+                self.name = name
+
+            @batch(key=lambda user: user.name)
+            def title(names, upper):
+                calls.append(("title", names, upper))
+                return [n.upper() if upper else n for n in names]
+
+        class Post(Resolver):
+            def __init__(self, post_id: int) -> None:
+                super().__init__()
+                self.id = post_id
+
+            @batch()
+            def author(posts):
+                calls.append(("author", [p.id for p in posts]))
+                return [User("u{}".format(p.id % 2)) for p in posts]
+
+        class Query(Resolver):
+            def posts(self):
+                return [Post(1), Post(2), Post(3)]
+
+        e = Executor(self.schema, Query())
+
+        self.assertEqual(
+            '{"posts": [{"author": {"a": "u1", "b": "U1"}, "id": 1}, {"author": {"a": "u0", "b": "U0"}, "id": 2},'
+            ' {"author": {"a": "u1", "b": "U1"}, "id": 3}]}',
+            json.dumps(e.query("{ posts { id author { a: title b: title(upper: true) } } }", {}), sort_keys=True)
+        )
+        self.assertEqual(
+            [("author", [1, 2, 3]), ("title", ["u1", "u0"], None), ("title", ["u1", "u0"], True)],
+            calls
+        )
+
+    def test_async_batch(self):
+        calls: t.List[t.Any] = []
+
+        class User(Resolver):
+            def __init__(self, name: str) -> None:
+                super().__init__()
+                self.name = name
+
+            @batch(key=lambda user: user.name)
+            def title(names, upper):
+                calls.append(("title", names, upper))
+                return [n.upper() if upper else n for n in names]
+
+        class Post(Resolver):
+            def __init__(self, post_id: int) -> None:
+                super().__init__()
+                self.id = post_id
+
+            @batch()
+            def author(posts):
+                calls.append(("author", [p.id for p in posts]))
+                return [User("u{}".format(p.id % 2)) for p in posts]
+
+        class Query(Resolver):
+            def posts(self):
+                return [Post(1), Post(2), Post(3)]
+
+        e = Executor(self.schema, Query())
+
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(e.query_async("{ posts { author { title } } }", {}))
+        finally:
+            loop.close()
+
+        self.assertEqual(
+            {"posts": [{"author": {"title": "u1"}}, {"author": {"title": "u0"}}, {"author": {"title": "u1"}}]},
+            result
+        )
+        self.assertEqual([("author", [1, 2, 3]), ("title", ["u1", "u0"], None)], calls)
+
+    def test_wrong_batch_result(self):
+        class Query(Resolver):
+            @batch()
+            def posts(queries):
+                return []
+
+        with self.assertRaises(GqlExecutionError) as cm:
+            Executor(self.schema, Query()).query("{ posts { id } }", {})
+        self.assertEqual("Batch resolver `posts` must return list of 1 values", str(cm.exception))
+
+
+class DirectivesTest(unittest.TestCase):
+    schema = s.Schema(
+        [],
+        s.Object("Query", {"name": s.String, "expensive": s.String}),
+        directives=[s.Directive("repeat", {s.DirectiveLocations.FIELD}, {"times": s.InputValue(s.Int, 1)})]
+    )
+
+    def run_query(self, e: Executor, query: str, variables: t.Mapping[str, PrimitiveType], how: str) -> t.Any:
+        if how == "async":
+            return asyncio.run(e.query_async(query, variables))
+        if how == "stream":
+            return json.loads(b"".join(e.query_stream(query, variables)).decode("utf-8"))
+        return e.query(query, variables)
+
+    def test_constant_arguments(self):
+        calls: t.List[str] = []
+
+        class Repeat(Directive):
+            def __init__(self, times: int) -> None:
+                calls.append("repeat")
+                self.times = times
+
+            def wrap_field(self, field, field_args):
+                return field * self.times
+
+        class Query(Resolver):
+            name = "a"
+
+        for how in ("sync", "async", "stream"):
+            calls.clear()
+            e = Executor(self.schema, Query(), directives={"repeat": Repeat}, document_cache_size=10)
+
+            for _ in range(2):
+                self.assertEqual({"name": "aa"}, self.run_query(e, "{ name @repeat(times: 2) }", {}, how))
+            # directives are created once per plan
+            self.assertEqual(["repeat"], calls, how)
+
+            for times in (2, 3):
+                self.assertEqual({"name": "a" * times}, self.run_query(
+                    e, "query ($t: Int) { name @repeat(times: $t) }", {"t": times}, how
+                ))
+            self.assertEqual(["repeat"] * 3, calls, how)
+
+    def test_conditions(self):
+        calls: t.List[str] = []
+
+        class Query(Resolver):
+            name = "a"
+
+            def expensive(self) -> str:
+                calls.append("expensive")
+                return "b"
+
+        query = "query ($v: Boolean) { name expensive @skip(if: $v) ... @include(if: $v) { n: name } }"
+        for how in ("sync", "async", "stream"):
+            calls.clear()
+            e = Executor(self.schema, Query(), document_cache_size=10)
+
+            self.assertEqual({"name": "a", "n": "a"}, self.run_query(e, query, {"v": True}, how))
+            self.assertEqual([], calls, how)
+            self.assertEqual({"name": "a", "expensive": "b"}, self.run_query(e, query, {"v": False}, how))
+            self.assertEqual(["expensive"], calls, how)
+
+    def test_merged_conditions(self):
+        schema = s.Schema([s.Object("A", {"x": s.Int, "y": s.Int})], s.Object("Query", {"a": "A", "b": s.Int}))
+
+        class A(Resolver):
+            x = 1
+            y = 2
+
+        class Query(Resolver):
+            b = 3
+
+            def a(self) -> A:
+                calls.append("a")
+                return A()
+
+        query = "query ($v: Boolean = true, $w: Boolean = false) { a { x } ...F @include(if: $v) " \
+                "...G @include(if: $w) b @skip(if: $v) } fragment F on Query { a { y } } fragment G on Query { b }"
+        for how in ("sync", "async", "stream"):
+            calls: t.List[str] = []
+            e = Executor(schema, Query())
+
+            # selections of the same response key are merged whatever their conditions
+            self.assertEqual({"a": {"x": 1, "y": 2}}, self.run_query(e, query, {}, how), how)
+            self.assertEqual(["a"], calls, how)
+            self.assertEqual({"a": {"x": 1}, "b": 3}, self.run_query(e, query, {"v": False}, how), how)
+            self.assertEqual({"a": {"x": 1, "y": 2}, "b": 3}, self.run_query(e, query, {"w": True}, how), how)
+
+
+class CompletionTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Interface("Node", {"id": s.Int}),
+            s.Object("Item", {}, {"Node"}),
+            s.Object("Group", {"nodes": s.List(s.List(s.NonNull("Node")))}, {"Node"})
+        ],
+        s.Object("Query", {"group": "Group"})
+    )
+
+    def run_query(self, e: Executor, query: str, how: str) -> t.Any:
+        if how == "async":
+            return asyncio.run(e.query_async(query, {}))
+        if how == "stream":
+            return json.loads(b"".join(e.query_stream(query, {})).decode("utf-8"))
+        return e.query(query, {})
+
+    def test_completion(self):
+        class Item(Resolver):
+            def __init__(self, i: int) -> None:
+                super().__init__()
+                self.id = i
+
+        class Group(Resolver):
+            id = 0
+            nodes = [[Item(1), Item(2)], None, []]
+
+        class Query(Resolver):
+            group = Group()
+
+        for how in ("sync", "async", "stream", "codegen"):
+            e = Executor(self.schema, Query(), document_cache_size=1, codegen=how == "codegen")
+            self.assertEqual({"group": {"all": [[{"id": 1}, {"id": 2}], None, []]}},
+                             self.run_query(e, "{ group { all: nodes { id } } }", how), how)
+
+    def test_non_compatible(self):
+        class Item(Resolver):
+            def __init__(self, i: int) -> None:
+                super().__init__()
+                self.id = i
+
+        class Group(Resolver):
+            def __init__(self, nodes: t.Any) -> None:
+                super().__init__()
+                self.id = 0
+                self.nodes = nodes
+
+        class Query(Resolver):
+            def __init__(self, group: Group) -> None:
+                super().__init__()
+                self.group = group
+
+        cases = [
+            ([[Item(1), Item(2)], [Item(3), None]], "null at `group.all.1.1`"),
+            ([[Item(1)], ["a"]], "`str` value at `group.all.1.0`"),
+            ([[Item(1)], 2], "`int` value at `group.all.1`"),
+        ]
+        for how in ("sync", "async", "stream", "codegen"):
+            for nodes, error in cases:
+                e = Executor(self.schema, Query(Group(nodes)), document_cache_size=1, codegen=how == "codegen")
+                with self.assertRaises(GqlExecutionError) as cm:
+                    self.run_query(e, "{ group { all: nodes { id } } }", how)
+                self.assertEqual(
+                    "Resolver `Group` for type `Group` returns non compatible {} for field `nodes` "
+                    "of type `[[Node!]]`".format(error),
+                    str(cm.exception), how
+                )
+
+    def test_non_compatible_nested(self):
+        class Group(Resolver):
+            def __init__(self, nodes: t.Any) -> None:
+                super().__init__()
+                self.id = 0
+                self.nodes = nodes
+
+        class Query(Resolver):
+            def group(self):
+                return Group([[Resolver("Item"), Group([[None]])]])
+
+        query = "{ group { all: nodes { ... on Group { sub: nodes { id } } } } }"
+        for how in ("sync", "async", "stream", "codegen"):
+            e = Executor(self.schema, Query(), document_cache_size=1, codegen=how == "codegen")
+            with self.assertRaises(GqlExecutionError) as cm:
+                self.run_query(e, query, how)
+            self.assertIn("returns non compatible null at `group.all.0.1.sub.0.0`", str(cm.exception), how)
+
+    def test_non_compatible_resolver(self):
+        class Query(Resolver):
+            group = Resolver("Item")
+
+        with self.assertRaises(GqlExecutionError) as cm:
+            Executor(self.schema, Query()).query("{ group { id } }", {})
+        self.assertIn("returns non compatible resolver for `Item` at `group`", str(cm.exception))
+
+
+class ResultChecksTest(unittest.TestCase):
+    schema = s.Schema([], s.Object("Query", {"values": s.List(s.NonNull(s.Float)), "name": s.String}))
+
+    def test_full(self):
+        class Query(Resolver):
+            values = [float(i) for i in range(100)]
+            name = "q"
+
+        e = Executor(self.schema, Query())
+        self.assertEqual({"values": Query.values, "name": "q"}, e.query("{ values name }", {}))
+
+        Query.values[1] = 1
+        with self.assertRaises(GqlExecutionError) as cm:
+            e.query("{ values name }", {})
+        self.assertIn("returns not assignable value", str(cm.exception))
+
+    def test_sampled(self):
+        class Query(Resolver):
+            values: t.List[t.Any] = [float(i) for i in range(100)]
+            name = "q"
+
+        e = Executor(self.schema, Query(), result_checks="sampled")
+        Query.values[1] = 1
+        self.assertEqual({"values": Query.values, "name": "q"}, e.query("{ values name }", {}))
+
+        Query.values[0] = None
+        with self.assertRaises(GqlExecutionError):
+            e.query("{ values name }", {})
+
+    def test_off(self):
+        class Query(Resolver):
+            values = ["a"]
+            name = "q"
+
+        for codegen in (False, True):
+            e = Executor(self.schema, Query(), document_cache_size=1, codegen=codegen, result_checks="off")
+            self.assertEqual({"values": ["a"], "name": "q"}, e.query("{ values name }", {}))
+
+        with self.assertRaises(GqlExecutionError):
+            Executor(self.schema, Query(), document_cache_size=1, codegen=True).query("{ values name }", {})
+
+    def test_unknown(self):
+        with self.assertRaises(GqlExecutionError) as cm:
+            Executor(self.schema, Resolver("Query"), result_checks="none")
+        self.assertEqual("Unknown result checks `none`, one of full, off, sampled expected", str(cm.exception))
+
+
+class StreamingTest(unittest.TestCase):
+    def test_stream(self):
+        class Item(Resolver):
+            def __init__(self, i: int) -> None:
+                super().__init__()
+                self.i = i
+
+            def name(self) -> str:
+                return "item \"{}\"".format(self.i)
+
+            def tags(self):
+                return ["a", "b"] if self.i % 2 else None
+
+        class Query(Resolver):
+            def items(self, count: int):
+                return [Item(i) if i != 3 else None for i in range(count)]
+
+            first = None
+
+        schema = s.Schema(
+            [
+                s.Object("Item", {"name": s.String, "tags": s.List(s.String)})
+            ],
+            s.Object("Query", {
+                "items": s.Field(s.List("Item"), {"count": s.Int}),
+                "first": "Item"
+            })
+        )
+        e = Executor(schema, Query())
+        query = "query ($c: Int) { first { name } items(count: $c) { name ...F ... on Item { tags } } }" \
+                " fragment F on Item { name tags }"
+
+        chunks = list(e.query_stream(query, {"c": 20}, chunk_size=64))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(e.query(query, {"c": 20}), json.loads(b"".join(chunks).decode("utf-8")))
+
+        self.assertEqual(b'{"first":null,"items":[]}', b"".join(e.query_stream(query, {"c": 0})))
+
+    def test_same_response_key(self):
+        calls = []
+
+        class Query(Resolver):
+            def name(self) -> str:
+                calls.append("name")
+                return "foo"
+
+            def nick(self) -> str:
+                calls.append("nick")
+                return "bar"
+
+        e = Executor(s.Schema([], s.Object("Query", {"name": s.String, "nick": s.String})), Query(),
+                     document_cache_size=1, codegen=True)
+        query = "query ($x: Boolean) { a: name @include(if: $x) ...F } fragment F on Query { a: nick }"
+
+        for x, expected, called in ((True, {"a": "foo"}, "name"), (False, {"a": "bar"}, "nick"),
+                                    (None, {"a": "bar"}, "nick")):
+            calls.clear()
+            self.assertEqual(expected, e.query(query, {"x": x}))
+            self.assertEqual(expected, asyncio.run(e.query_async(query, {"x": x})))
+            self.assertEqual(expected, json.loads(b"".join(e.query_stream(query, {"x": x})).decode("utf-8")))
+            self.assertEqual([called] * 3, calls)
+
+        query = "{ a: name ...F } fragment F on Query { a: nick }"
+        for _ in range(2):
+            self.assertEqual({"a": "foo"}, e.query(query, {}))
+        self.assertEqual(e.query(query, {}), json.loads(b"".join(e.query_stream(query, {})).decode("utf-8")))
+
+    def test_validation_before_stream(self):
+        class Query(Resolver):
+            foo = 1
+
+        e = Executor(s.Schema([], s.Object("Query", {"foo": s.Int})), Query())
+
+        with self.assertRaises(GqlValidationError):
+            e.query_stream("{ bar }", {})
@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+
+import gql_alchemy.schema as s
+from gql_alchemy.errors import GqlValidationError
+from gql_alchemy.executor import Executor, Resolver
+from gql_alchemy.hooks import ExecutionHooks, compose_hooks
+
+
+class Recorder(ExecutionHooks):
+    def __init__(self) -> None:
+        self.events = []
+
+    def on_parse(self, query, started, duration):
+        self.events.append(("parse", query))
+
+    def on_validate(self, document, op_to_run, started, duration):
+        self.events.append(("validate", op_to_run))
+
+    def on_operation_start(self, operation, variables):
+        self.events.append(("start", operation.name, dict(variables)))
+
+    def on_operation_end(self, operation, result):
+        self.events.append(("end", operation.name, result))
+
+    def on_error(self, error):
+        self.events.append(("error", str(error)))
+
+
+class FieldRecorder(ExecutionHooks):
+    def __init__(self) -> None:
+        self.fields = []
+        self.durations = []
+
+    def on_field_resolve(self, path, parent_type, field_name, return_type, started, duration):
+        self.durations.append(duration)
+        self.fields.append((path, parent_type, field_name, str(return_type)))
+
+
+class HooksTest(unittest.TestCase):
+    schema = s.Schema(
+        [s.Object("Item", {"value": s.Int})],
+        s.Object("Query", {"items": s.List("Item"), "total": s.Int})
+    )
+
+    def test_compose(self) -> None:
+        recorder, field_recorder = Recorder(), FieldRecorder()
+
+        self.assertIsNone(compose_hooks([]))
+        self.assertIs(recorder, compose_hooks([None, recorder]))
+        self.assertFalse(recorder.wants_fields())
+        self.assertTrue(field_recorder.wants_fields())
+        self.assertFalse(compose_hooks([recorder, Recorder()]).wants_fields())
+        self.assertTrue(compose_hooks([recorder, field_recorder]).wants_fields())
+
+    def test_hooks(self) -> None:
+        class Item(Resolver):
+            def __init__(self, value: int) -> None:
+                super().__init__("Item")
+                self.value = value
+
+        class Query(Resolver):
+            total = 2
+
+            def items(self):
+                return [Item(1), Item(2)]
+
+        recorder, field_recorder = Recorder(), FieldRecorder()
+        e = Executor(self.schema, Query(), hooks=[recorder, field_recorder])
+
+        query = "query Q($n: Int) { items { value } total }"
+        e.query(query, {"n": 1})
+        self.assertEqual([
+            ("parse", query),
+            ("validate", None),
+            ("start", "Q", {"n": 1}),
+            ("end", "Q", {"items": [{"value": 1}, {"value": 2}], "total": 2})
+        ], recorder.events)
+        self.assertEqual([
+            (("items",), "Query", "items", "[Item]"),
+            (("items", 0, "value"), "Item", "value", "Int"),
+            (("items", 1, "value"), "Item", "value", "Int"),
+            (("total",), "Query", "total", "Int"),
+        ], field_recorder.fields)
+        self.assertTrue(all((d >= 0 for d in field_recorder.durations)))
+
+        field_recorder.fields.clear()
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(e.query_async(query, {"n": 2}))
+        finally:
+            loop.close()
+        self.assertEqual(4, len(field_recorder.fields))
+        self.assertIn((("items", 1, "value"), "Item", "value", "Int"), field_recorder.fields)
+
+    def test_errors_and_stream(self) -> None:
+        class Query(Resolver):
+            total = 2
+
+        recorder = Recorder()
+        e = Executor(self.schema, Query(), hooks=[recorder])
+
+        with self.assertRaises(GqlValidationError):
+            e.query("{ unknown }", {})
+        self.assertEqual("parse", recorder.events[0][0])
+        self.assertEqual("error", recorder.events[-1][0])
+
+        recorder.events.clear()
+        self.assertEqual(b'{"total":2}', b"".join(e.query_stream("{ total }", {})))
+        self.assertEqual(["parse", "validate", "start", "end"], [event[0] for event in recorder.events])
+        self.assertIsNone(recorder.events[-1][2])
@@ -213,3 +213,36 @@ class IntrospectionTest(unittest.TestCase):
             {'OBJECT'},
             ListQuery(objects).attr("kind").set()
         )
+
+    def test_memoized(self) -> None:
+        class Query(Resolver):
+            def __init__(self) -> None:
+                super().__init__()
+                self.calls = 0
+
+            def foo(self) -> str:
+                self.calls += 1
+                return "foo"
+
+        query_resolver = Query()
+        e = Executor(
+            s.Schema([s.Object("Foo", {"bar": s.Int})], s.Object("Query", {"foo": s.String})),
+            query_resolver,
+            document_cache_size=10
+        )
+
+        self.assertIs(e.introspection.search_type_resolver("Foo"), e.introspection.search_type_resolver("Foo"))
+
+        query = "{ __type(name: \"Foo\") { name fields { name type { name } } } }"
+        result = e.query(query, {})
+        self.assertEqual({"__type": {"name": "Foo", "fields": [{"name": "bar", "type": {"name": "Int"}}]}}, result)
+
+        result["__type"]["name"] = "Bar"
+        self.assertEqual(e.query(query, {})["__type"]["name"], "Foo")
+        self.assertEqual(1, e.plan_cache.hits)
+        self.assertIsNotNone(e.plan_cache.get((e.document_cache.get(query), None)).result_json)
+
+        mixed = "{ foo __schema { queryType { name } } }"
+        self.assertEqual({"foo": "foo", "__schema": {"queryType": {"name": "Query"}}}, e.query(mixed, {}))
+        self.assertEqual({"foo": "foo", "__schema": {"queryType": {"name": "Query"}}}, e.query(mixed, {}))
+        self.assertEqual(2, query_resolver.calls)
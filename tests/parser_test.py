@@ -6,6 +6,7 @@ import unittest
 import gql_alchemy.errors as e
 import gql_alchemy.query_model as qm
 from gql_alchemy.parser import *
+from gql_alchemy.raw_reader import tokenize
 
 logger = logging.getLogger("gql_alchemy")
 logger.setLevel(logging.DEBUG)
@@ -14,52 +15,97 @@ logger.setLevel(logging.DEBUG)
 # logger.addHandler(sh)
 
 
+ENGINES = [STACK_ENGINE, DESCENT_ENGINE]
+
+
 class ParsingTest(unittest.TestCase):
     def init_parser(self) -> ElementParser:
         raise NotImplementedError()
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        raise NotImplementedError()
+
     def get_result(self) -> t.Union[qm.GraphQlModelType, t.Sequence[qm.GraphQlModelType]]:
         raise NotImplementedError()
 
+    def parse_with(self, engine: str, query: str) -> None:
+        if engine == STACK_ENGINE:
+            parse(query, self.init_parser())
+        else:
+            DescentParser(query).parse(self.init_rule())
+
     def assertParserResult(self, expected: str, query: str) -> None:
-        parser = self.init_parser()
-        parse(query, parser)
-        result = self.get_result()
+        for engine in ENGINES:
+            self.parse_with(engine, query)
+            result = self.get_result()
 
-        if not isinstance(result, qm.GraphQlModelType):
-            raise RuntimeError("Query model type expected")
+            if not isinstance(result, qm.GraphQlModelType):
+                raise RuntimeError("Query model type expected")
 
-        self.assertEqual(expected, json.dumps(result.to_primitive(), sort_keys=True))
+            self.assertEqual(expected, json.dumps(result.to_primitive(), sort_keys=True), engine)
 
     def assertParserError(self, lineno: int, query: str) -> None:
-        parser = self.init_parser()
-        with self.assertRaises(e.GqlParsingError) as cm:
-            parse(query, parser)
-        self.assertEqual(lineno, cm.exception.lineno)
+        messages = []
+        for engine in ENGINES:
+            with self.assertRaises(e.GqlParsingError, msg=engine) as cm:
+                self.parse_with(engine, query)
+            self.assertEqual(lineno, cm.exception.lineno, engine)
+            messages.append(str(cm.exception))
+        self.assertEqual(messages[0], messages[1])
 
     def assertParserResults(self, query: str, *expected: str) -> None:
-        parser = self.init_parser()
-        parse(query, parser)
-        result = self.get_result()
+        for engine in ENGINES:
+            self.parse_with(engine, query)
+            result = self.get_result()
 
-        if not isinstance(result, list):
-            raise RuntimeError("List of results expected")
+            if not isinstance(result, list):
+                raise RuntimeError("List of results expected")
 
-        self.assertEqual(len(expected), len(result))
+            self.assertEqual(len(expected), len(result), engine)
 
-        for expected_item, actual_item in zip(expected, result):
-            self.assertEqual(expected_item, json.dumps(actual_item.to_primitive(), sort_keys=True))
+            for expected_item, actual_item in zip(expected, result):
+                self.assertEqual(expected_item, json.dumps(actual_item.to_primitive(), sort_keys=True), engine)
 
     def assertDocument(self, expected: str, query: str) -> None:
-        d = parse_document(query)
-        self.assertEqual(expected, json.dumps(d.to_primitive(), sort_keys=True))
+        for engine in ENGINES:
+            d = parse_document(query, engine)
+            self.assertEqual(expected, json.dumps(d.to_primitive(), sort_keys=True), engine)
 
     def assertDocumentError(self, lineno: t.Optional[int], query: str) -> None:
-        with self.assertRaises(e.GqlParsingError) as cm:
-            parse_document(query)
-        if lineno is not None:
-            self.assertEqual(lineno, cm.exception.lineno)
-        logger.info(str(cm.exception))
+        messages = []
+        for engine in ENGINES:
+            with self.assertRaises(e.GqlParsingError, msg=engine) as cm:
+                parse_document(query, engine)
+            if lineno is not None:
+                self.assertEqual(lineno, cm.exception.lineno, engine)
+            messages.append(str(cm.exception))
+        self.assertEqual(messages[0], messages[1])
+        logger.info(messages[0])
+
+
+class TokenizeTest(unittest.TestCase):
+    def assertTokens(self, expected: str, text_input: str) -> None:
+        self.assertEqual(expected, json.dumps([list(token) for token in tokenize(text_input)]))
+
+    def test_tokens(self) -> None:
+        self.assertTokens('[]', "")
+        self.assertTokens('[]', " ,\t\r\n# comment\n,")
+        self.assertTokens(
+            '[["name", "query", 0], ["punctuator", "{", 6], ["name", "foo", 8], ["punctuator", "...", 12], '
+            '["name", "bar", 15], ["punctuator", "}", 19]]',
+            "query { foo ...bar }"
+        )
+        self.assertTokens(
+            '[["int", "-3", 0], ["float", "1.5e3", 3], ["int", "0", 9], ["int", "1", 10], '
+            '["string", "\\"a\\\\\\"b\\"", 12]]',
+            '-3 1.5e3 01 "a\\"b"'
+        )
+        self.assertTokens('[["name", "a", 0], ["name", "b", 12]]', "a # comment\nb")
+
+    def test_invalid(self) -> None:
+        self.assertTokens('[["invalid", ".", 0], ["invalid", ".", 1], ["name", "on", 3]]', ".. on")
+        self.assertTokens('[["invalid", "\\"", 0], ["name", "x", 1]]', '"x')
+        self.assertTokens('[["invalid", "\\"", 0], ["name", "a", 1], ["invalid", "\\"", 3]]', '"a\n"')
 
 
 class DocumentParserTest(ParsingTest):
@@ -183,12 +229,31 @@ class DocumentParserTest(ParsingTest):
         self.assertDocumentError(1, "a query{id}")
         self.assertDocumentError(1, "{foo ... { foo }}")
 
+    def test_nesting(self) -> None:
+        # operation selections are the first level
+        selections = "{" + "a{" * (MAX_DEPTH - 1) + "b" + "}" * MAX_DEPTH
+        self.assertEqual(MAX_DEPTH, json.dumps(parse_document(selections).to_primitive()).count("selections"))
+        values = "{ a(b: " + "[" * (MAX_DEPTH - 1) + "]" * (MAX_DEPTH - 1) + ") }"
+        self.assertEqual(MAX_DEPTH - 1, json.dumps(parse_document(values).to_primitive()).count("@list"))
+
+        for query in ("{" + "a{" * 600 + "b" + "}" * 601,
+                      "{ a(b: " + "[" * 600 + "]" * 600 + ") }",
+                      "{ a(b: " + "{c: " * 600 + "1" + "}" * 600 + ") }",
+                      "query ($v: " + "[" * 600 + "Int" + "]" * 600 + ") { a }"):
+            with self.assertRaises(e.GqlParsingError) as cm:
+                parse_document(query)
+            self.assertTrue(str(cm.exception).startswith("Nesting deeper than 128 levels is not allowed"))
+
 
 class QueryOperationParserTest(ParsingTest):
     def init_parser(self) -> ElementParser:
         self.operations: t.List[qm.Operation] = []
         return OperationParser("query", self.operations)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.operations = []
+        return lambda p: self.operations.append(p.parse_operation("query", self.operations))
+
     def get_result(self) -> qm.GraphQlModelType:
         return self.operations[0]
 
@@ -264,6 +329,10 @@ class MutationOperationParserTest(ParsingTest):
         self.operations: t.List[qm.Operation] = []
         return OperationParser("mutation", self.operations)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.operations = []
+        return lambda p: self.operations.append(p.parse_operation("mutation", self.operations))
+
     def get_result(self) -> qm.GraphQlModelType:
         return self.operations[0]
 
@@ -280,6 +349,10 @@ class VariablesParserTest(ParsingTest):
         self.variables: t.List[qm.VariableDefinition] = []
         return VariablesParser(self.variables)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.variables = []
+        return lambda p: self.variables.extend(p.parse_variables())
+
     def get_result(self) -> t.Sequence[qm.GraphQlModelType]:
         return self.variables
 
@@ -352,6 +425,10 @@ class DirectivesParserTest(ParsingTest):
         self.directives: t.List[qm.Directive] = []
         return DirectivesParser(self.directives)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.directives = []
+        return lambda p: self.directives.extend(p.parse_directives())
+
     def get_result(self) -> t.Sequence[qm.GraphQlModelType]:
         return self.directives
 
@@ -396,6 +473,10 @@ class ArgumentsParserTest(ParsingTest):
         self.arguments: t.List[qm.Argument] = []
         return ArgumentsParser(self.arguments)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.arguments = []
+        return lambda p: self.arguments.extend(p.parse_arguments())
+
     def get_result(self) -> t.Sequence[qm.GraphQlModelType]:
         return self.arguments
 
@@ -424,6 +505,10 @@ class SelectionsParserTest(ParsingTest):
         self.selections: t.List[qm.Selection] = []
         return SelectionsParser(self.selections, None)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.selections = []
+        return lambda p: self.selections.extend(p.parse_selections(None))
+
     def get_result(self) -> t.Sequence[qm.GraphQlModelType]:
         return self.selections
 
@@ -491,6 +576,10 @@ class FieldParserTest(ParsingTest):
         self.fields: t.List[qm.Selection] = []
         return FieldParser(self.fields, set())
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.fields = []
+        return lambda p: self.fields.append(p.parse_field(set()))
+
     def get_result(self) -> qm.GraphQlModelType:
         return self.fields[0]
 
@@ -587,6 +676,14 @@ class ValueParserTest(ParsingTest):
 
         return ValueParser(set_value)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.value = None
+
+        def parse_value(p: DescentParser) -> None:
+            self.value = p.parse_value()
+
+        return parse_value
+
     def get_result(self) -> qm.GraphQlModelType:
         if self.value is None:
             raise RuntimeError("value expected")
@@ -674,6 +771,14 @@ class ConstValueParserTest(ParsingTest):
 
         return ConstValueParser(set_value)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.value = None
+
+        def parse_value(p: DescentParser) -> None:
+            self.value = p.parse_const_value()
+
+        return parse_value
+
     def get_result(self) -> qm.ConstValue:
         if self.value is None:
             raise RuntimeError("value expected")
@@ -709,6 +814,10 @@ class FragmentSpreadParserTest(ParsingTest):
         self.fields: t.List[qm.Selection] = []
         return FragmentSpreadParser(self.fields)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.fields = []
+        return lambda p: self.fields.append(p.parse_fragment_spread())
+
     def get_result(self) -> qm.GraphQlModelType:
         return self.fields[0]
 
@@ -731,6 +840,10 @@ class InlineFragmentParserTest(ParsingTest):
         self.fields: t.List[qm.Selection] = []
         return InlineFragmentParser(self.fields, set())
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.fields = []
+        return lambda p: self.fields.append(p.parse_inline_fragment(set()))
+
     def get_result(self) -> qm.GraphQlModelType:
         return self.fields[0]
 
@@ -762,6 +875,10 @@ class FragmentParserTest(ParsingTest):
         self.fragments: t.List[qm.NamedFragment] = []
         return FragmentParser(self.fragments)
 
+    def init_rule(self) -> t.Callable[[DescentParser], None]:
+        self.fragments = []
+        return lambda p: self.fragments.append(p.parse_fragment(self.fragments))
+
     def get_result(self) -> qm.GraphQlModelType:
         return self.fragments[0]
 
@@ -790,7 +907,10 @@ class FragmentParserTest(ParsingTest):
 class ValidationTest(ParsingTest):
     def assertValidationError(self, msg: str, document: str):
         with self.assertRaises(e.GqlParsingError) as m:
-            parse_document(document)
+            parse_document(document, STACK_ENGINE)
+        self.assertEqual(msg, str(m.exception))
+        with self.assertRaises(e.GqlParsingError) as m:
+            parse_document(document, DESCENT_ENGINE)
         self.assertEqual(msg, str(m.exception))
 
     def init_parser(self) -> ElementParser:
@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+
+import gql_alchemy.schema as s
+from gql_alchemy.errors import GqlPersistedQueryError, GqlValidationError
+from gql_alchemy.executor import Executor, Resolver
+from gql_alchemy.persisted import DirectoryStorage, PersistedQueries, query_hash
+
+
+class PersistedQueriesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        class Query(Resolver):
+            def foo(self, a: int) -> int:
+                return a * 2
+
+        self.executor = Executor(s.Schema([], s.Object("Query", {"foo": s.Field(s.Int, {"a": s.Int})})), Query())
+
+    def test_register(self) -> None:
+        queries = PersistedQueries(self.executor)
+        query = "query ($a: Int) { foo(a: $a) }"
+        sha256 = queries.register(query)
+
+        self.assertEqual(query_hash(query), sha256)
+        self.assertEqual({"foo": 4}, queries.query(sha256, {"a": 2}))
+        self.assertEqual(b'{"foo":6}', b"".join(queries.query_stream(sha256, {"a": 3})))
+
+        with self.assertRaises(GqlValidationError):
+            queries.register("{ bar }")
+
+        with self.assertRaises(GqlValidationError):
+            queries.query(sha256, {"a": "1"})
+
+    def test_first_use(self) -> None:
+        queries = PersistedQueries(self.executor)
+        query = "{ foo(a: 1) }"
+
+        with self.assertRaises(GqlPersistedQueryError) as cm:
+            queries.query(query_hash(query), {})
+        self.assertEqual("Persisted query `{}` not found".format(query_hash(query)), str(cm.exception))
+
+        with self.assertRaises(GqlPersistedQueryError) as cm:
+            queries.query(query_hash("{ foo }"), {}, query=query)
+        self.assertEqual("Query does not match `{}` hash".format(query_hash("{ foo }")), str(cm.exception))
+
+        self.assertEqual({"foo": 2}, queries.query(query_hash(query), {}, query=query))
+        # query registered on the first use is not looked up again
+        self.assertEqual((0, 3), (queries.prepared.hits, queries.prepared.misses))
+        self.assertEqual({"foo": 2}, queries.query(query_hash(query), {}))
+        self.assertEqual((1, 3), (queries.prepared.hits, queries.prepared.misses))
+
+    def test_allow_list_only(self) -> None:
+        queries = PersistedQueries(self.executor, allow_list_only=True)
+        query = "{ foo(a: 1) }"
+
+        with self.assertRaises(GqlPersistedQueryError) as cm:
+            queries.query(query_hash(query), {}, query=query)
+        self.assertEqual("Persisted query `{}` is not allowed".format(query_hash(query)), str(cm.exception))
+
+        queries.register(query)
+        self.assertEqual({"foo": 2}, queries.query(query_hash(query), {}))
+
+    def test_directory_storage(self) -> None:
+        with tempfile.TemporaryDirectory() as path:
+            sha256 = PersistedQueries(self.executor, DirectoryStorage(path)).register("{ foo(a: 5) }")
+
+            queries = PersistedQueries(self.executor, DirectoryStorage(path), allow_list_only=True)
+            self.assertEqual({"foo": 10}, queries.query(sha256, {}))
+
+            with self.assertRaises(GqlPersistedQueryError) as cm:
+                queries.query("../foo", {})
+            self.assertEqual("Wrong persisted query hash `../foo`", str(cm.exception))
@@ -0,0 +1,150 @@
+import json
+import unittest
+
+import gql_alchemy.schema as s
+from gql_alchemy.executor import Executor, Resolver
+from gql_alchemy.parser import parse_document
+from gql_alchemy.plan import FieldStep, FragmentStep, compile_operation, conditions_hold, py_arg_name, py_attr_name
+
+
+class PlanTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Interface("Named", {"name": s.String}),
+            s.Object("Cat", {"meows": s.Boolean}, {"Named"}),
+            s.Object("Dog", {"barks": s.Boolean}, {"Named"}),
+        ],
+        s.Object("Query", {
+            "pets": s.Field(s.List("Named"), {"limit": s.Int, "offset": s.InputValue(s.Int, 0)}),
+            "class": s.String
+        })
+    )
+
+    def compile(self, query: str):
+        document = parse_document(query)
+        registry = self.schema.type_registry
+        return compile_operation(registry, document, document.operations[0], registry.resolve_type("Query"))
+
+    def test_names(self) -> None:
+        self.assertEqual("_class", py_arg_name("class"))
+        self.assertEqual("__foo", py_arg_name("__foo"))
+        self.assertEqual("_class", py_attr_name("class"))
+        self.assertEqual("f__typename", py_attr_name("__typename"))
+        self.assertEqual("foo", py_attr_name("foo"))
+
+    def test_field_args(self) -> None:
+        plan = self.compile("query ($l: Int) { all: pets(limit: $l) { name } class }")
+
+        pets, cls = plan.selections
+        self.assertIsInstance(pets, FieldStep)
+        self.assertEqual("all", pets.response_key)
+        self.assertEqual({"limit": None, "offset": 0}, dict(pets.static_args))
+        self.assertEqual(["limit"], [name for name, _ in pets.dynamic_args])
+        self.assertEqual("_class", cls.attr_name)
+        self.assertIsNone(cls.selections)
+
+        plan = self.compile("{ pets(limit: 3) { name } }")
+        self.assertEqual({"limit": 3, "offset": 0}, dict(plan.selections[0].static_args))
+        self.assertEqual([], plan.selections[0].dynamic_args)
+
+    def test_fragments(self) -> None:
+        plan = self.compile("{ pets { ...F ... on Dog { barks } ... { name } } } fragment F on Named { name }")
+
+        by_object, = plan.selections[0].selections
+        self.assertIsInstance(by_object, FragmentStep)
+        self.assertEqual((), by_object.directives)
+        self.assertIsNone(by_object.selections)
+        self.assertEqual(["name"], [f.name for f in by_object.selections_by_object["Cat"]])
+        self.assertEqual(["name", "barks"], [f.name for f in by_object.selections_by_object["Dog"]])
+
+    def test_collect_fields(self) -> None:
+        plan = self.compile(
+            "{ pets { name } ...F ...G other: pets(limit: 1) { name } ...F ... @include(if: true) { class } } "
+            "fragment F on Query { pets { ... on Cat { meows } } } "
+            "fragment G on Query { pets { ... on Dog { barks } } other: pets(limit: 2) { name } }"
+        )
+
+        pets, other, other2, included = plan.selections
+        self.assertEqual("pets", pets.response_key)
+        self.assertEqual(["name", "meows"], [f.name for f in pets.selections[0].selections_by_object["Cat"]])
+        self.assertEqual(["name", "barks"], [f.name for f in pets.selections[0].selections_by_object["Dog"]])
+        # fields with different arguments are not merged
+        self.assertEqual({"limit": 2, "offset": 0}, dict(other.static_args))
+        self.assertEqual({"limit": 1, "offset": 0}, dict(other2.static_args))
+        # fragment included by constant condition is merged
+        self.assertIsInstance(included, FieldStep)
+        self.assertEqual("class", included.name)
+
+    def test_conditions(self) -> None:
+        plan = self.compile(
+            "query ($v: Boolean) { class @skip(if: true) pets @include(if: false) { name } "
+            "n: class @include(if: $v) @skip(if: false) ... @skip(if: $v) { c: class } }"
+        )
+
+        field, fragment_field = plan.selections
+        self.assertEqual("n", field.response_key)
+        self.assertEqual([], field.directives)
+        self.assertEqual(["include"], [d.name for d in field.conditions])
+        # fragments are merged, their conditions go to their fields
+        self.assertEqual("c", fragment_field.response_key)
+        self.assertEqual(["skip"], [d.name for d in fragment_field.conditions])
+        self.assertTrue(plan.has_directives)
+
+        plan = self.compile("{ class @include(if: true) pets @skip(if: true) { name } }")
+        self.assertEqual(["class"], [f.name for f in plan.selections])
+        self.assertEqual([], plan.selections[0].conditions)
+        self.assertFalse(plan.has_directives)
+
+    def test_merged_conditions(self) -> None:
+        plan = self.compile(
+            "query ($a: Boolean, $b: Boolean) { pets { name } ...F @include(if: $a) c: class @skip(if: $b) } "
+            "fragment F on Query { pets { ... on Cat { meows } } c: class }"
+        )
+
+        # the same response key is resolved once, sub-selections of conditional selections keep their conditions
+        pets, c = plan.selections
+        self.assertEqual([], pets.conditions)
+        cat_steps = pets.selections[0].selections_by_object["Cat"]
+        self.assertEqual(["name", "meows"], [f.name for f in cat_steps])
+        self.assertEqual([[], ["include"]], [[d.name for d in f.conditions] for f in cat_steps])
+        self.assertEqual(["name"], [f.name for f in pets.selections[0].selections_by_object["Dog"]])
+
+        # field selected if any of its selections is
+        alternatives, = c.conditions
+        self.assertEqual([["include"], ["skip"]], [[d.name for d in a] for a in alternatives])
+        self.assertTrue(conditions_hold(c.conditions, {"a": False, "b": False}))
+        self.assertFalse(conditions_hold(c.conditions, {"a": False, "b": True}))
+
+    def test_plan_cache(self) -> None:
+        class Query(Resolver):
+            foo = 3
+
+        e = Executor(s.Schema([], s.Object("Query", {"foo": s.Int})), Query(), document_cache_size=2)
+
+        query = "query A { foo } query B { bar: foo }"
+        self.assertEqual({"foo": 3}, e.query(query, {}, "A"))
+        self.assertEqual({"bar": 3}, e.query(query, {}, "B"))
+        self.assertEqual({"foo": 3}, e.query(query, {}, "A"))
+        self.assertEqual(2, e.plan_cache.misses)
+        self.assertEqual(1, e.plan_cache.hits)
+
+    def test_resolved_once(self) -> None:
+        calls = []
+
+        class Cat(Resolver):
+            name = "Tom"
+            meows = True
+
+        class Query(Resolver):
+            def pets(self, limit, offset):
+                calls.append((limit, offset))
+                return [Cat()]
+
+        e = Executor(self.schema, Query())
+        query = "{ ...A ...B } fragment A on Query { pets { name } } " \
+                "fragment B on Query { pets { ... on Cat { meows } } }"
+
+        self.assertEqual({"pets": [{"name": "Tom", "meows": True}]}, e.query(query, {}))
+        self.assertEqual({"pets": [{"name": "Tom", "meows": True}]},
+                         json.loads(b"".join(e.query_stream(query, {})).decode("utf-8")))
+        self.assertEqual([(None, 0), (None, 0)], calls)
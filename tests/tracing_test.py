@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+
+import gql_alchemy.schema as s
+from gql_alchemy.executor import Executor, Resolver
+from gql_alchemy.resolvers import batch
+
+
+class TracingTest(unittest.TestCase):
+    schema = s.Schema(
+        [
+            s.Object("User", {"name": s.String, "friends": s.List("User"), "score": s.Int})
+        ],
+        s.Object("Query", {
+            "me": s.NonNull("User")
+        })
+    )
+
+    query = "{ me { name friends { n: name score } } }"
+    data = {"me": {"name": "a", "friends": [{"n": "b", "score": 1}, {"n": "c", "score": 1}]}}
+    paths = [
+        (["me"], "Query", "me", "User!"),
+        (["me", "name"], "User", "name", "String"),
+        (["me", "friends"], "User", "friends", "[User]"),
+        (["me", "friends", 0, "n"], "User", "name", "String"),
+        (["me", "friends", 1, "n"], "User", "name", "String"),
+        (["me", "friends", 0, "score"], "User", "score", "Int"),
+        (["me", "friends", 1, "score"], "User", "score", "Int"),
+    ]
+
+    def assertTracing(self, response) -> None:
+        self.assertEqual(self.data, response["data"])
+
+        tracing = response["extensions"]["tracing"]
+        self.assertEqual(1, tracing["version"])
+        self.assertRegex(tracing["startTime"], r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z$")
+        self.assertGreater(tracing["duration"], 0)
+        self.assertGreater(tracing["parsing"]["duration"], 0)
+        self.assertGreaterEqual(tracing["validation"]["startOffset"], tracing["parsing"]["startOffset"])
+
+        resolvers = tracing["execution"]["resolvers"]
+        self.assertEqual(
+            sorted(self.paths, key=repr),
+            sorted(((r["path"], r["parentType"], r["fieldName"], r["returnType"]) for r in resolvers), key=repr)
+        )
+        for r in resolvers:
+            self.assertGreaterEqual(r["duration"], 0)
+            self.assertLessEqual(r["startOffset"] + r["duration"], tracing["duration"])
+
+    def test_tracing(self) -> None:
+        class User(Resolver):
+            def __init__(self, name: str) -> None:
+                super().__init__("User")
+                self.name = name
+
+            def friends(self):
+                return [User("b"), User("c")]
+
+            @batch()
+            def score(users):
+                return [len(u.name) for u in users]
+
+        class Query(Resolver):
+            def me(self):
+                return User("a")
+
+        e = Executor(self.schema, Query())
+        self.assertTracing(e.query_traced(self.query, {}))
+        self.assertEqual(self.data, e.query(self.query, {}))
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertTracing(loop.run_until_complete(e.query_async_traced(self.query, {})))
+        finally:
+            loop.close()
@@ -41,6 +41,30 @@ class ListTest(TypesTest):
             gt.List("TestObject").is_assignable([{"foo": 1}], self.type_registry)
         self.assertEqual("Value must never be assigned to any composite type", str(m.exception))
 
+    def test_checker(self) -> None:
+        values = [[True, False, None], None, [], [1, None, 2, 3], [True, 1], [1.5, 1], True, {}, [[1]], [None]]
+        for list_type in (gt.List(gt.Boolean), gt.List(gt.Int), gt.List(gt.NonNull(gt.Int)), gt.List(gt.ID),
+                          gt.NonNull(gt.List(gt.NonNull(gt.Float))), gt.List(gt.List(gt.Int)),
+                          gt.List("TestInputObject")):
+            check = list_type.checker(self.type_registry)
+            for value in values:
+                self.assertEqual(list_type.is_assignable(value, self.type_registry), check(value),
+                                 "{} {!r}".format(list_type, value))
+        list_type = gt.List(gt.Int)
+        self.assertIs(list_type.checker(self.type_registry), list_type.checker(self.type_registry))
+
+    def test_sampled_checker(self) -> None:
+        list_type = gt.List(gt.NonNull(gt.Float))
+        values = [float(i) for i in range(100)]
+        self.assertTrue(list_type.checker(self.type_registry, sampled=True)(values))
+
+        values[1] = None
+        self.assertFalse(list_type.checker(self.type_registry)(values))
+        self.assertTrue(list_type.checker(self.type_registry, sampled=True)(values))
+
+        values[0] = None
+        self.assertFalse(list_type.checker(self.type_registry, sampled=True)(values))
+
     def test_validate_input(self) -> None:
         self.assertTrue(gt.List(gt.Boolean).validate_input(qm.ConstListValue([qm.BoolValue(True), qm.NullValue()]), {},
                                                            {}, self.type_registry))
@@ -892,3 +916,29 @@ class TypeRegistryTest(TypesTest):
                 gt.Directive("foo", {gt.DirectiveLocations.MUTATION}, {"foo": gt.Argument(gt.Int, "1")})
             ]
         )
+
+    def test_freeze(self) -> None:
+        registry = gt.TypeRegistry(
+            [
+                gt.Interface("Named", {"name": gt.Field(gt.String, {})}),
+                gt.Object("Foo", {"foo": gt.Field(gt.Int, {"a": gt.Argument(gt.List(gt.Int), None)})}, {"Named"}),
+                gt.Object("Bar", {"bar": gt.Field(gt.Int, {})}, {"Named"}),
+                gt.Union("FooOrBar", {"Foo", "Bar"})
+            ],
+            []
+        )
+
+        foo = registry.resolve_type("Foo")
+        self.assertIsNot(foo.fields(registry), foo.fields(registry))
+
+        registry.freeze()
+
+        self.assertTrue(registry.frozen)
+        self.assertIs(foo.fields(registry), foo.fields(registry))
+        self.assertEqual(["name", "foo"], list(foo.fields(registry).keys()))
+        with self.assertRaises(TypeError):
+            foo.fields(registry)["bar"] = foo.fields(registry)["foo"]
+
+        self.assertEqual({"Foo", "Bar"}, registry.possible_object_names(registry.resolve_type("Named")))
+        self.assertEqual({"Foo", "Bar"}, registry.possible_object_names(registry.resolve_type("FooOrBar")))
+        self.assertEqual({"Foo"}, registry.possible_object_names(foo))
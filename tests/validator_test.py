@@ -5,7 +5,8 @@ import unittest
 import gql_alchemy.schema as s
 from gql_alchemy.parser import parse_document
 from gql_alchemy.utils import PrimitiveType
-from gql_alchemy.validator import validate, GqlValidationError
+from gql_alchemy.validator import validate, validate_document, validate_variables, operation_document, \
+    GqlValidationError
 
 # sh = logging.StreamHandler()
 # sh.setLevel(logging.DEBUG)
@@ -181,3 +182,71 @@ class FieldsTest(ValidatorTest):
             })
         )
         self.assertNoErrors("{ foo }", schema)
+
+
+class VariablesTest(ValidatorTest):
+    schema = s.Schema([], s.Object("Query", {"foo": s.Field(s.Int, {"bar": s.Int})}))
+
+    def test_values(self) -> None:
+        self.assertNoErrors("query ($a: Int) { foo(bar: $a) }", self.schema, {"a": 1})
+        self.assertNoErrors("query ($a: Int = 3) { foo(bar: $a) }", self.schema)
+        self.assertValidationError(
+            "query q ($a: Int) { foo(bar: $a) }",
+            self.schema,
+            'Wrong value "x" provided for `a` variable of `q` operation',
+            {"a": "x"}
+        )
+        self.assertValidationError(
+            "query q ($a: Int) { foo(bar: $a) }",
+            self.schema,
+            "Variable `a` is required in `q` operation"
+        )
+
+    def test_document_validation_reused_for_values(self) -> None:
+        validation = validate_document(
+            parse_document("query q ($a: Int) { foo(bar: $a) } query p ($b: Int) { foo(bar: $b) }"),
+            self.schema
+        )
+
+        validate_variables(validation, {"a": 1}, "q")
+        validate_variables(validation, {"b": 2}, "p")
+
+        with self.assertRaises(GqlValidationError) as cm:
+            validate_variables(validation, {"a": 1}, "p")
+        self.assertEqual("Variable `b` is required in `p` operation", str(cm.exception))
+
+
+class OperationScopeTest(ValidatorTest):
+    schema = s.Schema(
+        [s.Object("Foo", {"bar": s.Int})],
+        s.Object("Query", {"foo": "Foo"})
+    )
+
+    query = """
+        query a { foo { ...A } }
+        query b { foo { ...B } }
+        fragment A on Foo { ...C }
+        fragment B on Foo { baz }
+        fragment C on Foo { bar }
+    """
+
+    def test_reachable_fragments(self) -> None:
+        document = parse_document(self.query)
+        self.assertEqual({"a": {"A", "C"}, "b": {"B"}}, document.operation_fragments)
+
+        self.assertEqual(
+            ["A", "C"],
+            [f.name for f in operation_document(document, "a").fragments]
+        )
+
+    def test_validate_operation_only(self) -> None:
+        validation = validate_document(parse_document(self.query), self.schema, "a")
+        self.assertEqual(["a"], [op.name for op in validation.document.operations])
+
+        validate(parse_document(self.query), self.schema, {}, "a")
+
+        with self.assertRaises(GqlValidationError):
+            validate(parse_document(self.query), self.schema, {}, "b")
+
+        with self.assertRaises(GqlValidationError):
+            validate_document(parse_document(self.query), self.schema)